@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AITurnScheduler:
+    # Runs AI decisions off the render loop. start() hands the decision to
+    # a worker thread and sets when the move may be shown; poll() is called
+    # every frame and returns the move once it is ready and the pacing
+    # delay has passed. A decision that overruns its time budget or fails
+    # is dropped in favour of the engine's quick fallback move. Times are
+    # in ms from a monotonic clock.
+    def __init__(self, delay=500, budget=2000):
+        self.delay = delay
+        self.budget = budget
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+        self.future = None
+        self.engine = None
+        self.turn = None
+        self.ready_at = 0
+        self.deadline = 0
+
+    @property
+    def thinking(self):
+        return self.future is not None
+
+    def start(self, engine, now):
+        self.engine = engine
+        self.turn = engine.turns
+        self.future = self.executor.submit(engine.ai_decide)
+        self.ready_at = now + self.delay
+        self.deadline = now + self.budget
+
+    def poll(self, now):
+        if self.future is None or now < self.ready_at:
+            return None
+
+        if self.future.done():
+            try:
+                move = self.future.result()
+            except Exception:
+                # A failed search must not take the render loop down with it
+                move = self.engine.ai_decide(fallback=True)
+        elif now >= self.deadline:
+            # Out of time: play the fallback and ignore the late answer
+            move = self.engine.ai_decide(fallback=True)
+            self.abandon()
+        else:
+            return None
+
+        self.future = None
+        return move
+
+    def is_current(self, engine):
+        # A move only applies to the game and turn it was computed for
+        return engine is self.engine and engine.turns == self.turn
+
+    def cancel(self):
+        # Forget any pending decision, e.g. on restart
+        if self.future is not None and not self.future.cancel():
+            self.abandon()
+        self.future = None
+
+    def abandon(self):
+        # A running decision can't be stopped, so leave it to finish on its
+        # own thread and give the next turn a fresh worker rather than
+        # queueing it behind the stale one
+        if self.future is not None and not self.future.done():
+            self.executor.shutdown(wait=False)
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)
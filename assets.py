@@ -0,0 +1,156 @@
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+import zipfile
+import pygame
+import card_art
+from card import CARD_HEIGHT, CARD_WIDTH
+
+# The asset bundle sits next to the code, so the game finds it wherever it
+# is launched from. It is a zip of stored (uncompressed) members with a
+# manifest mapping asset names to members:
+#
+#   {"cards": {"red_0": "cards/red_0.png", ...},
+#    "sounds": {"card_play": "sounds/card_play.wav", ...}}
+#
+# Card names are "<color>_<value>" as in card.card_kinds().
+BUNDLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets.zip")
+MANIFEST = "manifest.json"
+
+# File name and extra field lengths in a zip local file header
+LOCAL_HEADER_LENGTHS = struct.Struct("<HH")
+
+SOUNDS = ["card_play", "card_draw", "uno", "win"]
+
+
+class AssetBundle:
+    # Read-only view of a bundle. The zip's central directory is read once
+    # into an index of where each stored member's bytes start, and assets
+    # are sliced straight out of a memory mapping of the file. A missing
+    # bundle is an empty one: every lookup returns None, so callers decide
+    # on their fallbacks once, not per use.
+    def __init__(self, path=BUNDLE_PATH):
+        self.path = path
+        self.manifest = {}
+        self.index = {}
+        self.map = None
+
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with zipfile.ZipFile(f) as bundle:
+                for info in bundle.infolist():
+                    if info.compress_type != zipfile.ZIP_STORED:
+                        raise ValueError(f"{path}: {info.filename} is compressed; rebuild the bundle")
+                    # Data follows the local header and its own name and
+                    # extra fields, which may differ from the directory's
+                    name_length, extra_length = LOCAL_HEADER_LENGTHS.unpack_from(self.map, info.header_offset + 26)
+                    start = info.header_offset + 30 + name_length + extra_length
+                    self.index[info.filename] = (start, info.file_size)
+        if MANIFEST not in self.index:
+            raise ValueError(f"{path}: no {MANIFEST}, not an asset bundle; rebuild it with assets.py")
+        self.manifest = json.loads(self.member(MANIFEST))
+
+    def member(self, filename):
+        start, size = self.index[filename]
+        return self.map[start:start + size]
+
+    def read(self, kind, name):
+        # Bytes of an asset, or None if the bundle doesn't have it
+        filename = self.manifest.get(kind, {}).get(name)
+        if filename is None:
+            return None
+        return self.member(filename)
+
+    def names(self, kind):
+        return list(self.manifest.get(kind, {}))
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+
+def build_bundle(source, path=BUNDLE_PATH):
+    # Pack an asset folder laid out as cards/<color>_<value>.png and
+    # sounds/<name>.wav (or <name>.wav at the top, as the old loose
+    # assets were) into a bundle. Returns the manifest.
+    manifest = {"cards": {}, "sounds": {}}
+    members = []
+    for folder, kind, ext in [("cards", "cards", ".png"), ("sounds", "sounds", ".wav"), ("", "sounds", ".wav")]:
+        directory = os.path.join(source, folder)
+        if not os.path.isdir(directory):
+            continue
+        for filename in sorted(os.listdir(directory)):
+            name, file_ext = os.path.splitext(filename)
+            if file_ext.lower() != ext or name in manifest[kind]:
+                continue
+            member = f"{kind}/{filename}"
+            manifest[kind][name] = member
+            members.append((os.path.join(directory, filename), member))
+
+    # Stored, not deflated: PNGs are already compressed and WAVs load faster
+    # from a plain slice of the mapping
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as bundle:
+        bundle.writestr(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True))
+        for filename, member in members:
+            bundle.write(filename, member)
+    return manifest
+
+
+def read_assets(bundle_path=BUNDLE_PATH):
+    # The slow, font-free part of loading, for running on a background
+    # thread while a loading frame is shown: starts the mixer and decodes
+    # the sounds and card images from the bundle. Fonts and display
+    # surfaces are left to install_assets on the main thread, as SDL_ttf
+    # can't be used from two threads at once. Returns (sounds, images).
+    bundle = AssetBundle(bundle_path)
+    try:
+        try:
+            pygame.mixer.init()
+            mixer = True
+        except pygame.error:
+            mixer = False
+
+        sounds = {}
+        for name in SOUNDS:
+            data = bundle.read("sounds", name) if mixer else None
+            sounds[name] = None if data is None else pygame.mixer.Sound(file=io.BytesIO(data))
+
+        images = {}
+        for name in bundle.names("cards"):
+            images[name] = pygame.image.load(io.BytesIO(bundle.read("cards", name)), f"{name}.png")
+    finally:
+        bundle.close()
+    return sounds, images
+
+
+def install_assets(loaded, card_size=None):
+    # On the main thread, with read_assets' result: swap in the card art
+    # and build the card atlas. Returns {sound name: Sound or None}.
+    sounds, images = loaded
+    card_art.set_card_images(images)
+    card_art.preload(card_size or (CARD_WIDTH, CARD_HEIGHT))
+
+    missing = [name for name, sound in sounds.items() if sound is None]
+    if missing:
+        print(f"No sound for {', '.join(missing)}; continuing without it.")
+    return sounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack card art and sounds into the game's asset bundle")
+    parser.add_argument("source", help="folder with cards/*.png and sounds/*.wav")
+    parser.add_argument("-o", "--output", default=BUNDLE_PATH, help="bundle to write")
+    args = parser.parse_args()
+
+    manifest = build_bundle(args.source, args.output)
+    print(f"{args.output}: {len(manifest['cards'])} card images, {len(manifest['sounds'])} sounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import argparse
+import time
+import numpy as np
+from card import CARDS, COLOR_MASKS, COLORS, PLAYABLE_ON, WILD_MASK
+from deck import Deck
+from engine import Engine
+from player import SORT_RANKS, Player
+from rng import MASK64
+from tournament import report
+
+# Many games of the default policy (first legal card in hand order, most
+# common color for a wild) played in lockstep as NumPy arrays: one step
+# plays one turn of every unfinished game. Each game draws from its own
+# vectorized SplitMix64 exactly as Deck does, so game i is the same game
+# as Engine(seed=first_seed + i) and can be checked against it.
+
+NUM_KINDS = len(CARDS)
+DECK_SIZE = 108
+
+# Hands are counts per card kind plus a bitmask of the kinds held, both
+# with kinds ordered as a sorted hand is, so the lowest playable bit is the
+# card Player.ai_play picks
+RANK_BY_ID = np.array(SORT_RANKS)
+ID_BY_RANK = np.argsort(RANK_BY_ID)
+RANK_BITS = np.array([1 << rank for rank in range(NUM_KINDS)], dtype=np.uint64)
+
+
+def rank_mask(mask):
+    # A card id bitmask with its bits moved to hand order
+    return sum(1 << rank for rank, card_id in enumerate(ID_BY_RANK) if mask >> int(card_id) & 1)
+
+
+# PLAYABLE[t] is the rank bitmask of cards playable on t: the top card's
+# id, or NUM_KINDS + color index for a wild whose color has been chosen
+PLAYABLE = np.array([rank_mask(mask) for mask in PLAYABLE_ON]
+                    + [rank_mask(COLOR_MASKS[color] | WILD_MASK) for color in COLORS], dtype=np.uint64)
+
+# Cards of each color in a hand are hand @ COLOR_BY_RANK; columns follow
+# COLORS, the order Player.choose_color breaks ties in
+COLOR_BY_RANK = np.array([[CARDS[card_id].color == color for color in COLORS] for card_id in ID_BY_RANK],
+                         dtype=np.int8)
+
+# Effects by card id
+NONE, SKIP, REVERSE, DRAW2, WILD4 = range(5)
+ACTIONS = {"Skip": SKIP, "Reverse": REVERSE, "Draw2": DRAW2, "Wild4": WILD4}
+ACTION = np.array([ACTIONS.get(card.value, NONE) for card in CARDS])
+PENALTY = np.array([2 if card.value == "Draw2" else 4 if card.value == "Wild4" else 0 for card in CARDS])
+IS_WILD = np.array([card.color == "wild" for card in CARDS])
+
+
+def new_deck():
+    # Card ids of a new deck before any draws, as Deck.create_deck lays it out
+    deck = Deck.__new__(Deck)
+    deck.cards = []
+    deck.create_deck()
+    return np.array([card.id for card in deck.cards], dtype=np.uint8)
+
+
+NEW_DECK = new_deck()
+
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+MIX2 = np.uint64(0x94D049BB133111EB)
+LOW32 = np.uint64(0xFFFFFFFF)
+NO_WINNER = -1
+
+
+class BatchSimulator:
+    # num_games games of num_players seats, seeded first_seed,
+    # first_seed + 1, ... Per game: the draw pile and discard pile as id
+    # arrays with their lengths, card counts per seat and kind, the kinds
+    # held as a bitmask, hand sizes, the top card, wild color, direction, seat to move, turns and
+    # the RNG state. Games that are finished or out of turns drop out of
+    # the active set, so late steps only touch the long games.
+    def __init__(self, num_games, num_players=4, first_seed=0, max_turns=10000):
+        self.num_games = num_games
+        self.num_players = num_players
+        self.max_turns = max_turns
+        seeds = np.arange(first_seed, first_seed + num_games, dtype=np.uint64)
+        self.rng = seeds & np.uint64(MASK64)
+
+        self.pile = np.tile(NEW_DECK, (num_games, 1))
+        self.pile_len = np.full(num_games, DECK_SIZE, dtype=np.int64)
+        self.discard = np.zeros((num_games, DECK_SIZE), dtype=np.uint8)
+        self.discard_len = np.zeros(num_games, dtype=np.int64)
+        self.hands = np.zeros((num_games, num_players, NUM_KINDS), dtype=np.int8)
+        self.held = np.zeros((num_games, num_players), dtype=np.uint64)
+        self.sizes = np.zeros((num_games, num_players), dtype=np.int64)
+        self.top = np.zeros(num_games, dtype=np.int64)
+        self.wild = np.full(num_games, -1, dtype=np.int64)  # COLORS index, or -1
+        self.direction = np.ones(num_games, dtype=np.int64)
+        self.current = np.zeros(num_games, dtype=np.int64)
+        self.turns = np.zeros(num_games, dtype=np.int64)
+        self.winner = np.full(num_games, NO_WINNER, dtype=np.int64)
+        self.reshuffles = np.zeros(num_games, dtype=np.int64)
+        self.active = np.arange(num_games)
+
+    def randbelow(self, games, n):
+        # SplitMix64.randbelow for each game, all at once. The 128-bit
+        # product's high word is built from 32-bit halves, since n < 2**32.
+        state = self.rng[games] + GOLDEN
+        self.rng[games] = state
+        z = (state ^ (state >> np.uint64(30))) * MIX1
+        z = (z ^ (z >> np.uint64(27))) * MIX2
+        z ^= z >> np.uint64(31)
+        n = n.astype(np.uint64)
+        high = (z >> np.uint64(32)) * n + (((z & LOW32) * n) >> np.uint64(32))
+        return (high >> np.uint64(32)).astype(np.int64)
+
+    def recycle(self, games):
+        # Deck.recycle_discard_pile for games whose draw pile is empty: the
+        # discard pile, less its top card, becomes the draw pile in order
+        games = games[self.discard_len[games] >= 2]
+        count = self.discard_len[games]
+        self.pile[games] = self.discard[games]
+        self.pile_len[games] = count - 1
+        self.discard[games, 0] = self.discard[games, count - 1]
+        self.discard_len[games] = 1
+        self.reshuffles[games] += 1
+
+    def take(self, games):
+        # Deck.draw_card for each game: a random remaining card swapped to
+        # the end of the pile and popped. Returns the games that got a
+        # card and the cards.
+        empty = self.pile_len[games] == 0
+        if empty.any():
+            self.recycle(games[empty])
+        length = self.pile_len[games]
+        got = length > 0
+        games = games[got]
+        last = length[got] - 1
+        i = self.randbelow(games, last + 1)
+        cards = self.pile[games, i]
+        self.pile[games, i] = self.pile[games, last]
+        self.pile_len[games] = last
+        return games, got, cards
+
+    def draw(self, games, seats):
+        games, got, cards = self.take(games)
+        seats = seats[got]
+        ranks = RANK_BY_ID[cards]
+        self.hands[games, seats, ranks] += 1
+        self.held[games, seats] |= RANK_BITS[ranks]
+        self.sizes[games, seats] += 1
+
+    def setup(self):
+        # Engine.setup_game: seven cards each, dealt round-robin, then the
+        # first discard, which gets red if it is a wild
+        everyone = np.arange(self.num_games)
+        for i in range(7 * self.num_players):
+            self.draw(everyone, np.full(self.num_games, i % self.num_players))
+        _, _, cards = self.take(everyone)
+        self.discard[:, 0] = cards
+        self.discard_len[:] = 1
+        self.top[:] = cards
+        self.wild[:] = np.where(IS_WILD[cards], 0, -1)
+
+    def next_player(self, games):
+        self.current[games] = (self.current[games] + self.direction[games]) % self.num_players
+
+    def step(self):
+        # One turn of every active game, as Engine.ai_turn with Player's
+        # policy; returns how many games are still going
+        games = self.active
+        seats = self.current[games]
+        wild = self.wild[games]
+        top = np.where(wild < 0, self.top[games], NUM_KINDS + wild)
+        playable = self.held[games, seats] & PLAYABLE[top]
+        has_move = playable != 0
+        self.turns[games] += 1
+
+        # No playable card: draw one, if there is one, and pass
+        drawing = games[~has_move]
+        self.draw(drawing, seats[~has_move])
+        self.next_player(drawing)
+
+        # Play the first playable card in hand order: the lowest set bit,
+        # whose index a float's exponent gives exactly
+        games = games[has_move]
+        seats = seats[has_move]
+        playable = playable[has_move]
+        ranks = np.log2((playable & (~playable + np.uint64(1))).astype(np.float64)).astype(np.int64)
+        cards = ID_BY_RANK[ranks]
+        left = self.hands[games, seats, ranks] - 1
+        self.hands[games, seats, ranks] = left
+        self.held[games, seats] ^= np.where(left == 0, RANK_BITS[ranks], np.uint64(0))
+        self.sizes[games, seats] -= 1
+        self.discard[games, self.discard_len[games]] = cards
+        self.discard_len[games] += 1
+        self.top[games] = cards
+        won = self.sizes[games, seats] == 0
+
+        # A wild takes the most common color in the rest of the hand
+        self.wild[games] = -1
+        wilds = IS_WILD[cards] & ~won
+        if wilds.any():
+            counts = self.hands[games[wilds], seats[wilds]].astype(np.int16) @ COLOR_BY_RANK
+            self.wild[games[wilds]] = counts.argmax(axis=1)
+        self.winner[games[won]] = seats[won]
+
+        # Card effects, which apply even to a winning card
+        action = ACTION[cards]
+        reverse = action == REVERSE
+        self.direction[games[reverse]] *= -1
+        penalty = PENALTY[cards]
+        targets = (seats + self.direction[games]) % self.num_players
+        for i in range(4):
+            hit = penalty > i
+            if hit.any():
+                self.draw(games[hit], targets[hit])
+        skip = (action == SKIP) | (penalty > 0)
+        if self.num_players == 2:
+            skip |= reverse
+        self.next_player(games[skip])
+        self.next_player(games[~won])
+
+        active = self.active
+        self.active = active[(self.winner[active] == NO_WINNER) & (self.turns[active] < self.max_turns)]
+        return len(self.active)
+
+    def run(self):
+        # Play every game out; returns (winning seat or NO_WINNER, turns)
+        # per game
+        self.setup()
+        while self.step():
+            pass
+        return self.winner, self.turns
+
+
+def check_against_engine(first_seed, count, num_players=4, max_turns=10000):
+    # Play count seeded games both ways and compare how each ended: the
+    # winner, turns, every hand, both piles, seat to move, direction, wild
+    # color and RNG state. Returns (seeds that differ, seconds the engine
+    # took).
+    sim = BatchSimulator(count, num_players, first_seed, max_turns)
+    sim.run()
+    mismatches = []
+    scalar = 0.0
+    for i in range(count):
+        seed = first_seed + i
+        start = time.perf_counter()
+        engine = Engine([Player(f"AI {seat}", is_ai=True) for seat in range(num_players)], seed=seed)
+        engine.setup_game()
+        winner = engine.run(max_turns)
+        scalar += time.perf_counter() - start
+        hands = [[0] * NUM_KINDS for _ in range(num_players)]
+        for seat, player in enumerate(engine.players):
+            for card in player.hand:
+                hands[seat][SORT_RANKS[card.id]] += 1
+        discard = [card.id for card in engine.deck.discard_pile]
+        expected = (NO_WINNER if winner is None else winner, engine.turns, hands,
+                    sorted(card.id for card in engine.deck.cards), discard,
+                    engine.current_player, engine.direction,
+                    -1 if engine.wild_color is None else COLORS.index(engine.wild_color), engine.rng.state)
+        actual = (int(sim.winner[i]), int(sim.turns[i]), sim.hands[i].tolist(),
+                  sorted(sim.pile[i, :sim.pile_len[i]].tolist()), sim.discard[i, :sim.discard_len[i]].tolist(),
+                  int(sim.current[i]), int(sim.direction[i]), int(sim.wild[i]), int(sim.rng[i]))
+        if actual != expected:
+            mismatches.append(seed)
+    return mismatches, scalar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many first-legal-policy UNO games at once with NumPy")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--check", type=int, default=200,
+                        help="also play this many of the games on the scalar engine and compare")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    winners, turns = BatchSimulator(args.games, args.players, args.seed).run()
+    elapsed = time.perf_counter() - start
+    seat_wins = np.bincount(winners[winners != NO_WINNER], minlength=args.players).tolist()
+    report(["first"] * args.players, args.games, seat_wins, int((winners == NO_WINNER).sum()),
+           int(turns.sum()), elapsed)
+
+    if args.check:
+        mismatches, scalar = check_against_engine(args.seed, args.check, args.players)
+        scalar /= args.check
+        print(f"\nScalar engine: {1 / scalar:.0f} games/s; batched is {scalar * args.games / elapsed:.0f}x faster")
+        if mismatches:
+            print(f"{len(mismatches)} of {args.check} games differ from the engine, e.g. seed {mismatches[0]}")
+            raise SystemExit(1)
+        print(f"All {args.check} checked games match the engine")
+
+
+if __name__ == "__main__":
+    main()
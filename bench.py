@@ -0,0 +1,326 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from card import CARDS
+from deck import Deck
+from engine import Engine
+from player import Player
+from rng import SplitMix64
+
+# Baseline timings live next to this file; regenerate with --save on the
+# machine the comparisons will run on
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+
+HAND_SIZES = [7, 15, 30, 50]
+
+# name -> setup function returning the operation to time
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_hand(size, seed=1):
+    rng = SplitMix64(seed)
+    player = Player("bench")
+    for _ in range(size):
+        player.add_card(CARDS[rng.randbelow(len(CARDS))])
+    return player
+
+
+@benchmark("deck.init")
+def bench_deck_init():
+    rng = SplitMix64(1)
+    return lambda: Deck(rng)
+
+
+@benchmark("deck.create_deck")
+def bench_create_deck():
+    deck = Deck(SplitMix64(1))
+
+    def op():
+        deck.cards = []
+        deck.create_deck()
+    return op
+
+
+@benchmark("deck.shuffle")
+def bench_shuffle():
+    return Deck(SplitMix64(1)).shuffle
+
+
+@benchmark("deck.draw_card")
+def bench_draw_card():
+    deck = Deck(SplitMix64(1))
+    full = list(deck.cards)
+
+    def op():
+        # Refill when empty so every timed call is a plain draw
+        if not deck.cards:
+            deck.cards = list(full)
+        deck.draw_card()
+    return op
+
+
+@benchmark("deck.draw_card_reshuffle")
+def bench_draw_card_reshuffle():
+    deck = Deck(SplitMix64(1))
+    discard = list(deck.cards)
+
+    def op():
+        # Every call finds the draw pile empty and recycles 108 cards
+        deck.cards = []
+        deck.discard_pile = list(discard)
+        deck.draw_card()
+    return op
+
+
+for _size in HAND_SIZES:
+    @benchmark(f"player.add_card[{_size}]")
+    def bench_add_card(size=_size):
+        player = make_hand(size)
+        card = CARDS[20]
+
+        def op():
+            player.add_card(card)
+            player.play_card(player.hand.index(card))
+        return op
+
+    @benchmark(f"player.sort_hand[{_size}]")
+    def bench_sort_hand(size=_size):
+        return make_hand(size).sort_hand
+
+    @benchmark(f"player.has_playable_card[{_size}]")
+    def bench_has_playable_card(size=_size):
+        player = make_hand(size)
+        top_card = CARDS[3]
+        return lambda: player.has_playable_card(top_card)
+
+
+@benchmark("engine.ai_game")
+def bench_ai_game():
+    seeds = iter(range(1 << 30))
+
+    def op():
+        engine = Engine([Player(f"AI {i}", is_ai=True) for i in range(4)], seed=next(seeds))
+        engine.setup_game()
+        engine.run()
+    return op
+
+
+@benchmark("batch_sim.run[10000]")
+def bench_batch_sim():
+    from batch_sim import BatchSimulator
+    seeds = iter(range(0, 1 << 40, 10000))
+    return lambda: BatchSimulator(10000, first_seed=next(seeds)).run()
+
+
+def mid_game(turns=20):
+    engine = Engine([Player(f"AI {i}", is_ai=True) for i in range(4)], seed=7)
+    engine.setup_game()
+    while not engine.game_over and engine.turns < turns:
+        engine.ai_turn()
+    return engine
+
+
+@benchmark("engine.snapshot")
+def bench_snapshot():
+    return mid_game().snapshot
+
+
+@benchmark("engine.restore")
+def bench_restore():
+    engine = mid_game()
+    data = engine.snapshot()
+    return lambda: engine.restore(data)
+
+
+@benchmark("engine.clone")
+def bench_clone():
+    return mid_game().clone
+
+
+def setup_gui():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from game import Game
+    # A fixed table with plain AI seats: Game.setup_game would start search
+    # processes and record a replay log on every run
+    game = Game()
+    game.wait_for_assets()
+    players = [Player("You", is_ai=False)] + [Player(f"AI {i}", is_ai=True) for i in range(1, 4)]
+    engine = Engine(players, seed=1)
+    game.attach(engine)
+    engine.setup_game()
+    # Land the dealt cards so frames show the full table
+    game.update_animation(10000)
+    return game
+
+
+@benchmark("game.draw_game")
+def bench_draw_game():
+    # A steady frame: nothing changed since the last one
+    game = setup_gui()
+    game.draw_game()
+    return game.draw_game
+
+
+@benchmark("game.draw_game_full")
+def bench_draw_game_full():
+    # A frame that repaints the whole window
+    game = setup_gui()
+
+    def op():
+        game.renderer.invalidate()
+        game.draw_game()
+    return op
+
+
+@benchmark("game.draw_game_full[25]")
+def bench_draw_game_full_large():
+    # A full repaint with every hand at 25 cards, squeezed to fit
+    game = setup_gui()
+    for player in game.players:
+        player.set_hand([CARDS[i * 7 % len(CARDS)] for i in range(25)])
+
+    def op():
+        game.renderer.invalidate()
+        game.draw_game()
+    return op
+
+
+@benchmark("game.first_frame")
+def bench_first_frame():
+    # Time to first frame from a cold interpreter, imports included; the
+    # process exits as soon as the loading frame is up
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    code = "import os\nfrom game import Game\nGame().draw_loading()\nos._exit(0)"
+    return lambda: subprocess.run([sys.executable, "-c", code], cwd=here, env=env, check=True,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def measure(op, min_time=0.2, repeat=7):
+    # Seconds per call: calibrate a loop count that runs for min_time,
+    # then take the best of several runs. The collector is off while
+    # timing, as in timeit, so a stray collection doesn't land in one run.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(op, min_time, repeat)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _measure(op, min_time, repeat):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed < min_time / 4 else max(2, int(min_time / max(elapsed, 1e-9)))
+
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def format_time(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds * 1e6:8.2f} us"
+
+
+def run(names, min_time):
+    results = {}
+    for name in names:
+        results[name] = measure(BENCHMARKS[name](), min_time)
+        print(f"  {name:32} {format_time(results[name])}", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    # Names of benchmarks slower than baseline by more than threshold
+    regressions = []
+    print(f"\nAgainst baseline ({baseline['machine']}, Python {baseline['python']}):")
+    for name, seconds in results.items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"  {name:32} (no baseline)")
+            continue
+        change = seconds / base - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"  {name:32} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the deck, hand, rules and rendering hot paths")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown over baseline reported as a regression (default 0.25 = 25%%)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run(names, args.min_time)
+
+    if args.save:
+        baseline = {"machine": platform.machine() + " " + platform.processor(),
+                    "python": platform.python_version(), "results": results}
+        if os.path.exists(BASELINE_PATH) and args.filter:
+            # Only replace the benchmarks that were run
+            with open(BASELINE_PATH) as f:
+                old = json.load(f)
+            old["results"].update(results)
+            baseline["results"] = old["results"]
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved baseline to {BASELINE_PATH}")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        print("\nNo baseline yet; run with --save to create one")
+        return
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    regressions = [name for name in results
+                   if name in baseline["results"] and results[name] / baseline["results"][name] - 1 > args.threshold]
+    if regressions:
+        # Timings on a busy machine are noisy; a benchmark only counts as
+        # regressed if it is still slow when measured again
+        print(f"\nRe-measuring {len(regressions)} slow benchmark(s):")
+        for name, seconds in run(regressions, args.min_time).items():
+            results[name] = min(results[name], seconds)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
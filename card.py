@@ -1,110 +1,93 @@
-import pygame
+# Card kinds in a standard UNO deck
+COLORS = ["red", "blue", "green", "yellow"]
+COLOR_VALUES = [str(n) for n in range(10)] + ["Skip", "Reverse", "Draw2"]
+WILD_VALUES = ["Wild", "Wild4"]
+
+# Default card size in pixels
+CARD_WIDTH = 100
+CARD_HEIGHT = 150
+
+
+def card_kinds():
+    # Every distinct (color, value) face, 54 in all
+    kinds = [(color, value) for color in COLORS for value in COLOR_VALUES]
+    kinds += [("wild", value) for value in WILD_VALUES]
+    return kinds
 
-# Card colors
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
-GREEN = (0, 255, 0)
-YELLOW = (255, 255, 0)
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
 
 class Card:
-    def __init__(self, color, value):
-        self.color = color
-        self.value = value
-        self.width = 100
-        self.height = 150
-        self.image = None
-        self.back_image = None
-        self.face_up = True
-        
-    def load_images(self):
-        # Load card images based on color and value
-        try:
-            image_path = f"../assets/cards/{self.color}_{self.value}.png"
-            self.image = pygame.image.load(image_path)
-            self.image = pygame.transform.scale(self.image, (self.width, self.height))
-        except:
-            # Create a card image if file doesn't exist
-            self.image = self.create_card_image()
-            
-        # Create card back
-        self.back_image = self.create_card_back()
-    
-    def create_card_image(self):
-        # Create a surface for the card
-        card_surface = pygame.Surface((self.width, self.height))
-        
-        # Set background color based on card color
-        if self.color == "red":
-            bg_color = RED
-        elif self.color == "blue":
-            bg_color = BLUE
-        elif self.color == "green":
-            bg_color = GREEN
-        elif self.color == "yellow":
-            bg_color = YELLOW
-        else:  # wild cards
-            bg_color = BLACK
-            
-        # Fill the card with background color
-        card_surface.fill(bg_color)
-        
-        # Draw a white rectangle for the card border
-        pygame.draw.rect(card_surface, WHITE, (5, 5, self.width - 10, self.height - 10))
-        
-        # Draw a colored rectangle inside the white border
-        pygame.draw.rect(card_surface, bg_color, (10, 10, self.width - 20, self.height - 20))
-        
-        # Add text for the card value
-        font = pygame.font.SysFont('Arial', 40, bold=True)
-        
-        # Text color is white for dark backgrounds, black for light backgrounds
-        text_color = WHITE if self.color in ["blue", "red", "green", "wild"] else BLACK
-        
-        # Render the text
-        text = font.render(str(self.value), True, text_color)
-        
-        # Position the text in the center of the card
-        text_rect = text.get_rect(center=(self.width // 2, self.height // 2))
-        card_surface.blit(text, text_rect)
-        
-        # Add smaller text in corners
-        small_font = pygame.font.SysFont('Arial', 20, bold=True)
-        small_text = small_font.render(str(self.value), True, text_color)
-        card_surface.blit(small_text, (10, 10))
-        card_surface.blit(small_text, (self.width - 25, self.height - 25))
-        
-        return card_surface
-    
-    def create_card_back(self):
-        # Create a surface for the card back
-        back_surface = pygame.Surface((self.width, self.height))
-        
-        # Fill with dark blue
-        back_surface.fill((0, 0, 100))
-        
-        # Draw a white border
-        pygame.draw.rect(back_surface, WHITE, (5, 5, self.width - 10, self.height - 10), 2)
-        
-        # Draw the UNO logo
-        font = pygame.font.SysFont('Arial', 40, bold=True)
-        text = font.render("UNO", True, WHITE)
-        text_rect = text.get_rect(center=(self.width // 2, self.height // 2))
-        back_surface.blit(text, text_rect)
-        
-        return back_surface
-    
-    def draw(self, surface, x, y):
-        # Draw the card at the specified position
-        if self.face_up:
-            surface.blit(self.image, (x, y))
-        else:
-            surface.blit(self.back_image, (x, y))
-    
-    def flip(self):
-        # Flip the card
-        self.face_up = not self.face_up
-    
+    # Immutable card identity. There is exactly one Card per kind (see
+    # CARDS), so decks and hands hold shared references and cards compare
+    # by identity. How a card is shown (face up or down, its surface) is
+    # up to the renderer, and a wild's chosen color is game state.
+    __slots__ = ("id", "color", "value")
+
+    def __init__(self, id, color, value):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "color", color)
+        object.__setattr__(self, "value", value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("cards are immutable")
+
+    def __reduce__(self):
+        # Unpickle to the shared instance
+        return (get_card, (self.color, self.value))
+
+    def __repr__(self):
+        return f"Card({self.color!r}, {self.value!r})"
+
     def __str__(self):
         return f"{self.color} {self.value}"
+
+
+# The 54 card kinds, indexed by Card.id
+CARDS = [Card(i, color, value) for i, (color, value) in enumerate(card_kinds())]
+_CARDS_BY_KIND = {(card.color, card.value): card for card in CARDS}
+
+
+def get_card(color, value):
+    return _CARDS_BY_KIND[(color, value)]
+
+
+def can_play(card, top_card, wild_color=None):
+    # The one copy of the matching rule. wild_color is the color chosen
+    # for a wild on top of the discard pile, if any.
+
+    # Wild cards can always be played
+    if card.color == "wild":
+        return True
+
+    # If no top card, any card can be played
+    if top_card is None:
+        return True
+
+    # A wild on top stands for its chosen color
+    if top_card.color == "wild":
+        if wild_color is None:
+            return True  # No color chosen yet, anything goes
+        return card.color == wild_color
+
+    # Match color or value
+    return card.color == top_card.color or card.value == top_card.value
+
+
+# Bitmask tables over card ids: bit i stands for CARDS[i]. PLAYABLE_ON[t]
+# has a bit set for every kind that can be played on top card t, built
+# from can_play so the rule itself stays in one place.
+ALL_MASK = (1 << len(CARDS)) - 1
+WILD_MASK = sum(1 << card.id for card in CARDS if card.color == "wild")
+COLOR_MASKS = {color: sum(1 << card.id for card in CARDS if card.color == color) for color in COLORS}
+PLAYABLE_ON = [
+    sum(1 << card.id for card in CARDS if can_play(card, top_card))
+    for top_card in CARDS
+]
+
+
+def playable_mask(top_card, wild_color=None):
+    # Bitmask of every card kind that can be played right now
+    if top_card is None:
+        return ALL_MASK
+    if top_card.color == "wild" and wild_color is not None:
+        return COLOR_MASKS[wild_color] | WILD_MASK
+    return PLAYABLE_ON[top_card.id]
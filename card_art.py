@@ -0,0 +1,149 @@
+import pygame
+from card import CARD_HEIGHT, CARD_WIDTH, card_kinds
+from fonts import render_text
+
+# Card colors
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+GREEN = (0, 255, 0)
+YELLOW = (255, 255, 0)
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+# Process-wide atlas of card surfaces, shared by every Card. Faces are keyed
+# by (color, value, size) and backs by size; each is loaded or rendered once.
+_faces = {}
+_backs = {}
+
+# Opponents' hands as one prebuilt strip of overlapping backs, keyed by
+# (count, spacing, size)
+_strips = {}
+
+# Decoded card art from the asset bundle by "<color>_<value>"; kinds not
+# in here are drawn by create_card_image
+_images = {}
+
+
+def set_card_images(images):
+    # Swap in bundle art and drop faces built before it arrived
+    _images.clear()
+    _images.update(images)
+    _faces.clear()
+
+
+def card_face(color, value, size=(CARD_WIDTH, CARD_HEIGHT)):
+    key = (color, value, size)
+    face = _faces.get(key)
+    if face is None:
+        face = _faces[key] = load_card_face(color, value, size)
+    return face
+
+
+def card_back(size=(CARD_WIDTH, CARD_HEIGHT)):
+    back = _backs.get(size)
+    if back is None:
+        back = _backs[size] = _convert(create_card_back(*size))
+    return back
+
+
+def back_strip(count, spacing, size=(CARD_WIDTH, CARD_HEIGHT)):
+    key = (count, spacing, size)
+    strip = _strips.get(key)
+    if strip is None:
+        width, height = size
+        strip = _strips[key] = _convert(pygame.Surface((width + (count - 1) * spacing, height)))
+        back = card_back(size)
+        for i in range(count):
+            strip.blit(back, (i * spacing, 0))
+    return strip
+
+
+def preload(size=(CARD_WIDTH, CARD_HEIGHT)):
+    # Build all 54 faces and the back up front so no frame pays for them
+    for color, value in card_kinds():
+        card_face(color, value, size)
+    card_back(size)
+
+
+def _convert(surface):
+    # Match the display format for fast blits once a window exists
+    if pygame.display.get_surface() is not None:
+        return surface.convert()
+    return surface
+
+
+def load_card_face(color, value, size):
+    # Card art from the asset bundle if it has this card, else drawn
+    image = _images.get(f"{color}_{value}")
+    if image is None:
+        return _convert(create_card_image(color, value, *size))
+    return _convert(pygame.transform.smoothscale(image, size))
+
+
+def create_card_image(color, value, width, height):
+    # Create a surface for the card
+    card_surface = pygame.Surface((width, height))
+
+    # Set background color based on card color
+    if color == "red":
+        bg_color = RED
+    elif color == "blue":
+        bg_color = BLUE
+    elif color == "green":
+        bg_color = GREEN
+    elif color == "yellow":
+        bg_color = YELLOW
+    else:  # wild cards
+        bg_color = BLACK
+
+    # Fill the card with background color
+    card_surface.fill(bg_color)
+
+    # Draw a white rectangle for the card border
+    pygame.draw.rect(card_surface, WHITE, (5, 5, width - 10, height - 10))
+
+    # Draw a colored rectangle inside the white border
+    pygame.draw.rect(card_surface, bg_color, (10, 10, width - 20, height - 20))
+
+    # Text color is white for dark backgrounds, black for light backgrounds
+    text_color = WHITE if color in ["blue", "red", "green", "wild"] else BLACK
+
+    # Render the text
+    text = render_text(str(value), text_color, size=40, bold=True)
+
+    # Position the text in the center of the card
+    text_rect = text.get_rect(center=(width // 2, height // 2))
+    card_surface.blit(text, text_rect)
+
+    # Add smaller text in corners
+    small_text = render_text(str(value), text_color, size=20, bold=True)
+    card_surface.blit(small_text, (10, 10))
+    card_surface.blit(small_text, (width - 25, height - 25))
+
+    return card_surface
+
+
+def create_card_back(width, height):
+    # Create a surface for the card back
+    back_surface = pygame.Surface((width, height))
+
+    # Fill with dark blue
+    back_surface.fill((0, 0, 100))
+
+    # Draw a white border
+    pygame.draw.rect(back_surface, WHITE, (5, 5, width - 10, height - 10), 2)
+
+    # Draw the UNO logo
+    text = render_text("UNO", WHITE, size=40, bold=True)
+    text_rect = text.get_rect(center=(width // 2, height // 2))
+    back_surface.blit(text, text_rect)
+
+    return back_surface
+
+
+def draw_card(surface, card, x, y, face_up=True, size=(CARD_WIDTH, CARD_HEIGHT)):
+    # Draw the card at the specified position from the shared atlas
+    if face_up:
+        surface.blit(card_face(card.color, card.value, size), (x, y))
+    else:
+        surface.blit(card_back(size), (x, y))
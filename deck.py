@@ -1,63 +1,111 @@
-import random
-from card import Card
+from card import COLORS, can_play, get_card
+from rng import SplitMix64
 
 class Deck:
-    def __init__(self):
+    # The draw pile is never shuffled as a whole. Each draw picks one of
+    # the remaining cards uniformly at random and swaps it to the end to
+    # pop it: one step of a Fisher-Yates shuffle per card drawn. That gives
+    # the same card distribution as shuffling first and drawing off the
+    # top, but a game only pays for the cards it actually draws, and the
+    # order of self.cards means nothing.
+    def __init__(self, rng=None):
+        # Pass a seeded SplitMix64 to make the draws reproducible
+        self.rng = rng if rng is not None else SplitMix64()
         self.cards = []
         self.discard_pile = []
+        self.reshuffles = 0  # Times the discard pile was recycled
         self.create_deck()
-        self.shuffle()
+    
+    def clone(self, rng):
+        # Copy of both piles drawing from rng, skipping the new deck build
+        other = Deck.__new__(Deck)
+        other.rng = rng
+        other.cards = self.cards[:]
+        other.discard_pile = self.discard_pile[:]
+        other.reshuffles = self.reshuffles
+        return other
     
     def create_deck(self):
         # Create a standard UNO deck
-        colors = ["red", "blue", "green", "yellow"]
-        
         # Add number cards (0-9) for each color
-        for color in colors:
+        for color in COLORS:
             # One 0 card per color
-            self.cards.append(Card(color, "0"))
+            self.cards.append(get_card(color, "0"))
             
             # Two of each number 1-9 per color
             for value in range(1, 10):
-                self.cards.append(Card(color, str(value)))
-                self.cards.append(Card(color, str(value)))
+                self.cards.append(get_card(color, str(value)))
+                self.cards.append(get_card(color, str(value)))
             
             # Two of each action card per color
             for action in ["Skip", "Reverse", "Draw2"]:
-                self.cards.append(Card(color, action))
-                self.cards.append(Card(color, action))
+                self.cards.append(get_card(color, action))
+                self.cards.append(get_card(color, action))
         
         # Add wild cards
         for _ in range(4):
-            self.cards.append(Card("wild", "Wild"))
-            self.cards.append(Card("wild", "Wild4"))
+            self.cards.append(get_card("wild", "Wild"))
+            self.cards.append(get_card("wild", "Wild4"))
     
     def shuffle(self):
-        random.shuffle(self.cards)
+        # Draws are random anyway; this only scrambles the stored order
+        self.rng.shuffle(self.cards)
+    
+    def recycle_discard_pile(self):
+        # If deck is empty, turn the discard pile back into the draw pile,
+        # in place: both lists are reused, and the top card, moved along
+        # with the rest, is popped straight back. No shuffle is needed
+        # since draws are random. Returns False if there is nothing to
+        # recycle.
+        if len(self.discard_pile) < 2:
+            return False  # No cards left in the game
+        
+        self.cards.extend(self.discard_pile)
+        self.discard_pile.clear()
+        self.discard_pile.append(self.cards.pop())
+        self.reshuffles += 1
+        return True
     
     def draw_card(self):
-        if not self.cards:
-            # If deck is empty, shuffle the discard pile and use it as the new deck
-            if not self.discard_pile:
-                return None  # No cards left in the game
-            
-            # Keep the top card of the discard pile
-            top_card = self.discard_pile.pop()
-            
-            # Move all other cards from discard pile to deck
-            self.cards = self.discard_pile
-            self.discard_pile = [top_card]
-            
-            # Shuffle the new deck
-            self.shuffle()
+        if not self.cards and not self.recycle_discard_pile():
+            return None
         
-        # Draw a card from the deck
-        card = self.cards.pop()
-        card.load_images()  # Make sure the card has its images loaded
+        # Swap a random card to the end and draw it
+        cards = self.cards
+        i = self.rng.randbelow(len(cards))
+        card = cards[i]
+        cards[i] = cards[-1]
+        cards.pop()
         return card
     
+    def draw_cards(self, count):
+        # Draw up to count cards in one go, in the order draw_card would
+        # give them, reshuffling at most once if the pile runs out partway
+        drawn = self.take(count)
+        if len(drawn) < count and self.recycle_discard_pile():
+            drawn += self.take(count - len(drawn))
+        return drawn
+    
+    def take(self, count):
+        # Draw up to count cards as draw_card would, without recycling
+        cards = self.cards
+        randbelow = self.rng.randbelow
+        drawn = []
+        for _ in range(min(count, len(cards))):
+            i = randbelow(len(cards))
+            drawn.append(cards[i])
+            cards[i] = cards[-1]
+            cards.pop()
+        return drawn
+    
+    def deal(self, players, count):
+        # Deal count cards to each player round-robin, as a dealer would,
+        # handing each player their cards as one batch
+        cards = self.draw_cards(count * len(players))
+        for i, player in enumerate(players):
+            player.add_cards(cards[i::len(players)])
+    
     def add_to_discard(self, card):
-        card.face_up = True  # Make sure the card is face up
         self.discard_pile.append(card)
     
     def top_card(self):
@@ -65,23 +113,6 @@ class Deck:
             return None
         return self.discard_pile[-1]
     
-    def is_playable(self, card):
+    def is_playable(self, card, wild_color=None):
         # Check if a card can be played on the current top card
-        if not self.discard_pile:
-            return True  # First card can be anything
-        
-        top_card = self.top_card()
-        
-        # Wild cards can always be played
-        if card.color == "wild":
-            return True
-        
-        # Match color or value
-        if card.color == top_card.color or card.value == top_card.value:
-            return True
-        
-        # If top card is wild, any card can be played (assuming color has been chosen)
-        if top_card.color == "wild":
-            return True
-        
-        return False
+        return can_play(card, self.top_card(), wild_color)
@@ -0,0 +1,284 @@
+import struct
+from operator import attrgetter
+from card import CARDS, COLORS, can_play
+from deck import Deck
+from player import Player
+from rng import SplitMix64, new_seed
+
+# Snapshot layout: this header, then the draw pile, the discard pile and
+# each hand as a count byte followed by card ids. A 4-player game fits in
+# about 130 bytes.
+#   turns u32, players u8, current seat u8, direction i8, wild color index
+#   u8, flags u8 (GAME_OVER, COLOR_SELECTION), winner seat u8, rng state
+#   u64, discard pile reshuffles u16
+STATE_HEADER = struct.Struct("<IBBbBBBQH")
+NONE = 255  # No wild color or no winner
+GAME_OVER = 1
+COLOR_SELECTION = 2
+
+card_ids = attrgetter("id")
+
+
+class Engine:
+    # Pure-Python UNO rules. Owns the deck, hands, turn order, wild color
+    # choice and winner, and never imports pygame, so whole games can be
+    # stepped headless. The GUI in game.py is a view over one of these.
+    def __init__(self, players=None, num_players=4, seed=None):
+        if players is None:
+            # 1 human, rest AI (same seating as the GUI)
+            players = [Player("You", is_ai=False)]
+            for i in range(1, num_players):
+                players.append(Player(f"AI {i}", is_ai=True))
+
+        # Every game has a seed; the same seed and the same moves give the
+        # same game, which is what replays rely on
+        if seed is None:
+            seed = new_seed()
+        self.seed = seed
+        self.rng = SplitMix64(seed)
+        self.deck = Deck(self.rng)
+        self.players = players
+        self.current_player = 0
+        self.direction = 1  # 1 for clockwise, -1 for counter-clockwise
+        self.game_over = False
+        self.winner = None
+        self.color_selection = False
+        self.wild_color = None  # Color chosen for the wild on top, if any
+        self.turns = 0
+
+        # Callables receiving (event, *args): ("deal", seat, cards),
+        # ("start", first card), ("play", seat, card), ("color", seat,
+        # color), ("draw", seat, card or None), ("penalty", seat, cards),
+        # ("skip", seat), ("reverse", direction), ("uno", seat),
+        # ("turn", turns) once a move is resolved, and ("win", seat)
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, *args):
+        for listener in self.listeners:
+            listener(event, *args)
+
+    def setup_game(self):
+        # Deal 7 cards to each player
+        self.deck.deal(self.players, 7)
+        for seat, player in enumerate(self.players):
+            self.emit("deal", seat, player.hand)
+
+        # Place first card on discard pile
+        first_card = self.deck.draw_card()
+
+        # If first card is a wild card, assign it a color
+        if first_card.color == "wild":
+            self.wild_color = "red"  # Just use red for simplicity
+
+        self.deck.add_to_discard(first_card)
+        self.emit("start", first_card)
+
+    def next_player(self):
+        self.current_player = (self.current_player + self.direction) % len(self.players)
+
+    def skip_next_player(self):
+        self.next_player()
+        self.emit("skip", self.current_player)
+
+    def end_turn(self):
+        # Hand the turn on once a move is fully resolved
+        self.next_player()
+        self.emit("turn", self.turns)
+
+    def handle_special_card(self, card):
+        if card.value == "Skip":
+            self.skip_next_player()  # Skip the next player
+        elif card.value == "Reverse":
+            self.direction *= -1  # Reverse direction
+            self.emit("reverse", self.direction)
+            if len(self.players) == 2:
+                self.skip_next_player()  # In 2-player game, reverse acts like skip
+        elif card.value == "Draw2":
+            self.draw_penalty(2)
+            self.skip_next_player()  # Skip the next player
+        elif card.value == "Wild4":
+            self.draw_penalty(4)
+            self.skip_next_player()  # Skip the next player
+
+    def draw_penalty(self, count):
+        next_player_idx = (self.current_player + self.direction) % len(self.players)
+        cards = self.deck.draw_cards(count)
+        self.players[next_player_idx].add_cards(cards)
+        self.emit("penalty", next_player_idx, cards)
+
+    def play_card(self, card_index):
+        player = self.players[self.current_player]
+        card = player.play_card(card_index)
+
+        if card is None:
+            return None
+
+        self.turns += 1
+        self.emit("play", self.current_player, card)
+
+        # Check for UNO
+        if len(player.hand) == 1:
+            self.emit("uno", self.current_player)
+
+        # Add card to discard pile
+        self.deck.add_to_discard(card)
+        self.wild_color = None
+
+        # Check for win condition
+        if len(player.hand) == 0:
+            self.handle_special_card(card)
+            self.game_over = True
+            self.winner = player
+            self.emit("win", self.players.index(player))
+            return card
+
+        # A wild waits for its color before its effect and the turn change,
+        # so the chooser is still the current player while choosing
+        if card.color == "wild":
+            self.color_selection = True
+        else:
+            self.handle_special_card(card)
+            self.end_turn()
+
+        return card
+
+    def choose_color(self, color):
+        # Record the color chosen for the wild card, then resolve it
+        self.wild_color = color
+        self.color_selection = False
+        self.emit("color", self.current_player, color)
+        self.handle_special_card(self.deck.top_card())
+        self.end_turn()
+
+    def is_playable(self, card):
+        return can_play(card, self.deck.top_card(), self.wild_color)
+
+    def draw_card_for_player(self):
+        player = self.players[self.current_player]
+        card = self.deck.draw_card()
+        self.turns += 1
+
+        if card:
+            player.add_card(card)
+        self.emit("draw", self.current_player, card)
+
+        # The turn passes even if nothing could be drawn, otherwise a game
+        # with every card in hand would never end
+        self.end_turn()
+        return card
+
+    def ai_decide(self, fallback=False):
+        # Pick the current player's move without changing any state, so it
+        # can run off the main thread. Returns (card index or -1 to draw,
+        # color for a wild or None). fallback uses the plain first-legal
+        # policy whatever the player's own policy is: Player's methods are
+        # called directly, so an overridden ai_play or choose_color, which
+        # may be slow or the thing that failed, never runs.
+        player = self.players[self.current_player]
+        if not fallback:
+            return player.decide(self)
+        card_idx = Player.ai_play(player, self.deck.top_card(), self.wild_color)
+        color = None
+        if card_idx >= 0 and player.hand[card_idx].color == "wild":
+            color = Player.choose_color(player)
+        return card_idx, color
+
+    def observe(self, seat=None):
+        # What a seat can see: its own hand, the discard pile and how many
+        # cards everyone holds. Cards are ids so the result pickles small.
+        if seat is None:
+            seat = self.current_player
+        return {
+            "seat": seat,
+            "hand": [card.id for card in self.players[seat].hand],
+            "discard": [card.id for card in self.deck.discard_pile],
+            "hand_sizes": [len(player.hand) for player in self.players],
+            "draw_pile_size": len(self.deck.cards),
+            "current_player": self.current_player,
+            "direction": self.direction,
+            "wild_color": self.wild_color,
+        }
+
+    def apply_move(self, card_idx, color=None):
+        if card_idx >= 0:
+            # Player has a playable card
+            self.play_card(card_idx)
+
+            # If a wild card was played, set its color
+            if self.color_selection:
+                self.choose_color(color)
+        else:
+            # No playable card, draw one
+            self.draw_card_for_player()
+
+    def snapshot(self):
+        # The whole game state as bytes, for keyframes, saves and sending
+        # over the wire. Listeners and seat policies are not included.
+        wild = NONE if self.wild_color is None else COLORS.index(self.wild_color)
+        winner = NONE if self.winner is None else self.players.index(self.winner)
+        flags = (GAME_OVER if self.game_over else 0) | (COLOR_SELECTION if self.color_selection else 0)
+        parts = [STATE_HEADER.pack(self.turns, len(self.players), self.current_player, self.direction,
+                                   wild, flags, winner, self.deck.rng.getstate(), min(self.deck.reshuffles, 0xFFFF))]
+        for cards in [self.deck.cards, self.deck.discard_pile] + [player.hand for player in self.players]:
+            parts.append(bytes((len(cards),)))
+            parts.append(bytes(map(card_ids, cards)))
+        return b"".join(parts)
+
+    def restore(self, data):
+        # Load a snapshot into this engine, which must have as many seats
+        # as the one it was taken from. Returns the engine.
+        (turns, num_players, current, direction, wild, flags, winner, rng_state,
+         reshuffles) = STATE_HEADER.unpack_from(data)
+        if num_players != len(self.players):
+            raise ValueError(f"snapshot is for {num_players} players, not {len(self.players)}")
+        pos = STATE_HEADER.size
+        piles = []
+        for _ in range(2 + num_players):
+            end = pos + 1 + data[pos]
+            piles.append(list(map(CARDS.__getitem__, data[pos + 1:end])))
+            pos = end
+
+        self.turns = turns
+        self.current_player = current
+        self.direction = direction
+        self.wild_color = None if wild == NONE else COLORS[wild]
+        self.game_over = bool(flags & GAME_OVER)
+        self.color_selection = bool(flags & COLOR_SELECTION)
+        self.winner = None if winner == NONE else self.players[winner]
+        self.deck.rng.setstate(rng_state)
+        self.deck.reshuffles = reshuffles
+        self.deck.cards = piles[0]
+        self.deck.discard_pile = piles[1]
+        for player, hand in zip(self.players, piles[2:]):
+            player.load_hand(hand)
+        return self
+
+    def clone(self):
+        # An independent copy to search or simulate on, without going
+        # through bytes. Cards are shared flyweights, so only the piles,
+        # hands and RNG are copied; the clone has no listeners.
+        other = Engine.__new__(Engine)
+        other.__dict__.update(self.__dict__)
+        other.rng = SplitMix64(self.rng.state)
+        other.deck = self.deck.clone(other.rng)
+        other.players = [player.clone() for player in self.players]
+        if self.winner is not None:
+            other.winner = other.players[self.players.index(self.winner)]
+        other.listeners = []
+        return other
+
+    def ai_turn(self):
+        self.apply_move(*self.ai_decide())
+
+    def run(self, max_turns=10000):
+        # Play every seat with its AI policy until someone wins; returns
+        # the winning seat, or None if the turn limit was hit
+        while not self.game_over and self.turns < max_turns:
+            self.ai_turn()
+
+        if self.winner is None:
+            return None
+        return self.players.index(self.winner)
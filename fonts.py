@@ -0,0 +1,33 @@
+import pygame
+from collections import OrderedDict
+
+# Fonts resolved once per (face, size, bold); SysFont lookups hit the
+# system font database and are far too slow to repeat every frame
+_fonts = {}
+
+# Bounded LRU of rendered labels keyed by (font, text, color)
+MAX_TEXTS = 256
+_texts = OrderedDict()
+
+
+def get_font(face='Arial', size=24, bold=False):
+    key = (face, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(face, size, bold=bold)
+    return font
+
+
+def render_text(text, color, face='Arial', size=24, bold=False):
+    # Return a cached surface, rasterizing only labels not seen recently
+    key = (face, size, bold, text, color)
+    surface = _texts.get(key)
+    if surface is not None:
+        _texts.move_to_end(key)
+        return surface
+
+    surface = get_font(face, size, bold).render(text, True, color)
+    _texts[key] = surface
+    if len(_texts) > MAX_TEXTS:
+        _texts.popitem(last=False)
+    return surface
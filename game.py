@@ -1,8 +1,32 @@
+import multiprocessing
+import os
 import pygame
 import sys
 import time
-from deck import Deck
+from ai_scheduler import AITurnScheduler
+from assets import install_assets, read_assets
+from card_art import back_strip, card_back, card_face, draw_card
+from concurrent.futures import ThreadPoolExecutor
+from fonts import render_text
+from engine import Engine
+from layout import MIN_SPACING, TableLayout
+from ismcts import ISMCTSPlayer, search_pool
 from player import Player
+from profiler import Profiler
+from renderer import Renderer
+from replay import ReplayWriter, prune_logs
+from rng import new_seed
+from telemetry import Telemetry
+from tween import TweenScheduler
+
+# Every game is recorded here, one log per seed (see replay.py); only the
+# most recent REPLAY_KEEP logs are kept
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "replays")
+REPLAY_KEEP = 50
+
+# Chrome trace exports from the frame profiler (F4, or on quit when
+# started with UNO_PROFILE=1)
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
 
 # Colors
 BLACK = (0, 0, 0)
@@ -13,9 +37,23 @@ BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 BACKGROUND_COLOR = (50, 50, 80)
 
+# Card flight times in ms
+PLAY_TIME = 300
+DEAL_TIME = 250
+DEAL_STAGGER = 40
+DRAW_TIME = 300
+
+# How often to check on an AI decision that is due but not ready, in ms
+IDLE_POLL = 16
+
 class Game:
     def __init__(self):
-        pygame.init()
+        self.start_time = time.perf_counter()
+        
+        # Only the display and fonts are needed for the first frame; the
+        # mixer is started by the asset loader
+        pygame.display.init()
+        pygame.font.init()
         
         # Set up the display
         self.width = 1024
@@ -23,489 +61,671 @@ class Game:
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("UNO Game")
         
-        # Load fonts
-        self.font = pygame.font.SysFont('Arial', 24)
-        self.large_font = pygame.font.SysFont('Arial', 36)
-        
-        # Game state
-        self.deck = Deck()
-        self.players = []
-        self.current_player = 0
-        self.direction = 1  # 1 for clockwise, -1 for counter-clockwise
-        self.game_over = False
-        self.winner = None
+        # Sounds and card images load on a background thread while the
+        # loading frame is up; fonts and the card atlas are built on this
+        # thread in wait_for_assets
+        loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="assets")
+        self.assets = loader.submit(read_assets)
+        loader.shutdown(wait=False)
+        self.first_frame_time = None
+        self.assets_ready_time = None
+        
+        # Only regions that change are repainted; static art is built once
+        # the fonts are loaded
+        self.renderer = Renderer(self.screen, BACKGROUND_COLOR)
+        self.layout = TableLayout(self.width, self.height)
+        self.draw_pile_image = None
+        self.color_buttons = []
+        
+        # Game state lives in the rules engine; this class only draws it
+        self.engine = None
+        self.replay_file = None
         self.selected_card = -1
-        self.color_selection = False
-        self.chosen_color = None
-        
-        # Animation variables
-        self.animation_active = False
-        self.animation_card = None
-        self.animation_start_pos = (0, 0)
-        self.animation_end_pos = (0, 0)
-        self.animation_progress = 0
-        self.animation_speed = 0.05
-        
-        # Sound effects
-        pygame.mixer.init()
-        try:
-            self.card_play_sound = pygame.mixer.Sound("../assets/card_play.wav")
-            self.card_draw_sound = pygame.mixer.Sound("../assets/card_draw.wav")
-            self.uno_sound = pygame.mixer.Sound("../assets/uno.wav")
-            self.win_sound = pygame.mixer.Sound("../assets/win.wav")
-        except:
-            print("Sound files not found. Continuing without sound.")
-            self.card_play_sound = None
-            self.card_draw_sound = None
-            self.uno_sound = None
-            self.win_sound = None
+        self.reveal_hands = False  # Show the AI hands face up, e.g. for review
+        
+        # AI moves are decided on a worker thread and shown after a short
+        # pacing delay, so the loop keeps rendering while the AI thinks
+        self.ai_scheduler = AITurnScheduler(delay=500)
+        
+        # AI seats play the plain first-legal policy unless UNO_AI=ismcts
+        # asks for the search player. It wins more, mostly through the
+        # heuristic it falls back on, and keeps every core but one busy on
+        # its turns (see the README). Its seats share one pool of search
+        # processes, as only one of them thinks at a time; see
+        # start_search_pool.
+        self.search = os.environ.get("UNO_AI") == "ismcts"
+        self.search_pool = None
+        self.search_workers = max(1, multiprocessing.cpu_count() - 1)
+        
+        # Frame profiler, off unless UNO_PROFILE=1; F3 toggles an on-screen
+        # p50/p99 readout, profiling while it is up, and F4 saves a Chrome
+        # trace
+        self.profiler = Profiler(enabled=os.environ.get("UNO_PROFILE") == "1")
+        self.profile_from_start = self.profiler.enabled
+        self.show_profile = False
+        self.profile_lines = []
+        
+        # Game statistics, recorded only when UNO_TELEMETRY names a
+        # directory for them (see telemetry.py)
+        telemetry_dir = os.environ.get("UNO_TELEMETRY")
+        self.telemetry = Telemetry(telemetry_dir, turns=True) if telemetry_dir else None
+        self.game_recorder = None
+        
+        # Cards in flight. A played card lands on the discard pile, which
+        # keeps showing the card underneath until then; dealt and drawn
+        # cards are held back from their hand until they arrive.
+        self.tweens = TweenScheduler()
+        self.landing_plays = 0
+        self.incoming = []
+        self.play_origin = None
+        
+        # Each hand is drawn as one cached surface, rebuilt only when its
+        # cards, layout, selection or cards in flight change: per seat,
+        # (key, surface)
+        self.hand_surfaces = []
+        
+        # Sound effects, None until loaded or if the bundle has none
+        self.card_play_sound = None
+        self.card_draw_sound = None
+        self.uno_sound = None
+        self.win_sound = None
+    
+    # Read-only views of the engine state used by the drawing code
+    @property
+    def deck(self):
+        return self.engine.deck
+    
+    @property
+    def players(self):
+        return self.engine.players
+    
+    @property
+    def current_player(self):
+        return self.engine.current_player
+    
+    @property
+    def direction(self):
+        return self.engine.direction
+    
+    @property
+    def game_over(self):
+        return self.engine.game_over
+    
+    @property
+    def winner(self):
+        return self.engine.winner
+    
+    @property
+    def color_selection(self):
+        return self.engine.color_selection
+    
+    def draw_loading(self):
+        # The first frame: shown straight away, before any assets
+        font = pygame.font.Font(None, 48)
+        text = font.render("Loading...", True, WHITE)
+        self.renderer.blit(text, text.get_rect(center=(self.width // 2, self.height // 2)))
+        self.renderer.present()
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - self.start_time
+    
+    def wait_for_assets(self):
+        # Finish startup once the loader is done (blocking if it isn't)
+        if self.assets is None:
+            return
+        sounds = install_assets(self.assets.result())
+        self.assets = None
+        self.assets_ready_time = time.perf_counter() - self.start_time
+        
+        self.card_play_sound = sounds["card_play"]
+        self.card_draw_sound = sounds["card_draw"]
+        self.uno_sound = sounds["uno"]
+        self.win_sound = sounds["win"]
+        self.draw_pile_image = self.create_draw_pile()
+        self.color_buttons = self.create_color_buttons()
+        
+        if self.profiler.enabled:
+            first_frame = "-" if self.first_frame_time is None else f"{self.first_frame_time * 1000:.0f} ms"
+            print(f"First frame after {first_frame}, assets ready after {self.assets_ready_time * 1000:.0f} ms")
     
     def setup_game(self, num_players=4):
-        # Create players (1 human, rest AI)
-        self.players = [Player("You", is_ai=False)]
-        
+        # Create the rules engine (1 human, rest AI) and deal. Searching AI
+        # seats search for a little less than the pacing delay between
+        # turns, in worker processes so the search never competes with
+        # rendering.
+        self.wait_for_assets()
+        self.start_search_pool()
+        players = [Player("You", is_ai=False)]
         for i in range(1, num_players):
-            self.players.append(Player(f"AI {i}", is_ai=True))
-        
-        # Deal 7 cards to each player
-        for _ in range(7):
-            for player in self.players:
-                card = self.deck.draw_card()
-                if card:
-                    player.add_card(card)
-        
-        # Place first card on discard pile
-        first_card = self.deck.draw_card()
-        
-        # If first card is a wild card, assign it a random color
-        if first_card.color == "wild":
-            colors = ["red", "blue", "green", "yellow"]
-            first_card.color = colors[0]  # Just use red for simplicity
-        
-        self.deck.add_to_discard(first_card)
-    
-    def next_player(self):
-        self.current_player = (self.current_player + self.direction) % len(self.players)
-    
-    def handle_special_card(self, card):
-        if card.value == "Skip":
-            self.next_player()  # Skip the next player
-        elif card.value == "Reverse":
-            self.direction *= -1  # Reverse direction
-            if len(self.players) == 2:
-                self.next_player()  # In 2-player game, reverse acts like skip
-        elif card.value == "Draw2":
-            next_player_idx = (self.current_player + self.direction) % len(self.players)
-            # Draw 2 cards for the next player
-            for _ in range(2):
-                new_card = self.deck.draw_card()
-                if new_card:
-                    self.players[next_player_idx].add_card(new_card)
-            self.next_player()  # Skip the next player
-        elif card.value == "Wild4":
-            next_player_idx = (self.current_player + self.direction) % len(self.players)
-            # Draw 4 cards for the next player
-            for _ in range(4):
-                new_card = self.deck.draw_card()
-                if new_card:
-                    self.players[next_player_idx].add_card(new_card)
-            self.next_player()  # Skip the next player
-    
-    def play_card(self, card_index):
-        player = self.players[self.current_player]
-        card = player.play_card(card_index)
-        
-        if card:
-            # Play sound
-            if self.card_play_sound:
-                self.card_play_sound.play()
-            
-            # Check for UNO
-            if len(player.hand) == 1 and self.uno_sound:
-                self.uno_sound.play()
-            
-            # Add card to discard pile
-            self.deck.add_to_discard(card)
-            
-            # Handle special cards
-            self.handle_special_card(card)
-            
-            # Check for win condition
-            if len(player.hand) == 0:
-                self.game_over = True
-                self.winner = player
-                if self.win_sound:
-                    self.win_sound.play()
-                return
-            
-            # If wild card was played, player needs to choose a color
-            if card.color == "wild":
-                self.color_selection = True
+            if self.search:
+                players.append(ISMCTSPlayer(f"AI {i}", time_budget=0.4, workers=self.search_workers,
+                                            pool=self.search_pool))
             else:
-                self.next_player()
+                players.append(Player(f"AI {i}", is_ai=True))
+        self.engine = Engine(players, seed=new_seed())
+        if self.telemetry is not None:
+            # A game abandoned by a restart goes down as unfinished
+            if self.game_recorder is not None and self.game_recorder.engine.turns:
+                self.game_recorder.finish()
+            self.game_recorder = self.telemetry.watch(self.engine, self.engine.seed)
+        self.attach(self.engine)
+        self.start_replay()
+        self.engine.setup_game()
+        self.ai_scheduler.cancel()
     
-    def draw_card_for_player(self):
-        player = self.players[self.current_player]
-        card = self.deck.draw_card()
-        
-        if card:
-            # Play sound
-            if self.card_draw_sound:
-                self.card_draw_sound.play()
-                
-            player.add_card(card)
-            
-            # Check if the drawn card can be played
-            if self.deck.is_playable(card):
-                # In a real game, player would have the option to play the drawn card
-                # For simplicity, we'll just move to the next player
-                pass
-            
-            self.next_player()
+    def attach(self, engine):
+        # Show engine's game: reset the view and follow its events. Call
+        # before engine.setup_game() for the deal to be animated.
+        self.engine = engine
+        self.tweens.clear()
+        self.landing_plays = 0
+        self.incoming = [[] for _ in engine.players]
+        self.hand_surfaces = [(None, None)] * len(engine.players)
+        self.selected_card = -1
+        engine.add_listener(self.on_engine_event)
+    
+    def start_replay(self):
+        # Record the new game under its seed so it can be replayed
+        self.close_replay()
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        prune_logs(REPLAY_DIR, REPLAY_KEEP - 1)
+        path = os.path.join(REPLAY_DIR, f"{self.engine.seed:016x}.unor")
+        self.replay_file = open(path, "wb")
+        ReplayWriter(self.engine, self.replay_file)
+        pygame.display.set_caption(f"UNO Game (seed {self.engine.seed:016x})")
+    
+    def close_replay(self):
+        if self.replay_file is not None:
+            self.replay_file.close()
+            self.replay_file = None
+    
+    def on_engine_event(self, event, *args):
+        # A selection is only good for the turn it was made in and the hand
+        # it was made from
+        if event == "turn" or (event in ("draw", "penalty", "deal") and args[0] == 0):
+            self.selected_card = -1
+        
+        # Animate cards moving between the piles and the hands
+        if event == "play":
+            self.animate_play(*args)
+        elif event == "draw" and args[1] is not None:
+            self.animate_draw(args[0], [args[1]], DRAW_TIME)
+        elif event == "penalty":
+            self.animate_draw(args[0], args[1], DRAW_TIME, PLAY_TIME // 2, DEAL_STAGGER * 2)
+        elif event == "deal":
+            self.animate_draw(args[0], args[1], DEAL_TIME, args[0] * DEAL_STAGGER, DEAL_STAGGER * len(self.players))
+        
+        # Play sounds for things that happen in the rules
+        if event == "play":
+            sound = self.card_play_sound
+        elif event == "draw" and args[1] is not None:
+            sound = self.card_draw_sound
+        elif event == "uno":
+            sound = self.uno_sound
+        elif event == "win":
+            sound = self.win_sound
+        else:
+            sound = None
+        
+        if sound:
+            sound.play()
     
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, woken_by=None):
+        # woken_by is the event the idle wait returned, handled ahead of
+        # everything queued after it
+        events = pygame.event.get()
+        if woken_by is not None:
+            events.insert(0, woken_by)
+        for event in events:
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.quit()
+            
+            # The window contents were lost, repaint all of it
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.renderer.invalidate()
+            
+            # Profiler hotkeys work at any time
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.toggle_profile()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                self.export_profile()
+            
+            # Scroll a hand too long for the window, whoever's turn it is
+            if event.type == pygame.MOUSEWHEEL:
+                self.layout.scroll_by(-event.y * MIN_SPACING * 2)
+            
+            # Restart or quit once the game is over
+            if self.game_over:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_r:
+                        self.setup_game()
+                    elif event.key == pygame.K_q:
+                        self.quit()
+                continue
             
             # Only handle events if it's the human player's turn and no animation is active
-            if self.current_player == 0 and not self.animation_active:
+            if self.current_player == 0 and not self.tweens.active:
                 player = self.players[self.current_player]
                 
-                if event.type == pygame.MOUSEBUTTONDOWN:
+                # Left button only: each wheel notch also sends a button 4
+                # or 5 press, which must scroll rather than play a card
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    self.layout.update(self.players)
+                    
                     # Handle color selection if needed
                     if self.color_selection:
-                        mouse_x, mouse_y = pygame.mouse.get_pos()
-                        
-                        # Check if a color button was clicked
-                        button_width = 100
-                        button_height = 50
-                        button_y = self.height // 2
-                        
-                        # Red button
-                        if self.width // 2 - 220 <= mouse_x <= self.width // 2 - 120 and button_y <= mouse_y <= button_y + button_height:
-                            self.deck.top_card().color = "red"
-                            self.color_selection = False
-                            self.next_player()
-                        
-                        # Blue button
-                        elif self.width // 2 - 110 <= mouse_x <= self.width // 2 - 10 and button_y <= mouse_y <= button_y + button_height:
-                            self.deck.top_card().color = "blue"
-                            self.color_selection = False
-                            self.next_player()
-                        
-                        # Green button
-                        elif self.width // 2 + 10 <= mouse_x <= self.width // 2 + 110 and button_y <= mouse_y <= button_y + button_height:
-                            self.deck.top_card().color = "green"
-                            self.color_selection = False
-                            self.next_player()
-                        
-                        # Yellow button
-                        elif self.width // 2 + 120 <= mouse_x <= self.width // 2 + 220 and button_y <= mouse_y <= button_y + button_height:
-                            self.deck.top_card().color = "yellow"
-                            self.color_selection = False
-                            self.next_player()
+                        color = self.layout.button_at(event.pos)
+                        if color is not None:
+                            self.engine.choose_color(color)
                     
                     else:
-                        # Check if a card in the player's hand was clicked
-                        mouse_x, mouse_y = pygame.mouse.get_pos()
-                        card_width = 100
-                        card_height = 150
-                        card_spacing = 30
-                        
-                        # Calculate the position of the player's hand
-                        hand_x = self.width // 2 - (len(player.hand) * card_spacing) // 2
-                        hand_y = self.height - card_height - 20
-                        
-                        for i in range(len(player.hand)):
-                            card_x = hand_x + i * card_spacing
-                            
-                            # Check if this card was clicked
-                            if card_x <= mouse_x <= card_x + card_width and hand_y <= mouse_y <= hand_y + card_height:
-                                # Check if the card can be played
-                                if player.is_card_playable(player.hand[i], self.deck.top_card()):
-                                    # Start animation
-                                    self.animation_active = True
-                                    self.animation_card = player.hand[i]
-                                    self.animation_start_pos = (card_x, hand_y)
-                                    self.animation_end_pos = (self.width // 2 - card_width // 2, self.height // 2 - card_height // 2)
-                                    self.animation_progress = 0
-                                    self.selected_card = i
-                                break
+                        # Check if a card in the player's hand was clicked,
+                        # taking the topmost where the fan overlaps
+                        i = self.layout.card_at(0, event.pos, self.selected_card)
+                        if i >= 0:
+                            # Check if the card can be played
+                            if self.engine.is_playable(player.hand[i]):
+                                self.play_human_card(i)
                         
                         # Check if the draw pile was clicked
-                        draw_pile_x = self.width // 2 - 150
-                        draw_pile_y = self.height // 2 - card_height // 2
-                        
-                        if draw_pile_x <= mouse_x <= draw_pile_x + card_width and draw_pile_y <= mouse_y <= draw_pile_y + card_height:
-                            self.draw_card_for_player()
+                        elif self.layout.draw_pile.collidepoint(event.pos):
+                            self.engine.draw_card_for_player()
                 
                 elif event.type == pygame.KEYDOWN:
                     # Select cards with number keys
                     if pygame.K_1 <= event.key <= pygame.K_9:
                         card_idx = event.key - pygame.K_1
                         if card_idx < len(player.hand):
-                            if player.is_card_playable(player.hand[card_idx], self.deck.top_card()):
+                            if self.engine.is_playable(player.hand[card_idx]):
                                 self.selected_card = card_idx
-                                
-                                # Start animation
-                                card_spacing = 30
-                                hand_x = self.width // 2 - (len(player.hand) * card_spacing) // 2
-                                hand_y = self.height - 150 - 20
-                                card_x = hand_x + card_idx * card_spacing
-                                
-                                self.animation_active = True
-                                self.animation_card = player.hand[card_idx]
-                                self.animation_start_pos = (card_x, hand_y)
-                                self.animation_end_pos = (self.width // 2 - 50, self.height // 2 - 75)
-                                self.animation_progress = 0
                     
                     # Play selected card with Enter
                     elif event.key == pygame.K_RETURN:
                         if 0 <= self.selected_card < len(player.hand):
-                            if player.is_card_playable(player.hand[self.selected_card], self.deck.top_card()):
-                                # Start animation
-                                card_spacing = 30
-                                hand_x = self.width // 2 - (len(player.hand) * card_spacing) // 2
-                                hand_y = self.height - 150 - 20
-                                card_x = hand_x + self.selected_card * card_spacing
-                                
-                                self.animation_active = True
-                                self.animation_card = player.hand[self.selected_card]
-                                self.animation_start_pos = (card_x, hand_y)
-                                self.animation_end_pos = (self.width // 2 - 50, self.height // 2 - 75)
-                                self.animation_progress = 0
+                            if self.engine.is_playable(player.hand[self.selected_card]):
+                                self.play_human_card(self.selected_card)
                     
                     # Draw card with D key
                     elif event.key == pygame.K_d:
-                        self.draw_card_for_player()
+                        self.engine.draw_card_for_player()
     
-    def update_animation(self):
-        if self.animation_active:
-            self.animation_progress += self.animation_speed
-            
-            if self.animation_progress >= 1:
-                self.animation_active = False
-                self.play_card(self.selected_card)
-                self.selected_card = -1
+    def play_human_card(self, index):
+        # Play straight away; the card flies from where it sat in the hand
+        self.layout.update(self.players)
+        rect = self.layout.card_rect(0, index, self.selected_card)
+        self.play_origin = rect.clamp(self.layout.areas[0]).topleft
+        self.selected_card = -1
+        self.engine.play_card(index)
+        self.play_origin = None
+    
+    def animate_play(self, seat, card):
+        # From the player's hand to the discard pile
+        if self.play_origin is not None:
+            start = self.play_origin
+        else:
+            self.layout.update(self.players)
+            x, y = self.layout.origins[seat]
+            start = (x + len(self.players[seat].hand) * self.layout.spacings[seat] // 2, y)
+        self.landing_plays += 1
+        self.tweens.add(card_face(card.color, card.value), start, self.layout.discard.topleft, PLAY_TIME,
+                        on_done=self.land_play)
+    
+    def land_play(self):
+        self.landing_plays -= 1
+    
+    def animate_draw(self, seat, cards, duration, delay=0, stagger=0):
+        # From the draw pile to each card's place in the hand, stagger ms
+        # apart; the hand leaves them out until they land
+        player = self.players[seat]
+        self.layout.update(self.players)
+        for i, card in enumerate(cards):
+            surface = card_face(card.color, card.value) if seat == 0 or self.reveal_hands else card_back()
+            end = self.layout.card_rect(seat, player.hand.index(card)).clamp(self.layout.areas[seat]).topleft
+            self.incoming[seat].append(card)
+            self.tweens.add(surface, self.layout.draw_pile.topleft, end, duration, delay + i * stagger,
+                            on_done=lambda seat=seat, card=card: self.incoming[seat].remove(card))
+    
+    def update_animation(self, dt):
+        # Advance every card in flight by the frame's time in ms
+        self.tweens.update(dt)
     
     def ai_turn(self):
-        if self.current_player != 0 and not self.animation_active and not self.color_selection:
-            player = self.players[self.current_player]
-            
-            # Add a small delay to make AI turns visible
-            pygame.time.delay(500)
+        if self.current_player != 0 and not self.tweens.active and not self.color_selection:
+            now = int(time.perf_counter() * 1000)
             
-            # AI plays a card
-            card_idx = player.ai_play(self.deck.top_card())
+            # Start the AI thinking; the move is applied on a later frame
+            if not self.ai_scheduler.thinking:
+                self.ai_scheduler.start(self.engine, now)
+                return
             
-            if card_idx >= 0:
-                # AI has a playable card
-                self.play_card(card_idx)
-                
-                # If AI played a wild card, choose a color
-                if self.color_selection:
-                    # Simple strategy: choose the most common color in hand
-                    color_counts = {"red": 0, "blue": 0, "green": 0, "yellow": 0}
-                    
-                    for card in player.hand:
-                        if card.color in color_counts:
-                            color_counts[card.color] += 1
-                    
-                    # Find the most common color
-                    max_count = 0
-                    chosen_color = "red"  # Default
-                    
-                    for color, count in color_counts.items():
-                        if count > max_count:
-                            max_count = count
-                            chosen_color = color
-                    
-                    # Set the color of the wild card
-                    self.deck.top_card().color = chosen_color
-                    self.color_selection = False
-                    self.next_player()
-            else:
-                # AI has no playable card, draw one
-                self.draw_card_for_player()
+            move = self.ai_scheduler.poll(now)
+            if move is not None and self.ai_scheduler.is_current(self.engine):
+                self.engine.apply_move(*move)
     
-    def draw_game(self):
-        # Fill the background
-        self.screen.fill(BACKGROUND_COLOR)
-        
-        # Draw the deck and discard pile
+    def idle_timeout(self):
+        # How long the loop may sleep before something needs doing, in ms:
+        # 0 while cards are moving or an AI turn needs starting, the time
+        # left on the AI's pacing delay while it thinks, and None (until
+        # the next input) when the table is waiting on the human
+        if self.tweens.active or self.show_profile:
+            return 0
+        if self.game_over or self.current_player == 0 or self.color_selection:
+            return None
+        if not self.ai_scheduler.thinking:
+            return 0
+        return max(self.ai_scheduler.ready_at - int(time.perf_counter() * 1000), IDLE_POLL)
+    
+    def wait_for_event(self, timeout):
+        # Sleep until input arrives or timeout ms pass. Returns the event
+        # that woke the loop, or None, for the next handle_events: posting
+        # it back would queue it behind events that came in after it.
+        if timeout is None:
+            event = pygame.event.wait()
+        else:
+            event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return None
+        return event
+    
+    def create_draw_pile(self):
+        # Face-down draw pile art
         card_width = 100
         card_height = 150
         
+        surface = pygame.Surface((card_width, card_height)).convert()
+        surface.fill((0, 0, 100))
+        pygame.draw.rect(surface, WHITE, (5, 5, card_width - 10, card_height - 10), 2)
+        
+        # Draw UNO text on the draw pile
+        draw_text = render_text("UNO", WHITE)
+        surface.blit(draw_text, (30, card_height // 2 - 15))
+        return surface
+    
+    def create_color_buttons(self):
+        # Pre-rendered color picker buttons, placed by the layout
+        styles = {
+            "red": (RED, "Red", WHITE, 30),
+            "blue": (BLUE, "Blue", WHITE, 30),
+            "green": (GREEN, "Green", BLACK, 25),
+            "yellow": (YELLOW, "Yellow", BLACK, 20),
+        }
+        
+        buttons = []
+        for name, rect in self.layout.buttons:
+            color, label, text_color, text_x = styles[name]
+            surface = pygame.Surface(rect.size).convert()
+            surface.fill(color)
+            surface.blit(render_text(label, text_color), (text_x, 15))
+            buttons.append((surface, rect.topleft))
+        return buttons
+    
+    def draw_game(self):
+        # Everything is blitted into the renderer, which works out what
+        # changed since the last frame; the background is its static layer.
+        # Positions come from the layout, rebuilt only when hands change.
+        self.layout.update(self.players)
+        
         # Draw pile (face down)
         if self.deck.cards:
-            pygame.draw.rect(self.screen, (0, 0, 100), (self.width // 2 - 150, self.height // 2 - card_height // 2, card_width, card_height))
-            pygame.draw.rect(self.screen, WHITE, (self.width // 2 - 150 + 5, self.height // 2 - card_height // 2 + 5, card_width - 10, card_height - 10), 2)
-            
-            # Draw UNO text on the draw pile
-            draw_text = self.font.render("UNO", True, WHITE)
-            self.screen.blit(draw_text, (self.width // 2 - 150 + 30, self.height // 2 - 15))
+            self.renderer.blit(self.draw_pile_image, self.layout.draw_pile)
         
-        # Discard pile (top card face up)
-        top_card = self.deck.top_card()
-        if top_card:
-            top_card.draw(self.screen, self.width // 2 + 50, self.height // 2 - card_height // 2)
+        # Discard pile (top card face up), less any played cards still on their way
+        discard_pile = self.deck.discard_pile
+        if len(discard_pile) > self.landing_plays:
+            draw_card(self.renderer, discard_pile[-1 - self.landing_plays], *self.layout.discard.topleft)
         
         # Draw players' hands
-        self.draw_players()
+        with self.profiler.section("draw_players"):
+            self.draw_players()
         
-        # Draw animation if active
-        if self.animation_active:
-            # Calculate current position
-            x = self.animation_start_pos[0] + (self.animation_end_pos[0] - self.animation_start_pos[0]) * self.animation_progress
-            y = self.animation_start_pos[1] + (self.animation_end_pos[1] - self.animation_start_pos[1]) * self.animation_progress
-            
-            # Draw the card
-            self.animation_card.draw(self.screen, int(x), int(y))
+        # Draw cards in flight
+        self.tweens.draw(self.renderer)
         
         # Draw color selection UI if needed
         if self.color_selection and self.current_player == 0:
             self.draw_color_selection()
         
         # Draw current player indicator
-        current_player_text = self.font.render(f"Current Player: {self.players[self.current_player].name}", True, WHITE)
-        self.screen.blit(current_player_text, (20, 20))
+        current_player_text = render_text(f"Current Player: {self.players[self.current_player].name}", WHITE)
+        self.renderer.blit(current_player_text, (20, 20))
         
         # Draw direction indicator
         direction_text = "Direction: " + ("Clockwise" if self.direction == 1 else "Counter-Clockwise")
-        direction_surface = self.font.render(direction_text, True, WHITE)
-        self.screen.blit(direction_surface, (20, 50))
+        direction_surface = render_text(direction_text, WHITE)
+        self.renderer.blit(direction_surface, (20, 50))
+        
+        # Draw the color chosen for a wild on the discard pile
+        if self.engine.wild_color:
+            color_surface = render_text(f"Color: {self.engine.wild_color.capitalize()}", WHITE)
+            self.renderer.blit(color_surface, (20, 80))
         
         # Draw game over message if game is over
         if self.game_over:
             self.draw_game_over()
         
-        # Update the display
-        pygame.display.flip()
+        # Frame timings, if asked for
+        if self.show_profile:
+            self.draw_profile()
+        
+        # Push only the changed regions to the display
+        with self.profiler.section("present"):
+            self.renderer.present()
     
     def draw_players(self):
-        # Draw the human player's hand at the bottom
-        human_player = self.players[0]
-        card_spacing = 30
-        hand_x = self.width // 2 - (len(human_player.hand) * card_spacing) // 2
-        hand_y = self.height - 150 - 20
-        
-        human_player.draw_hand(self.screen, hand_x, hand_y, self.selected_card, True)
-        
-        # Draw AI players' hands
-        num_ai_players = len(self.players) - 1
-        
-        if num_ai_players >= 1:  # Top player
-            top_player = self.players[2] if num_ai_players >= 2 else self.players[1]
-            top_x = self.width // 2 - (len(top_player.hand) * card_spacing) // 2
-            top_y = 20
-            top_player.draw_hand(self.screen, top_x, top_y, -1, False)
-        
-        if num_ai_players >= 2:  # Left player
-            left_player = self.players[1]
-            left_x = 20
-            left_y = self.height // 2 - 75
-            left_player.draw_hand(self.screen, left_x, left_y, -1, False)
-        
-        if num_ai_players >= 3:  # Right player
-            right_player = self.players[3]
-            right_x = self.width - 130
-            right_y = self.height // 2 - 75
-            right_player.draw_hand(self.screen, right_x, right_y, -1, False)
+        # The human player's hand at the bottom, the AI players' hands at
+        # the top, left and right; cards still flying in are left out
+        for seat, player in enumerate(self.players[:4]):
+            if seat == 0:
+                self.draw_hand(player, seat, self.selected_card, True, self.incoming[seat])
+            else:
+                self.draw_hand(player, seat, -1, self.reveal_hands, self.incoming[seat])
+    
+    def draw_hand(self, player, seat, selected_index=-1, is_current_player=False, hidden=()):
+        with self.profiler.section("draw_hand"):
+            # Draw the player's hand at its place in the layout, as one
+            # blit of its cached surface; a scrolled hand's labels stay in
+            # view
+            x = self.layout.views[seat].x
+            y = self.layout.origins[seat][1]
+            if player.hand:
+                surface, pos = self.hand_surface(player, seat, selected_index, is_current_player, hidden)
+                self.renderer.blit(surface, pos)
+            
+            # Draw player name
+            text = render_text(player.name, WHITE, size=20)
+            self.renderer.blit(text, (x, y - 30))
+            
+            # Draw card count
+            count_text = render_text(f"Cards: {len(player.hand)}", WHITE, size=20)
+            self.renderer.blit(count_text, (x, y - 50))
+            
+            # If player has UNO (1 card), display it
+            if len(player.hand) == 1:
+                uno_text = render_text("UNO!", YELLOW, size=30, bold=True)
+                self.renderer.blit(uno_text, (x + 100, y - 40))
+    
+    def hand_surface(self, player, seat, selected_index, face_up, hidden):
+        # The hand's cached surface and where it goes. Opponents' hands are
+        # card backs, so only their size matters, and with no cards in
+        # flight they share one prebuilt strip per size.
+        layout = self.layout
+        view = layout.views[seat]
+        if face_up:
+            key = (player.version, layout.seat_keys[seat], selected_index, tuple(hidden))
+        else:
+            key = (len(player.hand), layout.seat_keys[seat], tuple(hidden))
+        cached_key, surface = self.hand_surfaces[seat]
+        if key == cached_key:
+            return surface, view.topleft
+        
+        if not face_up and not hidden:
+            surface = back_strip(len(player.hand), layout.spacings[seat])
+            self.hand_surfaces[seat] = (key, surface)
+            return surface, view.topleft
+        
+        # Leave a gap where a card in flight will land
+        gaps = set()
+        if hidden:
+            pending = list(hidden)
+            for i, card in enumerate(player.hand):
+                if card in pending:
+                    pending.remove(card)
+                    gaps.add(i)
+        
+        # Only the cards at least partly in view are drawn, and of those
+        # only the slice the next card doesn't cover
+        surface = pygame.Surface(view.size, pygame.SRCALPHA)
+        spacing = layout.spacings[seat]
+        visible = layout.visible[seat]
+        back = card_back()
+        for i in visible:
+            if i in gaps:
+                continue
+            card = player.hand[i]
+            face = card_face(card.color, card.value) if face_up else back
+            rect = layout.card_rect(seat, i, selected_index).move(-view.x, -view.y)
+            covered = (i + 1 in visible and i + 1 not in gaps
+                       and selected_index != i and selected_index != i + 1)
+            if covered:
+                surface.blit(face, rect, (0, 0, spacing, rect.height))
+            else:
+                surface.blit(face, rect)
+        self.hand_surfaces[seat] = (key, surface)
+        return surface, view.topleft
     
     def draw_color_selection(self):
         # Draw a semi-transparent overlay
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        self.screen.blit(overlay, (0, 0))
+        self.renderer.blit(self.renderer.overlay(128), (0, 0))
         
         # Draw the prompt
-        prompt_text = self.large_font.render("Choose a color:", True, WHITE)
+        prompt_text = render_text("Choose a color:", WHITE, size=36)
         prompt_rect = prompt_text.get_rect(center=(self.width // 2, self.height // 2 - 100))
-        self.screen.blit(prompt_text, prompt_rect)
+        self.renderer.blit(prompt_text, prompt_rect)
         
         # Draw color buttons
-        button_width = 100
-        button_height = 50
-        button_y = self.height // 2
-        
-        # Red button
-        pygame.draw.rect(self.screen, RED, (self.width // 2 - 220, button_y, button_width, button_height))
-        red_text = self.font.render("Red", True, WHITE)
-        self.screen.blit(red_text, (self.width // 2 - 220 + 30, button_y + 15))
-        
-        # Blue button
-        pygame.draw.rect(self.screen, BLUE, (self.width // 2 - 110, button_y, button_width, button_height))
-        blue_text = self.font.render("Blue", True, WHITE)
-        self.screen.blit(blue_text, (self.width // 2 - 110 + 30, button_y + 15))
-        
-        # Green button
-        pygame.draw.rect(self.screen, GREEN, (self.width // 2 + 10, button_y, button_width, button_height))
-        green_text = self.font.render("Green", True, BLACK)
-        self.screen.blit(green_text, (self.width // 2 + 10 + 25, button_y + 15))
-        
-        # Yellow button
-        pygame.draw.rect(self.screen, YELLOW, (self.width // 2 + 120, button_y, button_width, button_height))
-        yellow_text = self.font.render("Yellow", True, BLACK)
-        self.screen.blit(yellow_text, (self.width // 2 + 120 + 20, button_y + 15))
+        for surface, pos in self.color_buttons:
+            self.renderer.blit(surface, pos)
     
     def draw_game_over(self):
         # Draw a semi-transparent overlay
-        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 192))
-        self.screen.blit(overlay, (0, 0))
+        self.renderer.blit(self.renderer.overlay(192), (0, 0))
         
         # Draw game over message
-        game_over_text = self.large_font.render("Game Over!", True, WHITE)
+        game_over_text = render_text("Game Over!", WHITE, size=36)
         game_over_rect = game_over_text.get_rect(center=(self.width // 2, self.height // 2 - 50))
-        self.screen.blit(game_over_text, game_over_rect)
+        self.renderer.blit(game_over_text, game_over_rect)
         
         # Draw winner message
-        winner_text = self.large_font.render(f"{self.winner.name} wins!", True, WHITE)
+        winner_text = render_text(f"{self.winner.name} wins!", WHITE, size=36)
         winner_rect = winner_text.get_rect(center=(self.width // 2, self.height // 2))
-        self.screen.blit(winner_text, winner_rect)
+        self.renderer.blit(winner_text, winner_rect)
         
         # Draw restart message
-        restart_text = self.font.render("Press R to restart or Q to quit", True, WHITE)
+        restart_text = render_text("Press R to restart or Q to quit", WHITE)
         restart_rect = restart_text.get_rect(center=(self.width // 2, self.height // 2 + 50))
-        self.screen.blit(restart_text, restart_rect)
+        self.renderer.blit(restart_text, restart_rect)
+    
+    def toggle_profile(self):
+        # Show or hide the readout. Profiling runs while it is up, each
+        # session starting clean, unless UNO_PROFILE=1 has it running for
+        # the whole game
+        self.show_profile = not self.show_profile
+        if not self.profile_from_start:
+            self.profiler.toggle()
+            self.profiler.reset()
+        self.profile_lines = []
+    
+    def export_profile(self):
+        if not self.profiler.span_count:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        print(f"Saved frame trace to {self.profiler.export_chrome_trace(path)}")
+        return path
+    
+    def draw_profile(self):
+        # Percentiles are recomputed twice a second, not every frame
+        if self.profiler.frame_count % 30 == 0 or not self.profile_lines:
+            summary = self.profiler.summary()
+            self.profile_lines = [
+                f"{name:>12}  p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms"
+                for name, (p50, p99) in sorted(summary.items(), key=lambda item: item[0] != "frame")
+            ]
+        
+        for i, line in enumerate(self.profile_lines):
+            self.renderer.blit(render_text(line, YELLOW, face="Courier", size=16), (self.width - 330, 110 + i * 18))
+    
+    def start_search_pool(self):
+        # Start the AI search processes, once, if the AI searches; run()
+        # does this before the assets are in so they boot while the loading
+        # frame is up
+        if self.search and self.search_pool is None:
+            self.search_pool = search_pool(self.search_workers)
+    
+    def quit(self):
+        if self.profiler.enabled:
+            self.export_profile()
+        self.ai_scheduler.shutdown()
+        if self.search_pool is not None:
+            self.search_pool.close()
+        self.close_replay()
+        if self.telemetry is not None:
+            if self.engine is not None and self.engine.turns:
+                self.game_recorder.finish()
+            self.telemetry.close()
+        pygame.quit()
+        sys.exit()
     
     def run(self):
+        clock = pygame.time.Clock()
+        
+        # Keep the window responsive until the assets are in
+        self.draw_loading()
+        self.start_search_pool()
+        while not self.assets.done():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    self.quit()
+            clock.tick(30)
+        
         # Set up the game
         self.setup_game()
+        self.renderer.invalidate()
         
         # Game loop
-        clock = pygame.time.Clock()
+        profiler = self.profiler
+        dt = 0
+        woken_by = None
         
         while True:
+            profiler.frame()
+            
             # Handle events
-            self.handle_events()
+            with profiler.section("events"):
+                self.handle_events(woken_by)
+                woken_by = None
             
             # Update animation
-            self.update_animation()
+            with profiler.section("animation"):
+                self.update_animation(dt)
             
             # AI turn
             if not self.game_over:
-                self.ai_turn()
+                with profiler.section("ai_turn"):
+                    self.ai_turn()
             
             # Draw the game
-            self.draw_game()
+            with profiler.section("draw_game"):
+                self.draw_game()
             
-            # Handle game over state
-            if self.game_over:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-                        sys.exit()
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_r:
-                            # Restart the game
-                            self.__init__()
-                            self.setup_game()
-                        elif event.key == pygame.K_q:
-                            pygame.quit()
-                            sys.exit()
-            
-            # Cap the frame rate
-            clock.tick(60)
+            # Cap the frame rate, or sleep while nothing is going on. The
+            # clock restarts after a sleep so the next animation step
+            # doesn't count the time spent idle.
+            timeout = self.idle_timeout()
+            if timeout == 0:
+                with profiler.section("tick"):
+                    dt = clock.tick(60)
+            else:
+                with profiler.section("idle"):
+                    woken_by = self.wait_for_event(timeout)
+                    clock.tick()
+                    dt = 0
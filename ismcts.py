@@ -0,0 +1,311 @@
+import argparse
+import math
+import multiprocessing
+import random
+import time
+
+from card import CARDS, COLORS
+from deck import Deck
+from engine import Engine
+from player import HeuristicPlayer, Player
+from rng import SplitMix64
+
+# How many of each card id a full deck holds
+FULL_COUNTS = [0] * len(CARDS)
+for _card in Deck(SplitMix64(0)).cards:
+    FULL_COUNTS[_card.id] += 1
+
+# A move is (card id, wild color or None); drawing is (-1, None)
+DRAW = (-1, None)
+
+# A searched move replaces the heuristic's only if it was tried this often
+# and its win rate is this many standard errors better
+MIN_VISITS = 10
+CONFIDENCE = 2.0
+
+
+class Node:
+    # One node of the information-set tree. seat is who made the move
+    # leading here, so wins are counted from that player's point of view.
+    __slots__ = ("parent", "move", "seat", "children", "visits", "wins", "avails")
+
+    def __init__(self, parent=None, move=None, seat=None):
+        self.parent = parent
+        self.move = move
+        self.seat = seat
+        self.children = {}
+        self.visits = 0
+        self.wins = 0
+        self.avails = 1
+
+    def select(self, legal, exploration):
+        # UCB1 over the children available in this determinization
+        best = None
+        best_score = -1.0
+        for move in legal:
+            child = self.children[move]
+            score = child.wins / child.visits + exploration * math.sqrt(math.log(child.avails) / child.visits)
+            if score > best_score:
+                best = child
+                best_score = score
+        return best
+
+
+def legal_moves(engine):
+    # Distinct moves for the current player; a wild is one move per color.
+    # Drawing is only considered when nothing can be played.
+    player = engine.players[engine.current_player]
+    moves = []
+    seen = set()
+    for i in player.legal_moves(engine.deck.top_card(), engine.wild_color):
+        card = player.hand[i]
+        if card.id in seen:
+            continue
+        seen.add(card.id)
+        if card.color == "wild":
+            moves.extend((card.id, color) for color in COLORS)
+        else:
+            moves.append((card.id, None))
+    return moves or [DRAW]
+
+
+def apply_move(engine, move):
+    card_id, color = move
+    if card_id < 0:
+        engine.apply_move(-1)
+    else:
+        hand = engine.players[engine.current_player].hand
+        engine.apply_move(hand.index(CARDS[card_id]), color)
+
+
+def determinize(observation, rng, policy=Player):
+    # Build a full game consistent with what the seat can see: its own
+    # hand and the discard pile are known, every other card is dealt at
+    # random to the opponents (by their hand sizes) and the draw pile.
+    # The seat itself plays policy; opponents play first-legal.
+    unseen = list(FULL_COUNTS)
+    for card_id in observation["hand"]:
+        unseen[card_id] -= 1
+    for card_id in observation["discard"]:
+        unseen[card_id] -= 1
+
+    pool = []
+    for card_id, count in enumerate(unseen):
+        pool.extend([CARDS[card_id]] * count)
+    rng.shuffle(pool)
+
+    seat = observation["seat"]
+    players = []
+    for i, size in enumerate(observation["hand_sizes"]):
+        if i == seat:
+            player = policy(f"seat {i}", is_ai=True)
+            player.add_cards([CARDS[card_id] for card_id in observation["hand"]])
+        else:
+            player = Player(f"seat {i}", is_ai=True)
+            player.add_cards(pool[-size:] if size else [])
+            del pool[len(pool) - size:]
+        players.append(player)
+
+    engine = Engine(players, seed=rng.getrandbits(64))
+    engine.deck.cards = pool
+    engine.deck.discard_pile = [CARDS[card_id] for card_id in observation["discard"]]
+    engine.current_player = observation["current_player"]
+    engine.direction = observation["direction"]
+    engine.wild_color = observation["wild_color"]
+    return engine
+
+
+def search(observation, iterations=None, time_budget=None, seed=None, exploration=0.7, max_rollout_turns=1000):
+    # Single-observer ISMCTS from the observing seat's turn. Stops after
+    # iterations or time_budget seconds, whichever comes first. Rollouts
+    # play the heuristic for the observing seat, first-legal for the rest.
+    # Returns ({move: (visits, wins)} at the root, rollouts run).
+    rng = random.Random(seed)
+    root = Node()
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    rollouts = 0
+
+    while True:
+        if iterations is not None and rollouts >= iterations:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+        state = determinize(observation, rng, HeuristicPlayer)
+        node = root
+
+        # Selection: descend while every legal move has been tried
+        untried = []
+        while not state.game_over:
+            legal = legal_moves(state)
+            untried = [move for move in legal if move not in node.children]
+            for move in legal:
+                if move in node.children:
+                    node.children[move].avails += 1
+            if untried:
+                break
+            node = node.select(legal, exploration)
+            apply_move(state, node.move)
+
+        # Expansion
+        if untried and not state.game_over:
+            move = rng.choice(untried)
+            seat = state.current_player
+            apply_move(state, move)
+            child = Node(node, move, seat)
+            node.children[move] = child
+            node = child
+
+        # Rollout, then backpropagate
+        state.turns = 0
+        winner = state.run(max_rollout_turns)
+        rollouts += 1
+        while node is not None:
+            node.visits += 1
+            if node.seat is not None and node.seat == winner:
+                node.wins += 1
+            node = node.parent
+
+    stats = {move: (child.visits, child.wins) for move, child in root.children.items()}
+    return stats, rollouts
+
+
+def better_move(stats, default):
+    # The searched move whose win rate beats default's by CONFIDENCE
+    # standard errors, the best such if several; otherwise default. The
+    # spread has a floor so a move that never won in a few rollouts still
+    # has an error to beat.
+    visits, wins = stats.get(default, (0, 0))
+    if not visits:
+        return default
+    base = wins / visits
+    best = default
+    best_rate = base
+    for move, (count, won) in stats.items():
+        if count < MIN_VISITS:
+            continue
+        rate = won / count
+        spread = max(rate * (1 - rate), base * (1 - base), 0.01)
+        error = math.sqrt(spread * (1 / count + 1 / visits))
+        if rate - base > CONFIDENCE * error and rate > best_rate:
+            best = move
+            best_rate = rate
+    return best
+
+
+def search_pool(workers):
+    # Search processes, which players can share: spawn, as the GUI searches
+    # from a worker thread and forking a threaded process can deadlock the
+    # children. Processes start now, so the start-up cost is paid before
+    # the first decision if the pool is made early.
+    return multiprocessing.get_context("spawn").Pool(workers)
+
+
+def search_worker(job):
+    observation, iterations, time_budget, seed, exploration = job
+    return search(observation, iterations, time_budget, seed, exploration)
+
+
+class ISMCTSPlayer(HeuristicPlayer):
+    # Information-set Monte Carlo tree search. Sees only its own hand, the
+    # discard pile, hand sizes and direction; samples the hidden cards to
+    # match. Plays the heuristic's move unless the search finds a clearly
+    # better one: picking by raw visits chases rollout noise, and as each
+    # color of a wild is its own move, visits drift toward playing wilds
+    # early.
+    # Searches for time_budget seconds or iterations rollouts, split over
+    # workers processes (root parallelism), or in this process if workers
+    # is 0. Players can share one search_pool, as only one seat searches at
+    # a time; without one a player makes its own on its first search.
+    # last_stats reports the rollouts per second actually achieved.
+    def __init__(self, name, is_ai=True, iterations=None, time_budget=0.3, workers=0, seed=None, exploration=0.7,
+                 pool=None):
+        super().__init__(name, is_ai)
+        self.iterations = iterations
+        self.time_budget = time_budget if iterations is None else None
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.exploration = exploration
+        self.pool = pool
+        self.owns_pool = pool is None
+        self.last_stats = None
+
+    def decide(self, engine):
+        card_idx, color = super().decide(engine)
+
+        # Nothing to think about
+        if len(legal_moves(engine)) == 1:
+            return card_idx, color
+
+        default = DRAW if card_idx < 0 else (self.hand[card_idx].id, color)
+        move = better_move(self.search(engine.observe()), default)
+        if move == default:
+            return card_idx, color
+        card_id, color = move
+        return self.hand.index(CARDS[card_id]), color
+
+    def search(self, observation):
+        # Run the search, in parallel if asked, and return root
+        # {move: (visits, wins)}
+        start = time.perf_counter()
+        if self.workers:
+            if self.pool is None:
+                self.pool = search_pool(self.workers)
+            iterations = None if self.iterations is None else -(-self.iterations // self.workers)
+            jobs = [(observation, iterations, self.time_budget, self.rng.random(), self.exploration)
+                    for _ in range(self.workers)]
+            results = self.pool.map(search_worker, jobs)
+        else:
+            results = [search(observation, self.iterations, self.time_budget, self.rng.random(), self.exploration)]
+        elapsed = time.perf_counter() - start
+
+        # Sum root statistics over workers
+        stats = {}
+        rollouts = 0
+        for worker_stats, worker_rollouts in results:
+            rollouts += worker_rollouts
+            for move, (count, won) in worker_stats.items():
+                visits, wins = stats.get(move, (0, 0))
+                stats[move] = (visits + count, wins + won)
+
+        self.last_stats = {
+            "rollouts": rollouts,
+            "seconds": elapsed,
+            "rollouts_per_second": rollouts / elapsed if elapsed else 0.0,
+        }
+
+        return stats
+
+    def close(self):
+        # A shared pool is closed by whoever made it
+        if self.pool is not None and self.owns_pool:
+            self.pool.close()
+            self.pool = None
+
+
+def main():
+    # Measure rollouts per second from a dealt position, for sizing hardware
+    parser = argparse.ArgumentParser(description="Benchmark ISMCTS rollouts per second")
+    parser.add_argument("--seconds", type=float, default=2.0, help="search time per decision")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="search processes, 0 to search in this process")
+    parser.add_argument("--decisions", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = Engine([Player(f"AI {i}", is_ai=True) for i in range(4)], seed=args.seed)
+    engine.setup_game()
+    player = ISMCTSPlayer("ISMCTS", time_budget=args.seconds, workers=args.workers, seed=args.seed)
+    player.add_cards(engine.players[0].hand)
+    engine.players[0] = player
+
+    for _ in range(args.decisions):
+        player.search(engine.observe())
+        stats = player.last_stats
+        print(f"{stats['rollouts']} rollouts in {stats['seconds']:.2f}s on {max(args.workers, 1)} core(s): "
+              f"{stats['rollouts_per_second']:.0f} rollouts/s")
+    player.close()
+
+
+if __name__ == "__main__":
+    main()
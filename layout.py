@@ -0,0 +1,166 @@
+import pygame
+from card import CARD_HEIGHT, CARD_WIDTH
+
+# Color picker buttons, left to right
+BUTTON_COLORS = ["red", "blue", "green", "yellow"]
+BUTTON_WIDTH = 100
+BUTTON_HEIGHT = 50
+
+# Hands are fanned left to right, each card overlapping the one before.
+# A hand too wide for its area is squeezed; the human's cards stay at least
+# MIN_SPACING apart so their corners can be read, and past that the hand
+# scrolls instead.
+CARD_SPACING = 30
+MIN_SPACING = 20
+
+# Space kept between a hand and the window edge or the piles
+MARGIN = 20
+
+# How far the selected card in the human's hand is raised
+RAISE = 20
+
+
+class TableLayout:
+    # Where everything on the table goes: a rect for every card in every
+    # hand, the two piles and the color buttons. Rendering and input both
+    # read it, and it is only rebuilt when the window size, a hand size or
+    # the scroll position changes. Hit tests find the fanned card by
+    # arithmetic instead of scanning the hand, and return the topmost one
+    # where cards overlap.
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.key = None
+        self.scroll = 0  # How far the human's hand is scrolled, in pixels
+
+        # Per seat: top-left of the first card, spacing between cards, a
+        # rect for every card, the area the hand must stay in, the part of
+        # that area the hand covers and the range of cards at least partly
+        # inside it; and a key that changes only when that seat's own
+        # layout does, for caching what is drawn from it
+        self.origins = []
+        self.spacings = []
+        self.hands = []
+        self.areas = []
+        self.views = []
+        self.visible = []
+        self.seat_keys = []
+
+        self.draw_pile = pygame.Rect(width // 2 - 150, height // 2 - CARD_HEIGHT // 2, CARD_WIDTH, CARD_HEIGHT)
+        self.discard = pygame.Rect(width // 2 + 50, height // 2 - CARD_HEIGHT // 2, CARD_WIDTH, CARD_HEIGHT)
+        self.buttons = [
+            (color, pygame.Rect(width // 2 - 220 + i * 110 + (i >= 2) * 10, height // 2, BUTTON_WIDTH, BUTTON_HEIGHT))
+            for i, color in enumerate(BUTTON_COLORS)
+        ]
+
+    def update(self, players):
+        # Rebuild the hand rects if any hand changed size or the human's
+        # hand was scrolled; returns True if it did
+        counts = tuple(len(player.hand) for player in players)
+        if (counts, self.scroll) == self.key:
+            return False
+        self.origins = []
+        self.spacings = []
+        self.hands = []
+        self.areas = []
+        self.views = []
+        self.visible = []
+        self.seat_keys = []
+        for seat, count in enumerate(counts):
+            self.layout_hand(seat, count, len(counts))
+        self.key = (counts, self.scroll)
+        return True
+
+    def layout_hand(self, seat, count, num_players):
+        left, right, y = self.hand_area(seat, num_players)
+        area_width = right - left
+        spacing = CARD_SPACING
+        if count > 1 and CARD_WIDTH + (count - 1) * spacing > area_width:
+            spacing = max((area_width - CARD_WIDTH) // (count - 1), MIN_SPACING if seat == 0 else 1)
+        total = CARD_WIDTH + max(count - 1, 0) * spacing
+
+        if total > area_width:
+            # Still too wide: only the human's hand gets here, and scrolls
+            self.scroll = min(max(self.scroll, 0), total - area_width)
+            x = left - self.scroll
+        else:
+            if seat == 0:
+                self.scroll = 0
+            x = self.hand_origin(seat, count, num_players)[0]
+            if spacing != CARD_SPACING:
+                x = left + (area_width - total) // 2
+            x = min(max(x, left), right - total)
+
+        # The human's selected card is raised, so its area reaches higher
+        top = y - RAISE if seat == 0 else y
+        area = pygame.Rect(left, top, area_width, y + CARD_HEIGHT - top)
+        first = max((left - x - CARD_WIDTH) // spacing + 1, 0)
+        last = min((right - x - 1) // spacing + 1, count)
+        view_left = max(x, left)
+        view_right = min(x + total, right)
+
+        self.origins.append((x, y))
+        self.spacings.append(spacing)
+        self.hands.append([pygame.Rect(x + i * spacing, y, CARD_WIDTH, CARD_HEIGHT) for i in range(count)])
+        self.areas.append(area)
+        self.views.append(pygame.Rect(view_left, top, max(view_right - view_left, 0), area.height))
+        self.visible.append(range(first, max(last, first)))
+        self.seat_keys.append((x, y, spacing, count, tuple(self.views[-1]), first, last))
+
+    def hand_area(self, seat, num_players):
+        # Left and right bounds a hand must fit between, and its top: the
+        # human at the bottom, then left, top and right (top alone with
+        # one AI); the side hands stop short of the piles
+        if seat == 0:
+            return MARGIN, self.width - MARGIN, self.height - CARD_HEIGHT - 20
+        if seat == 2 or num_players == 2:
+            return MARGIN, self.width - MARGIN, 20
+        y = self.height // 2 - CARD_HEIGHT // 2
+        if seat == 1:
+            return MARGIN, self.draw_pile.left - MARGIN, y
+        return self.discard.right + MARGIN, self.width - MARGIN, y
+
+    def hand_origin(self, seat, count, num_players):
+        # Top-left of the first card of a hand of count cards fanned at
+        # CARD_SPACING, before it is fitted into its area
+        left, right, y = self.hand_area(seat, num_players)
+        if seat == 0 or seat == 2 or num_players == 2:
+            return self.width // 2 - (count * CARD_SPACING) // 2, y
+        if seat == 1:
+            return left, y
+        return self.width - 130, y
+
+    def scroll_by(self, pixels):
+        # Scroll the human's hand; clamped to the hand on the next update
+        self.scroll += pixels
+        self.key = None
+
+    def card_rect(self, seat, index, raised=-1):
+        rect = self.hands[seat][index]
+        if index == raised:
+            return rect.move(0, -RAISE)
+        return rect
+
+    def card_at(self, seat, pos, raised=-1):
+        # Index of the topmost card of a hand under pos, or -1. Later cards
+        # are drawn over earlier ones, so the last card starting left of
+        # pos is the first candidate; the few before it overlap it. Cards
+        # scrolled out of the hand's area can't be hit.
+        rects = self.hands[seat]
+        if not rects or not self.areas[seat].collidepoint(pos):
+            return -1
+        x, y = pos
+        spacing = self.spacings[seat]
+        last = min((x - rects[0].x) // spacing, len(rects) - 1)
+        first = max(last - CARD_WIDTH // spacing, 0)
+        for i in range(last, first - 1, -1):
+            if self.card_rect(seat, i, raised).collidepoint(x, y):
+                return i
+        return -1
+
+    def button_at(self, pos):
+        # Color of the picker button under pos, or None
+        for color, rect in self.buttons:
+            if rect.collidepoint(pos):
+                return color
+        return None
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from card import CARDS, COLORS, can_play
+from server import encode
+
+
+class TableClient:
+    # A scripted human for load testing: keeps its own view of the game
+    # from the server's deltas and plays the first legal card after
+    # thinking for think seconds.
+    def __init__(self, reader, writer, think):
+        self.reader = reader
+        self.writer = writer
+        self.think = think
+        self.seat = None
+        self.hand = []
+        self.top = None
+        self.wild_color = None
+        self.current = None
+        self.games = 0
+        self.moves = 0
+
+    async def send(self, message):
+        self.writer.write(encode(message))
+        await self.writer.drain()
+
+    def on_message(self, message):
+        kind = message[0]
+        if kind == "start":
+            _, self.seat, hand, top, _, self.current, _, self.wild_color = message
+            self.hand = [CARDS[card_id] for card_id in hand]
+            self.top = CARDS[top]
+        elif kind == "play":
+            _, seat, card_id = message
+            self.top = CARDS[card_id]
+            self.wild_color = None
+            if seat == self.seat:
+                self.hand.remove(self.top)
+        elif kind == "color":
+            self.wild_color = message[2]
+        elif kind == "draw" and len(message) == 3:
+            self.hand.append(CARDS[message[2]])
+        elif kind == "penalty" and message[1] == self.seat:
+            self.hand.extend(CARDS[card_id] for card_id in message[2])
+        elif kind == "turn":
+            self.current = message[1]
+        elif kind == "error":
+            raise RuntimeError(message[1])
+
+    def choose(self):
+        for card in self.hand:
+            if can_play(card, self.top, self.wild_color):
+                message = {"op": "play", "card": card.id}
+                if card.color == "wild":
+                    counts = [sum(1 for other in self.hand if other.color == color) for color in COLORS]
+                    message["color"] = COLORS[counts.index(max(counts))]
+                return message
+        return {"op": "draw"}
+
+    async def play(self, deadline):
+        # Play games back to back until the deadline
+        while time.perf_counter() < deadline:
+            await self.send({"op": "join"})
+            game_over = False
+            while not game_over:
+                line = await self.reader.readline()
+                if not line:
+                    return
+                message = json.loads(line)
+                self.on_message(message)
+                if message[0] == "win":
+                    game_over = True
+                    self.games += 1
+                elif message[0] in ("start", "turn") and self.current == self.seat:
+                    # AI seats never move past a human, so this is the
+                    # last message until we do
+                    await asyncio.sleep(self.think)
+                    await self.send(self.choose())
+                    self.moves += 1
+
+    def close(self):
+        self.writer.close()
+
+
+async def request_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode({"op": "stats"}))
+    stats = json.loads(await reader.readline())[1]
+    writer.close()
+    return stats
+
+
+async def run_load(host, port, tables, think, seconds):
+    clients = []
+    for _ in range(tables):
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+        clients.append(TableClient(reader, writer, think))
+
+    before = await request_stats(host, port)
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client.play(deadline) for client in clients))
+    after = await request_stats(host, port)
+    for client in clients:
+        client.close()
+    return before, after, sum(client.moves for client in clients), sum(client.games for client in clients)
+
+
+def main():
+    # Measure how many human-paced tables one server process can carry:
+    # the server's CPU time over the run divided by wall time is the share
+    # of a core the tables used
+    parser = argparse.ArgumentParser(description="Load test the UNO table server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--tables", type=int, default=1000, help="concurrent tables, one scripted human each")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds each human takes per move")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--spawn", action="store_true", help="start a server on --port for the run")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        here = os.path.dirname(os.path.abspath(__file__))
+        server = subprocess.Popen([sys.executable, os.path.join(here, "server.py"), "--port", str(args.port)],
+                                  stdout=subprocess.PIPE)
+        server.stdout.readline()
+    try:
+        before, after, moves, games = asyncio.run(
+            run_load(args.host, args.port, args.tables, args.think, args.seconds))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    wall = after["uptime"] - before["uptime"]
+    cpu = after["cpu"] - before["cpu"]
+    server_moves = after["moves"] - before["moves"]
+    load = cpu / wall
+    print(f"{args.tables} tables, {args.think:g}s per human move, {wall:.1f}s: "
+          f"{moves} human moves, {server_moves} moves in all, {games} games finished")
+    print(f"server CPU {cpu:.2f}s ({load:.1%} of a core), {server_moves / cpu if cpu else 0:.0f} moves per CPU second")
+    if load:
+        print(f"=> about {args.tables / load:.0f} tables per core at this pace")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,106 +1,223 @@
-import pygame
+import random
+from bisect import bisect_right
+from card import CARDS, can_play, playable_mask
+
+
+def hand_order_key(card):
+    # Sort cards by color and then by value
+    color_order = {"red": 0, "yellow": 1, "green": 2, "blue": 3, "wild": 4}
+    color_value = color_order.get(card.color, 5)
+    
+    # Numbers in numeric order, then action cards by name
+    if card.value.isdigit():
+        return (color_value, int(card.value))
+    return (color_value, 10, card.value)
+
+
+# Position of each card id in hand order, computed once for all 54 kinds
+SORT_RANKS = [0] * len(CARDS)
+for rank, card in enumerate(sorted(CARDS, key=hand_order_key)):
+    SORT_RANKS[card.id] = rank
+
 
 class Player:
     def __init__(self, name, is_ai=False):
         self.name = name
         self.hand = []
+        self.ranks = []  # SORT_RANKS of self.hand, in the same order
         self.is_ai = is_ai
+        self.version = 0  # Bumped whenever the hand changes
+        
+        # Index of the hand: how many of each card id and of each color are
+        # held, and a bitmask of the ids held at least once
+        self.counts = [0] * len(CARDS)
+        self.color_counts = {"red": 0, "blue": 0, "green": 0, "yellow": 0, "wild": 0}
+        self.mask = 0
     
     def add_card(self, card):
-        self.hand.append(card)
-        self.sort_hand()
+        # The hand is always kept sorted; ranks mirrors it so the slot for
+        # a new card is found by bisection
+        rank = SORT_RANKS[card.id]
+        i = bisect_right(self.ranks, rank)
+        self.ranks.insert(i, rank)
+        self.hand.insert(i, card)
+        self.index_card(card)
+        self.version += 1
+    
+    def add_cards(self, cards):
+        # Merge a batch into the sorted hand in one pass
+        if not cards:
+            return
+        batch = sorted(cards, key=lambda card: SORT_RANKS[card.id])
+        hand, ranks = self.hand, self.ranks
+        merged_hand = []
+        merged_ranks = []
+        i = 0
+        for card in batch:
+            rank = SORT_RANKS[card.id]
+            while i < len(ranks) and ranks[i] <= rank:
+                merged_hand.append(hand[i])
+                merged_ranks.append(ranks[i])
+                i += 1
+            merged_hand.append(card)
+            merged_ranks.append(rank)
+            self.index_card(card)
+        merged_hand.extend(hand[i:])
+        merged_ranks.extend(ranks[i:])
+        self.hand = merged_hand
+        self.ranks = merged_ranks
+        self.version += 1
+    
+    def set_hand(self, cards):
+        # Replace the whole hand, e.g. when loading a saved game
+        self.hand = []
+        self.ranks = []
+        self.counts = [0] * len(CARDS)
+        self.color_counts = dict.fromkeys(self.color_counts, 0)
+        self.mask = 0
+        self.version += 1
+        self.add_cards(cards)
+    
+    def load_hand(self, cards):
+        # set_hand for cards already in hand order, as in a snapshot
+        counts = [0] * len(CARDS)
+        color_counts = dict.fromkeys(self.color_counts, 0)
+        mask = 0
+        for card in cards:
+            counts[card.id] += 1
+            color_counts[card.color] += 1
+            mask |= 1 << card.id
+        self.hand = cards
+        self.ranks = [SORT_RANKS[card.id] for card in cards]
+        self.counts = counts
+        self.color_counts = color_counts
+        self.mask = mask
+        self.version += 1
+    
+    def clone(self):
+        # A copy with its own hand and index. Anything else a policy keeps,
+        # such as a RandomPlayer's rng, is shared with the original.
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.hand = self.hand[:]
+        other.ranks = self.ranks[:]
+        other.counts = self.counts[:]
+        other.color_counts = self.color_counts.copy()
+        return other
+    
+    def index_card(self, card):
+        self.counts[card.id] += 1
+        self.color_counts[card.color] += 1
+        self.mask |= 1 << card.id
     
     def play_card(self, card_index):
         if 0 <= card_index < len(self.hand):
-            return self.hand.pop(card_index)
+            del self.ranks[card_index]
+            card = self.hand.pop(card_index)
+            self.counts[card.id] -= 1
+            self.color_counts[card.color] -= 1
+            if not self.counts[card.id]:
+                self.mask &= ~(1 << card.id)
+            self.version += 1
+            return card
         return None
     
     def sort_hand(self):
-        # Sort cards by color and then by value
-        color_order = {"red": 0, "yellow": 1, "green": 2, "blue": 3, "wild": 4}
-        
-        def sort_key(card):
-            # Sort by color first
-            color_value = color_order.get(card.color, 5)
-            
-            # Then by numeric value if possible
-            try:
-                num_value = int(card.value)
-                return (color_value, num_value)
-            except ValueError:
-                # For non-numeric values, use a string comparison
-                # but make sure numbers come before action cards
-                return (color_value, 10, card.value)
-        
-        self.hand.sort(key=sort_key)
+        # Re-sort the whole hand, e.g. after self.hand was edited directly
+        self.hand.sort(key=lambda card: SORT_RANKS[card.id])
+        self.ranks = [SORT_RANKS[card.id] for card in self.hand]
+        self.version += 1
     
-    def has_playable_card(self, top_card):
+    def has_playable_card(self, top_card, wild_color=None):
         # Check if player has any playable cards
-        for card in self.hand:
-            if self.is_card_playable(card, top_card):
-                return True
-        return False
+        return self.mask & playable_mask(top_card, wild_color) != 0
     
-    def is_card_playable(self, card, top_card):
-        # Wild cards can always be played
-        if card.color == "wild":
-            return True
-        
-        # If no top card, any card can be played
-        if top_card is None:
-            return True
-        
-        # Match color or value
-        if card.color == top_card.color or card.value == top_card.value:
-            return True
-        
-        # If top card is wild, any card can be played (assuming color has been chosen)
-        if top_card.color == "wild":
-            return True
-        
-        return False
+    def is_card_playable(self, card, top_card, wild_color=None):
+        return can_play(card, top_card, wild_color)
+    
+    def legal_moves(self, top_card, wild_color=None):
+        # Indexes of every playable card in the hand
+        playable = self.mask & playable_mask(top_card, wild_color)
+        if not playable:
+            return []
+        return [i for i, card in enumerate(self.hand) if playable >> card.id & 1]
     
-    def ai_play(self, top_card):
+    def ai_play(self, top_card, wild_color=None):
         # Simple AI strategy: play the first valid card
-        for i, card in enumerate(self.hand):
-            if self.is_card_playable(card, top_card):
-                return i
+        playable = self.mask & playable_mask(top_card, wild_color)
+        if playable:
+            for i, card in enumerate(self.hand):
+                if playable >> card.id & 1:
+                    return i
         
         # No playable card found
         return -1
     
-    def draw_hand(self, surface, x, y, selected_index=-1, is_current_player=False):
-        # Draw the player's hand
-        card_spacing = 30  # Space between cards
-        
-        for i, card in enumerate(self.hand):
-            # Calculate position
-            card_x = x + i * card_spacing
-            card_y = y
-            
-            # If this is the selected card, draw it higher
-            if i == selected_index:
-                card_y -= 20
-            
-            # Draw the card
-            if is_current_player:
-                card.face_up = True
-            else:
-                card.face_up = False
-                
-            card.draw(surface, card_x, card_y)
-        
-        # Draw player name
-        font = pygame.font.SysFont('Arial', 20)
-        text = font.render(self.name, True, (255, 255, 255))
-        surface.blit(text, (x, y - 30))
+    def decide(self, engine):
+        # Called by the engine on this player's turn: returns (card index
+        # or -1 to draw, color if that card is a wild). Policies that need
+        # more than the top card can look at engine.observe().
+        card_idx = self.ai_play(engine.deck.top_card(), engine.wild_color)
+        color = None
+        if card_idx >= 0 and self.hand[card_idx].color == "wild":
+            color = self.choose_color()
+        return card_idx, color
+    
+    def choose_color(self):
+        # Simple strategy: choose the most common color in hand
+        max_count = 0
+        chosen_color = "red"  # Default
         
-        # Draw card count
-        count_text = font.render(f"Cards: {len(self.hand)}", True, (255, 255, 255))
-        surface.blit(count_text, (x, y - 50))
+        for color in ("red", "blue", "green", "yellow"):
+            count = self.color_counts[color]
+            if count > max_count:
+                max_count = count
+                chosen_color = color
         
-        # If player has UNO (1 card), display it
-        if len(self.hand) == 1:
-            uno_font = pygame.font.SysFont('Arial', 30, bold=True)
-            uno_text = uno_font.render("UNO!", True, (255, 255, 0))
-            surface.blit(uno_text, (x + 100, y - 40))
+        return chosen_color
+
+
+class RandomPlayer(Player):
+    # Baseline policy: any legal card and any color, picked at random
+    def __init__(self, name, is_ai=True, seed=None):
+        super().__init__(name, is_ai)
+        self.rng = random.Random(seed)
+    
+    def ai_play(self, top_card, wild_color=None):
+        playable = self.legal_moves(top_card, wild_color)
+        if not playable:
+            return -1
+        return self.rng.choice(playable)
+    
+    def choose_color(self):
+        return self.rng.choice(["red", "blue", "green", "yellow"])
+
+
+class HeuristicPlayer(Player):
+    # Hand-tuned policy: stay in the color held most, so later turns still
+    # have a play; keep wilds for when nothing else fits; and when the next
+    # player is down to two cards, hit them with a skip, reverse, draw two
+    # or wild draw four
+    ACTIONS = ("Skip", "Reverse", "Draw2")
+
+    def decide(self, engine):
+        playable = self.legal_moves(engine.deck.top_card(), engine.wild_color)
+        if not playable:
+            return -1, None
+        following = engine.players[(engine.current_player + engine.direction) % len(engine.players)]
+        threat = len(following.hand) <= 2
+        card_idx = max(playable, key=lambda i: self.score(self.hand[i], threat))
+        color = None
+        if self.hand[card_idx].color == "wild":
+            color = self.choose_color()
+        return card_idx, color
+
+    def score(self, card, threat):
+        if card.color == "wild":
+            if not threat:
+                return -100
+            return 5 if card.value == "Wild4" else -50
+        score = 2 * self.color_counts[card.color]
+        if threat and card.value in self.ACTIONS:
+            score += 6
+        return score
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+from array import array
+
+
+class _NullSection:
+    # What section() hands out while profiling is off: entering and
+    # leaving it does nothing, so instrumented code pays one attribute
+    # check and a call per section
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        # Profiling may have been turned off inside the section; the depth
+        # still unwinds, but the span isn't kept
+        end = time.perf_counter()
+        profiler = self.profiler
+        profiler.depth -= 1
+        if profiler.enabled:
+            profiler.record(self.name, self.start, end - self.start, profiler.depth)
+        return False
+
+
+class Profiler:
+    # Frame profiler. Each timed section is a span (name, start, duration,
+    # nesting depth) written into a fixed-size ring buffer, and the time
+    # between frame() calls goes into a second ring of frame times, so
+    # memory stays constant however long the game runs. Turned off it only
+    # hands out NULL_SECTION. Times are perf_counter seconds.
+    def __init__(self, frames=600, spans=16384, enabled=False):
+        self.enabled = enabled
+        self.depth = 0
+        self.origin = time.perf_counter()
+
+        self.frame_times = array("d", bytes(8 * frames))
+        self.frame_count = 0
+        self.last_frame = None
+
+        self.span_names = [None] * spans
+        self.span_starts = array("d", bytes(8 * spans))
+        self.span_durations = array("d", bytes(8 * spans))
+        self.span_depths = array("B", bytes(spans))
+        self.span_count = 0
+
+    def section(self, name):
+        # with profiler.section("draw"): ...
+        if not self.enabled:
+            return NULL_SECTION
+        return _Section(self, name)
+
+    def record(self, name, start, duration, depth=0):
+        i = self.span_count % len(self.span_names)
+        self.span_names[i] = name
+        self.span_starts[i] = start
+        self.span_durations[i] = duration
+        self.span_depths[i] = min(depth, 255)
+        self.span_count += 1
+
+    def frame(self):
+        # Call once at the top of every frame
+        if not self.enabled:
+            self.last_frame = None
+            return
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.frame_times[self.frame_count % len(self.frame_times)] = now - self.last_frame
+            self.frame_count += 1
+        self.last_frame = now
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def reset(self):
+        self.frame_count = 0
+        self.span_count = 0
+        self.last_frame = None
+
+    def recent_frames(self):
+        count = min(self.frame_count, len(self.frame_times))
+        return list(self.frame_times[:count])
+
+    def spans(self):
+        # (name, start, duration, depth) still in the buffer, oldest first
+        size = len(self.span_names)
+        count = min(self.span_count, size)
+        first = self.span_count - count
+        for n in range(first, self.span_count):
+            i = n % size
+            yield self.span_names[i], self.span_starts[i], self.span_durations[i], self.span_depths[i]
+
+    def summary(self):
+        # {name: (p50, p99)} in seconds over the buffered spans, with the
+        # time between frames under "frame"
+        durations = {"frame": self.recent_frames()}
+        for name, _, duration, _ in self.spans():
+            durations.setdefault(name, []).append(duration)
+        return {name: (percentile(values, 50), percentile(values, 99))
+                for name, values in durations.items() if values}
+
+    def chrome_trace(self):
+        # Trace Event Format, loadable in chrome://tracing or Perfetto:
+        # one complete ("X") event per span, times in microseconds
+        events = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+                   "args": {"name": "UNO"}}]
+        for name, start, duration, _ in self.spans():
+            events.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                           "ts": round((start - self.origin) * 1e6, 3), "dur": round(duration * 1e6, 3)})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+def percentile(values, p):
+    # Nearest-rank percentile
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
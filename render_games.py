@@ -0,0 +1,218 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+# Rendering needs no window or sound card: SDL's dummy drivers give the
+# game an in-memory screen to draw into. SDL would also turn SIGTERM into
+# a quit event, leaving workers the pool can't stop.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import pygame
+from engine import Engine
+from game import Game
+from player import Player
+from replay import COLOR, DRAW, PLAY, Replay
+
+# Frames are written per game to <output>/<name>/, named for the seed (in
+# hex) or the replay log, as
+#   png   frame_000000.png, frame_000001.png, ...
+#   raw   frames.rgb, every frame's RGB24 pixels back to back, and
+#         frames.json with the size, frame rate and frame count, e.g. for
+#         ffmpeg -f rawvideo -pix_fmt rgb24 -s 1024x768 -r 30 -i frames.rgb game.mp4
+FORMATS = ["png", "raw"]
+
+# Per worker process: the Game the frames are drawn with, built on first use
+_game = None
+
+
+class FrameWriter:
+    def __init__(self, directory, fmt, fps):
+        self.directory = directory
+        self.format = fmt
+        self.fps = fps
+        self.count = 0
+        self.size = None
+        self.raw = None
+        os.makedirs(directory, exist_ok=True)
+        if fmt == "raw":
+            self.raw = open(os.path.join(directory, "frames.rgb"), "wb")
+
+    def write(self, surface):
+        self.size = surface.get_size()
+        if self.raw is not None:
+            self.raw.write(pygame.image.tobytes(surface, "RGB"))
+        else:
+            pygame.image.save(surface, os.path.join(self.directory, f"frame_{self.count:06d}.png"))
+        self.count += 1
+
+    def close(self):
+        if self.raw is not None:
+            self.raw.close()
+            with open(os.path.join(self.directory, "frames.json"), "w") as f:
+                json.dump({"width": self.size[0], "height": self.size[1], "fps": self.fps,
+                           "frames": self.count, "pix_fmt": "rgb24"}, f)
+                f.write("\n")
+
+
+def seeded_game(seed, max_turns):
+    # A game of the default AI policy at every seat; yields after each turn
+    engine = Engine([Player(f"AI {seat}", is_ai=True) for seat in range(4)], seed=seed)
+
+    def turns():
+        while not engine.game_over and engine.turns < max_turns:
+            engine.ai_turn()
+            yield
+    return engine, turns
+
+
+def recorded_game(path):
+    # A game from a replay log, its moves re-applied one turn at a time; a
+    # wild's color belongs to the turn it was played in
+    replay = Replay.load(path)
+    engine = replay.new_engine()
+
+    def turns():
+        for _, kind, payload in replay.records:
+            if engine.game_over:
+                break
+            if kind in (PLAY, COLOR, DRAW):
+                replay.apply(engine, kind, payload)
+                if not engine.color_selection:
+                    yield
+    return engine, turns
+
+
+def render_game(game, engine, turns, writer, every=1, per_turn=False, pause=300):
+    # Play the game through game's view, without the GUI's pacing, and write
+    # frames. Animated, frames are 1/fps apart in game time and every
+    # every-th one is kept, with pause ms of stillness after each turn;
+    # per_turn lands all motion at once and keeps one frame per turn.
+    # Returns the number of frames rendered, kept or not.
+    frame_time = 1000 / writer.fps
+    rendered = 0
+
+    def show(dt):
+        nonlocal rendered
+        game.update_animation(dt)
+        game.draw_game()
+        if rendered % every == 0:
+            writer.write(game.screen)
+        rendered += 1
+
+    def settle():
+        if per_turn:
+            show(1e9)
+            return
+        while game.tweens.active:
+            show(frame_time)
+        for _ in range(round(pause / frame_time)):
+            show(frame_time)
+
+    game.attach(engine)
+    engine.setup_game()
+    settle()
+    for _ in turns():
+        settle()
+    return rendered
+
+
+def get_game(reveal):
+    global _game
+    if _game is None:
+        _game = Game()
+        _game.wait_for_assets()
+    _game.reveal_hands = reveal
+    return _game
+
+
+def render_job(job):
+    # Worker: render one seeded or recorded game; returns (name, frames
+    # written, frames rendered, game seconds shown)
+    source, output, fmt, fps, every, per_turn, pause, reveal, max_turns = job
+    game = get_game(reveal)
+    if isinstance(source, int):
+        engine, turns = seeded_game(source, max_turns)
+        name = f"{source:016x}"
+    else:
+        engine, turns = recorded_game(source)
+        name = os.path.splitext(os.path.basename(source))[0]
+    writer = FrameWriter(os.path.join(output, name), fmt, fps)
+    rendered = render_game(game, engine, turns, writer, every, per_turn, pause)
+    writer.close()
+    return name, writer.count, rendered, rendered / fps
+
+
+def render_all(sources, output, fmt="png", fps=30, every=1, per_turn=False, pause=300, reveal=False,
+               workers=None, max_turns=1000):
+    # Render every source (a seed or a replay path) in worker processes,
+    # each keeping one Game for all the games it draws; yields each job's
+    # result as it finishes
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    jobs = [(source, output, fmt, fps, every, per_turn, pause, reveal, max_turns) for source in sources]
+    if workers <= 1:
+        yield from map(render_job, jobs)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(render_job, jobs)
+
+
+def parse_seeds(text):
+    # "7", "0:100" or "1,5,9"
+    if ":" in text:
+        start, stop = text.split(":")
+        return list(range(int(start), int(stop)))
+    return [int(seed) for seed in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render UNO games to image sequences without a window")
+    parser.add_argument("replays", nargs="*", help="replay logs to render")
+    parser.add_argument("--seeds", help="also render seeded AI games: 7, 0:100 or 1,5,9")
+    parser.add_argument("-o", "--output", default="frames")
+    parser.add_argument("--format", choices=FORMATS, default="png")
+    parser.add_argument("--fps", type=int, default=30, help="animation frame rate")
+    parser.add_argument("--every", type=int, default=1, help="keep one frame in this many")
+    parser.add_argument("--per-turn", action="store_true", help="one frame per turn, no motion")
+    parser.add_argument("--pause", type=int, default=300, help="ms of still frames after each turn")
+    parser.add_argument("--reveal", action="store_true", help="show every hand face up")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--max-turns", type=int, default=1000, help="cut seeded games off after this many turns")
+    args = parser.parse_args()
+
+    # Check the logs up front rather than fail partway through the batch
+    for path in args.replays:
+        try:
+            Replay.load(path)
+        except (OSError, ValueError) as e:
+            parser.error(f"{path}: {e}")
+
+    sources = list(args.replays)
+    if args.seeds:
+        sources += parse_seeds(args.seeds)
+    if not sources:
+        parser.error("give replay logs or --seeds")
+
+    start = time.perf_counter()
+    frames = rendered = 0
+    shown = 0.0
+    for name, written, count, seconds in render_all(sources, args.output, args.format, args.fps, args.every,
+                                                    args.per_turn, args.pause, args.reveal, args.workers,
+                                                    args.max_turns):
+        frames += written
+        rendered += count
+        shown += seconds
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(sources)} games, {frames} frames written ({rendered} rendered) to {args.output} "
+          f"in {elapsed:.1f}s: {frames / elapsed:.0f} frames/s")
+    if not args.per_turn:
+        print(f"{shown:.0f}s of play at {args.fps} fps, {shown / elapsed:.1f}x real time")
+
+
+if __name__ == "__main__":
+    main()
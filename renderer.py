@@ -0,0 +1,114 @@
+import pygame
+
+
+class Renderer:
+    # Dirty-rectangle renderer. Each frame the game blits into this object
+    # exactly as it would into the screen, building a display list of
+    # (surface, rect). present() compares it with the previous frame's
+    # list, repaints only the regions where something appeared, moved or
+    # vanished (cached background first, then every item overlapping the
+    # region, in order) and pushes just those rects to the display.
+    def __init__(self, screen, background_color):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+
+        # Static table layer, rendered once
+        self.background = pygame.Surface(self.screen_rect.size).convert()
+        self.background.fill(background_color)
+
+        # Full-screen translucent overlays, by alpha
+        self.overlays = {}
+
+        self.items = []
+        self.previous = []
+        self.full_redraw = True
+
+    def overlay(self, alpha):
+        overlay = self.overlays.get(alpha)
+        if overlay is None:
+            overlay = pygame.Surface(self.screen_rect.size, pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, alpha))
+            self.overlays[alpha] = overlay
+        return overlay
+
+    def blit(self, surface, dest):
+        # Same call shape as Surface.blit; dest is a position or a Rect
+        self.items.append((surface, surface.get_rect(topleft=(dest[0], dest[1]))))
+
+    def invalidate(self):
+        # Repaint everything on the next present(), e.g. after an expose
+        self.full_redraw = True
+
+    def dirty_rects(self):
+        if self.full_redraw:
+            return [self.screen_rect]
+
+        # Items are compared by surface identity and position; the previous
+        # list keeps its surfaces alive, so ids cannot be reused meanwhile.
+        # old maps each key to its indices in the previous list.
+        old = {}
+        for i, (surface, rect) in enumerate(self.previous):
+            key = (id(surface), rect.x, rect.y)
+            indices = old.get(key)
+            if indices is None:
+                old[key] = [i]
+            else:
+                indices.append(i)
+
+        dirty = []
+        highest = -1
+        for surface, rect in self.items:
+            key = (id(surface), rect.x, rect.y)
+            indices = old.get(key)
+            if indices:
+                # Unchanged, unless it now comes before something it used
+                # to be drawn over (e.g. a card landing under its neighbour)
+                i = indices.pop(0)
+                if i < highest:
+                    dirty.append(rect)
+                else:
+                    highest = i
+            else:
+                dirty.append(rect)
+
+        # Whatever is left was drawn last frame but not this one
+        for indices in old.values():
+            for i in indices:
+                dirty.append(self.previous[i][1])
+
+        return merge_rects(dirty, self.screen_rect)
+
+    def present(self):
+        dirty = self.dirty_rects()
+        screen = self.screen
+
+        for region in dirty:
+            screen.set_clip(region)
+            screen.blit(self.background, region, region)
+            for surface, rect in self.items:
+                if rect.colliderect(region):
+                    screen.blit(surface, rect)
+        screen.set_clip(None)
+
+        if dirty:
+            pygame.display.update(dirty)
+
+        self.previous = self.items
+        self.items = []
+        self.full_redraw = False
+        return dirty
+
+
+def merge_rects(rects, bounds):
+    # Fold overlapping rects together so each pixel is repainted once
+    merged = []
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.width or not rect.height:
+            continue
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect = rect.union(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
@@ -0,0 +1,258 @@
+import argparse
+import io
+import os
+import struct
+
+from card import CARDS, COLORS
+from engine import STATE_HEADER, Engine
+from player import Player
+
+# Replay log format: a header, then an append-only stream of records, each
+# a one-byte type and a fixed or length-prefixed payload. Cards are ids.
+#
+#   header    "UNOR", version u8, players u8, seed u64, keyframe interval u16
+#   DEAL      seat u8, count u8, card ids
+#   START     first discard card id
+#   PLAY      seat u8, card id
+#   COLOR     seat u8, color index
+#   DRAW      seat u8, card id (NO_CARD if the piles were empty)
+#   PENALTY   seat u8, count u8, card ids
+#   SKIP      seat u8
+#   REVERSE   new direction i8
+#   WIN       seat u8
+#   KEYFRAME  length u16, full game state (see Engine.snapshot)
+MAGIC = b"UNOR"
+VERSION = 4
+HEADER = struct.Struct("<4sBBQH")
+
+DEAL, START, PLAY, COLOR, DRAW, PENALTY, SKIP, REVERSE, WIN, KEYFRAME = range(1, 11)
+NO_CARD = 255
+
+
+class ReplayWriter:
+    # Listens to an engine and appends its events to a binary log, with a
+    # full-state keyframe at the start and every keyframe_interval turns.
+    # The log is flushed at every keyframe and at the win, so a crash loses
+    # at most the turns since the last keyframe.
+    def __init__(self, engine, out, keyframe_interval=16):
+        self.engine = engine
+        self.out = out
+        self.keyframe_interval = keyframe_interval
+        out.write(HEADER.pack(MAGIC, VERSION, len(engine.players), engine.seed, keyframe_interval))
+        engine.add_listener(self.on_event)
+
+    def write_keyframe(self):
+        state = self.engine.snapshot()
+        self.out.write(struct.pack("<BH", KEYFRAME, len(state)) + state)
+        self.flush()
+
+    def on_event(self, event, *args):
+        write = self.out.write
+        if event == "play":
+            write(bytes((PLAY, args[0], args[1].id)))
+        elif event == "color":
+            write(bytes((COLOR, args[0], COLORS.index(args[1]))))
+        elif event == "draw":
+            write(bytes((DRAW, args[0], NO_CARD if args[1] is None else args[1].id)))
+        elif event == "penalty":
+            seat, cards = args
+            write(bytes([PENALTY, seat, len(cards)] + [card.id for card in cards]))
+        elif event == "skip":
+            write(bytes((SKIP, args[0])))
+        elif event == "reverse":
+            write(struct.pack("<Bb", REVERSE, args[0]))
+        elif event == "turn":
+            if args[0] % self.keyframe_interval == 0:
+                self.write_keyframe()
+        elif event == "win":
+            write(bytes((WIN, args[0])))
+            self.flush()
+        elif event == "deal":
+            seat, cards = args
+            write(bytes([DEAL, seat, len(cards)] + [card.id for card in cards]))
+        elif event == "start":
+            write(bytes((START, args[0].id)))
+            self.write_keyframe()
+
+    def flush(self):
+        if hasattr(self.out, "flush"):
+            self.out.flush()
+
+
+def read_records(data):
+    # Yield (offset, type, payload) for every record after the header. A
+    # log cut off by a crash ends inside a record; reading stops at the
+    # last complete one.
+    pos = HEADER.size
+    size = len(data)
+    while pos < size:
+        offset = pos
+        kind = data[pos]
+        pos += 1
+        if kind in (PLAY, COLOR, DRAW):
+            start, end = pos, pos + 2
+        elif kind in (DEAL, PENALTY):
+            if pos + 2 > size:
+                return
+            start, end = pos, pos + 2 + data[pos + 1]
+        elif kind in (START, SKIP, REVERSE, WIN):
+            start, end = pos, pos + 1
+        elif kind == KEYFRAME:
+            if pos + 2 > size:
+                return
+            (length,) = struct.unpack_from("<H", data, pos)
+            start, end = pos + 2, pos + 2 + length
+        else:
+            raise ValueError(f"bad replay record type {kind} at offset {offset}")
+        if end > size:
+            return
+        pos = end
+        yield offset, kind, data[start:end]
+
+
+def record_size(kind, payload):
+    return 1 + len(payload) + (2 if kind == KEYFRAME else 0)
+
+
+class Replay:
+    # A loaded log. Indexes the keyframes once so any turn can be rebuilt
+    # by restoring the nearest earlier keyframe and replaying the moves
+    # after it, and can re-run the whole game headless to check it.
+    def __init__(self, data):
+        if len(data) < HEADER.size:
+            raise ValueError("not a replay log")
+        magic, version, num_players, seed, interval = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a replay log")
+        self.data = bytes(data)
+        self.num_players = num_players
+        self.seed = seed
+        self.keyframe_interval = interval
+
+        # (turn, position in records) of every keyframe, and the winner.
+        # end is where the last complete record stops, short of the end of
+        # the data if the log was cut off.
+        self.records = list(read_records(self.data))
+        self.end = HEADER.size
+        if self.records:
+            offset, kind, payload = self.records[-1]
+            self.end = offset + record_size(kind, payload)
+        self.truncated = self.end < len(self.data)
+        self.keyframes = []
+        self.winner = None
+        for i, (_, kind, payload) in enumerate(self.records):
+            if kind == KEYFRAME:
+                self.keyframes.append((STATE_HEADER.unpack_from(payload)[0], i))
+            elif kind == WIN:
+                self.winner = payload[0]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def new_engine(self):
+        players = [Player(f"Seat {i}", is_ai=True) for i in range(self.num_players)]
+        return Engine(players, seed=self.seed)
+
+    def apply(self, engine, kind, payload):
+        # Re-apply a player's move; everything else follows from the rules
+        if kind == PLAY:
+            hand = engine.players[payload[0]].hand
+            engine.play_card(hand.index(CARDS[payload[1]]))
+        elif kind == COLOR:
+            engine.choose_color(COLORS[payload[1]])
+        elif kind == DRAW:
+            engine.draw_card_for_player()
+
+    def state_at(self, turn):
+        # The game as it stood after turn moves, as a headless engine
+        if not self.keyframes:
+            raise ValueError("replay log has no complete keyframe")
+        start = self.keyframes[0][1]
+        for keyframe_turn, index in self.keyframes:
+            if keyframe_turn > turn:
+                break
+            start = index
+
+        engine = self.new_engine().restore(self.records[start][2])
+        for _, kind, payload in self.records[start + 1:]:
+            if engine.game_over or (engine.turns >= turn and not engine.color_selection):
+                break
+            self.apply(engine, kind, payload)
+        return engine
+
+    def verify(self):
+        # Replay the whole game from its seed and record it again; the new
+        # log must match this one byte for byte up to its last complete
+        # record. A log cut off by a crash is only checked that far; a
+        # finished one ends where the re-run does, at the win. Returns the
+        # offset of the first difference, or None if the game reproduces.
+        engine = self.new_engine()
+        out = io.BytesIO()
+        ReplayWriter(engine, out, self.keyframe_interval)
+        engine.setup_game()
+        for _, kind, payload in self.records:
+            if engine.game_over:
+                break
+            self.apply(engine, kind, payload)
+
+        rerun = out.getvalue()[:self.end]
+        data = self.data[:self.end]
+        if rerun == data:
+            return None
+        for i, (a, b) in enumerate(zip(rerun, data)):
+            if a != b:
+                return i
+        return min(len(rerun), len(data))
+
+
+def prune_logs(directory, keep):
+    # Delete all but the keep most recently written replay logs in
+    # directory. Returns the paths deleted.
+    logs = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(".unor"):
+            logs.append((entry.stat().st_mtime_ns, entry.path))
+    logs.sort(reverse=True)
+    deleted = []
+    for _, path in logs[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        deleted.append(path)
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or check a recorded UNO game")
+    parser.add_argument("log", help="replay log file")
+    parser.add_argument("--turn", type=int, help="print the game state after this many turns")
+    parser.add_argument("--verify", action="store_true", help="re-run the game headless and compare")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.log)
+    print(f"seed {replay.seed:016x}, {replay.num_players} players, {len(replay.data)} bytes, "
+          f"{len(replay.keyframes)} keyframes, winner: seat {replay.winner}")
+    if replay.truncated:
+        print(f"log cut off: {len(replay.data) - replay.end} bytes after the last complete record ignored")
+
+    if args.turn is not None:
+        engine = replay.state_at(args.turn)
+        print(f"after turn {engine.turns}: seat {engine.current_player} to play on {engine.deck.top_card()}"
+              f"{' (' + engine.wild_color + ')' if engine.wild_color else ''}, direction {engine.direction}")
+        for seat, player in enumerate(engine.players):
+            print(f"  seat {seat}: {', '.join(str(card) for card in player.hand)}")
+
+    if args.verify:
+        offset = replay.verify()
+        if offset is None:
+            print("verify: OK")
+        else:
+            print(f"verify: FAILED, logs differ at byte {offset}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
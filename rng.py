@@ -0,0 +1,45 @@
+import random
+
+MASK64 = (1 << 64) - 1
+
+
+def new_seed():
+    # A fresh 64-bit seed for a game that was not given one
+    return random.getrandbits(64)
+
+
+class SplitMix64:
+    # Small seeded generator for the deck. Its whole state is one 64-bit
+    # int, so game snapshots and replay keyframes can store it cheaply,
+    # unlike random.Random's 2.5 KB Mersenne Twister state.
+    __slots__ = ("state",)
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = new_seed()
+        self.state = seed & MASK64
+
+    def next(self):
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def randbelow(self, n):
+        # Uniform int in [0, n); the bias for a deck-sized n is ~2**-57
+        return (self.next() * n) >> 64
+
+    def random(self):
+        return (self.next() >> 11) / (1 << 53)
+
+    def shuffle(self, items):
+        # Fisher-Yates
+        for i in range(len(items) - 1, 0, -1):
+            j = self.randbelow(i + 1)
+            items[i], items[j] = items[j], items[i]
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import json
+import time
+from card import CARDS, COLORS
+from engine import Engine
+from player import Player
+
+# Longest line a client may send, in bytes
+LINE_LIMIT = 1 << 16
+
+# Line protocol: one compact JSON value per line each way.
+#
+# Client to server, objects:
+#   {"op": "join"}                               sit at the next free table
+#   {"op": "play", "card": id, "color": c}       color only for a wild
+#   {"op": "draw"}
+#   {"op": "stats"}
+#
+# Server to client, arrays; after "start" only what changed is sent, and a
+# seat only ever sees its own cards:
+#   ["wait", table, seat]                        seated, waiting for players
+#   ["start", seat, hand ids, top id, hand sizes, current seat, direction, wild color]
+#   ["play", seat, card id]   ["color", seat, color]   ["uno", seat]
+#   ["draw", seat, card id] to the drawer, ["draw", seat] to the others
+#   ["pass", seat]                               nothing left to draw
+#   ["penalty", seat, [card ids]] to that seat, ["penalty", seat, count] to the others
+#   ["skip", seat]   ["reverse", direction]   ["turn", seat]   ["win", seat]
+#   ["error", message]   ["stats", {...}]
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class Connection:
+    # A client's stream. Messages queue up while a move is resolved and go
+    # out in a single write per move.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.table = None
+        self.seat = None
+        self.outbox = []
+
+    def send(self, message):
+        self.outbox.append(encode(message))
+
+    def flush(self):
+        if self.outbox:
+            self.writer.write(b"".join(self.outbox))
+            self.outbox = []
+
+
+class Table:
+    # One game. Seats hold a Connection for a human or None for an AI,
+    # which moves as soon as its turn comes up; a human who leaves is
+    # replaced by an AI. Runs the headless engine, so no pygame.
+    def __init__(self, server, table_id, num_players, humans):
+        self.server = server
+        self.id = table_id
+        self.seats = [None] * num_players
+        self.humans = humans
+        self.joined = 0
+        self.engine = None
+
+    def join(self, conn):
+        seat = self.seats.index(None)
+        self.seats[seat] = conn
+        self.joined += 1
+        conn.table = self
+        conn.seat = seat
+        conn.send(["wait", self.id, seat])
+        if self.joined == self.humans:
+            self.start()
+        return seat
+
+    def start(self):
+        players = [Player(f"Seat {seat}", is_ai=conn is None) for seat, conn in enumerate(self.seats)]
+        self.engine = Engine(players)
+        self.engine.setup_game()
+        self.engine.add_listener(self.on_event)
+
+        engine = self.engine
+        sizes = [len(player.hand) for player in engine.players]
+        for seat, conn in self.humans_seated():
+            conn.send(["start", seat, [card.id for card in engine.players[seat].hand], engine.deck.top_card().id,
+                       sizes, engine.current_player, engine.direction, engine.wild_color])
+        self.advance()
+
+    def humans_seated(self):
+        return [(seat, conn) for seat, conn in enumerate(self.seats) if conn is not None]
+
+    def broadcast(self, message, seat=None, private=None):
+        # private goes to seat instead of message, if given
+        for other, conn in self.humans_seated():
+            conn.send(private if other == seat and private is not None else message)
+
+    def on_event(self, event, *args):
+        if event in ("play", "color"):
+            seat, value = args
+            self.broadcast([event, seat, value.id if event == "play" else value])
+        elif event == "draw":
+            seat, card = args
+            if card is None:
+                self.broadcast(["pass", seat])
+            else:
+                self.broadcast(["draw", seat], seat, ["draw", seat, card.id])
+        elif event == "penalty":
+            seat, cards = args
+            self.broadcast(["penalty", seat, len(cards)], seat, ["penalty", seat, [card.id for card in cards]])
+        elif event in ("skip", "uno", "win"):
+            self.broadcast([event, args[0]])
+        elif event == "reverse":
+            self.broadcast(["reverse", args[0]])
+        elif event == "turn":
+            self.broadcast(["turn", self.engine.current_player])
+
+    def advance(self):
+        # Play the AI seats until it is a human's turn or the game is over
+        engine = self.engine
+        while not engine.game_over and self.seats[engine.current_player] is None:
+            engine.ai_turn()
+            self.server.moves += 1
+        if engine.game_over:
+            self.server.finish(self)
+
+    def move(self, conn, message):
+        engine = self.engine
+        if engine is None or engine.game_over:
+            conn.send(["error", "game not running"])
+            return
+        if conn.seat != engine.current_player:
+            conn.send(["error", "not your turn"])
+            return
+
+        if message.get("op") == "draw":
+            engine.apply_move(-1)
+        else:
+            hand = engine.players[conn.seat].hand
+            card_id = message.get("card")
+            # type, not isinstance: JSON true and false are ints to Python
+            card = CARDS[card_id] if type(card_id) is int and 0 <= card_id < len(CARDS) else None
+            color = message.get("color")
+            if card is None or card not in hand:
+                conn.send(["error", "card not in hand"])
+                return
+            if not engine.is_playable(card):
+                conn.send(["error", "card cannot be played"])
+                return
+            if card.color == "wild" and color not in COLORS:
+                conn.send(["error", "choose a color for the wild"])
+                return
+            engine.apply_move(hand.index(card), color)
+
+        self.server.moves += 1
+        self.advance()
+
+    def leave(self, conn):
+        self.seats[conn.seat] = None
+        conn.table = None
+        if not self.humans_seated():
+            self.server.finish(self)
+        elif self.engine is not None:
+            self.engine.players[conn.seat].is_ai = True
+            self.advance()
+        else:
+            self.joined -= 1
+
+    def flush(self):
+        for _, conn in self.humans_seated():
+            conn.flush()
+
+
+class TableServer:
+    # Hosts any number of tables in one event loop. Each connection is
+    # seated at the table currently filling up; a table starts once it has
+    # its human players and the rest of its seats go to AI.
+    def __init__(self, num_players=4, humans=1):
+        self.num_players = num_players
+        self.humans = humans
+        self.tables = {}
+        self.filling = None
+        self.next_id = 0
+        self.games = 0
+        self.moves = 0
+        self.started = time.perf_counter()
+
+    def seat(self, conn):
+        if self.filling is None:
+            self.filling = Table(self, self.next_id, self.num_players, self.humans)
+            self.tables[self.next_id] = self.filling
+            self.next_id += 1
+        table = self.filling
+        if table.joined + 1 == self.humans:
+            self.filling = None
+        table.join(conn)
+        return table
+
+    def finish(self, table):
+        if self.tables.pop(table.id, None) is not None and table.engine is not None and table.engine.game_over:
+            self.games += 1
+        if self.filling is table:
+            self.filling = None
+        for _, conn in table.humans_seated():
+            conn.table = None
+
+    def stats(self):
+        return {
+            "tables": len(self.tables),
+            "games": self.games,
+            "moves": self.moves,
+            "cpu": time.process_time(),
+            "uptime": time.perf_counter() - self.started,
+        }
+
+    async def handle(self, reader, writer):
+        conn = Connection(reader, writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Longer than the stream limit; the rest of the line is
+                    # lost, so drop the client rather than read on mid-line
+                    conn.send(["error", "line too long"])
+                    conn.flush()
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    op = message["op"]
+                except (ValueError, TypeError, KeyError):
+                    conn.send(["error", "bad message"])
+                    conn.flush()
+                    continue
+
+                table = conn.table
+                if op == "join":
+                    if table is not None:
+                        conn.send(["error", "already seated"])
+                    else:
+                        table = self.seat(conn)
+                elif op in ("play", "draw"):
+                    if table is None:
+                        conn.send(["error", "not seated"])
+                    else:
+                        table.move(conn, message)
+                elif op == "stats":
+                    conn.send(["stats", self.stats()])
+                else:
+                    conn.send(["error", f"unknown op {op}"])
+
+                if table is not None:
+                    table.flush()
+                conn.flush()
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if conn.table is not None:
+                table = conn.table
+                table.leave(conn)
+                table.flush()
+            writer.close()
+
+
+async def serve(host, port, num_players, humans):
+    server = TableServer(num_players, humans)
+    listener = await asyncio.start_server(server.handle, host, port, limit=LINE_LIMIT)
+    addresses = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"UNO table server on {addresses}: {num_players} seats, {humans} human(s) per table")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host UNO tables over TCP (line-delimited JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--players", type=int, default=4, help="seats per table")
+    parser.add_argument("--humans", type=int, default=1, help="human seats per table; the rest are AI")
+    args = parser.parse_args()
+    if not 1 <= args.humans <= args.players:
+        parser.error(f"--humans must be between 1 and --players ({args.players})")
+    try:
+        asyncio.run(serve(args.host, args.port, args.players, args.humans))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
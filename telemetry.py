@@ -0,0 +1,423 @@
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from card import COLORS
+
+# Telemetry tables, each written as a directory of columns. Every column is
+# a .npy file that numpy.load (or np.load(path, mmap_mode="r")) reads
+# directly; rows are appended a batch at a time and the fixed-size header
+# is rewritten on each flush, so the files are valid between flushes.
+#
+#   games   one row per game: id (its seed), winner seat (NO_SEAT if
+#           unfinished), turns, cards drawn on the player's own turn,
+#           penalty cards taken, reshuffles, and per seat the Draw2 and
+#           Wild4 penalties taken (draw2_<seat>, wild4_<seat>)
+#   wilds   one row per wild played: game, turn, seat, color chosen and
+#           the color of that seat's next card (WILD for another wild,
+#           NO_COLOR if it never played again)
+#   turns   optional, one row per move: game, turn, seat, card played or
+#           drawn (NO_CARD for a draw from empty piles), whether it was a
+#           draw, hand size after
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128
+NO_SEAT = 255
+NO_CARD = 255
+NO_COLOR = 255
+WILD = len(COLORS)
+
+# numpy type kind of each array typecode
+TYPE_KINDS = {"b": "i", "h": "i", "i": "i", "l": "i", "q": "i",
+              "B": "u", "H": "u", "I": "u", "L": "u", "Q": "u", "f": "f", "d": "f"}
+
+
+class ColumnFile:
+    # One .npy column, open for appending
+    def __init__(self, path, typecode):
+        itemsize = array(typecode).itemsize
+        order = "<" if sys.byteorder == "little" else ">"
+        self.descr = f"{'|' if itemsize == 1 else order}{TYPE_KINDS[typecode]}{itemsize}"
+        self.rows = 0
+        self.file = open(path, "w+b")
+        self.write_header()
+
+    def write_header(self):
+        header = f"{{'descr': '{self.descr}', 'fortran_order': False, 'shape': ({self.rows},), }}"
+        header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 3) + "\n"
+        self.file.seek(0)
+        self.file.write(NPY_MAGIC + struct.pack("<H", len(header)) + header.encode("latin1"))
+        self.file.seek(0, os.SEEK_END)
+
+    def append(self, values):
+        values.tofile(self.file)
+        self.rows += len(values)
+
+    def flush(self):
+        self.write_header()
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class Table:
+    # Rows buffered column by column in arrays; once batch_size rows are
+    # waiting they are appended to the column files. With no directory
+    # the rows just wait to be taken (see Telemetry.export).
+    def __init__(self, name, columns, directory=None, batch_size=4096):
+        self.name = name
+        self.columns = columns  # [(name, array typecode)]
+        self.batch_size = batch_size
+        self.buffers = [array(typecode) for _, typecode in columns]
+        self.files = None
+        if directory is not None:
+            path = os.path.join(directory, name)
+            os.makedirs(path, exist_ok=True)
+            self.files = [ColumnFile(os.path.join(path, f"{column}.npy"), typecode) for column, typecode in columns]
+
+    def append(self, row):
+        for buffer, value in zip(self.buffers, row):
+            buffer.append(value)
+        if self.files is not None and len(self.buffers[0]) >= self.batch_size:
+            self.flush()
+
+    def extend(self, buffers):
+        for buffer, values in zip(self.buffers, buffers):
+            buffer.extend(values)
+        if self.files is not None and len(self.buffers[0]) >= self.batch_size:
+            self.flush()
+
+    def take(self):
+        buffers = self.buffers
+        self.buffers = [array(typecode) for _, typecode in self.columns]
+        return buffers
+
+    def flush(self):
+        if self.files is None:
+            return
+        for column, buffer in zip(self.files, self.take()):
+            column.append(buffer)
+            column.flush()
+
+    def close(self):
+        self.flush()
+        if self.files is not None:
+            for column in self.files:
+                column.close()
+            self.files = None
+
+
+class RunningStat:
+    # Count, mean, min and max of a stream, plus a quantile sketch
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self.sketch.add(value)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        for value in (other.minimum, other.maximum):
+            if value is not None:
+                self.minimum = value if self.minimum is None else min(self.minimum, value)
+                self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.sketch.merge(other.sketch)
+
+    def summary(self):
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.total / self.count, "min": self.minimum, "max": self.maximum,
+                "p50": self.sketch.quantile(0.5), "p90": self.sketch.quantile(0.9),
+                "p99": self.sketch.quantile(0.99)}
+
+
+class QuantileSketch:
+    # Quantiles of non-negative values to within a relative error, in
+    # memory that grows with the log of the value range, not the count:
+    # values are counted in buckets whose bounds grow by a factor gamma,
+    # and a quantile is read back as its bucket's midpoint (as DDSketch)
+    def __init__(self, relative_error=0.01):
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.zeros += other.zeros
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class Aggregates:
+    # Whole-run statistics in constant memory, mergeable across processes
+    def __init__(self, num_players):
+        self.num_players = num_players
+        self.games = 0
+        self.unfinished = 0
+        self.wins = [0] * num_players
+        self.draw2_hits = [0] * num_players
+        self.wild4_hits = [0] * num_players
+        self.turns = RunningStat()
+        self.drawn = RunningStat()
+        self.penalty_cards = RunningStat()
+        self.reshuffles = RunningStat()
+        self.wilds = 0
+        self.wilds_followed = 0  # Chooser's next card was the chosen color
+        self.wilds_abandoned = 0  # Chooser never played again
+
+    def add_game(self, winner, turns, drawn, penalty_cards, reshuffles, draw2_hits, wild4_hits):
+        self.games += 1
+        if winner == NO_SEAT:
+            self.unfinished += 1
+        else:
+            self.wins[winner] += 1
+        self.turns.add(turns)
+        self.drawn.add(drawn)
+        self.penalty_cards.add(penalty_cards)
+        self.reshuffles.add(reshuffles)
+        for seat in range(self.num_players):
+            self.draw2_hits[seat] += draw2_hits[seat]
+            self.wild4_hits[seat] += wild4_hits[seat]
+
+    def add_wild(self, chosen, followed):
+        self.wilds += 1
+        if followed == chosen:
+            self.wilds_followed += 1
+        elif followed == NO_COLOR:
+            self.wilds_abandoned += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.unfinished += other.unfinished
+        for seat in range(self.num_players):
+            self.wins[seat] += other.wins[seat]
+            self.draw2_hits[seat] += other.draw2_hits[seat]
+            self.wild4_hits[seat] += other.wild4_hits[seat]
+        for name in ("turns", "drawn", "penalty_cards", "reshuffles"):
+            getattr(self, name).merge(getattr(other, name))
+        self.wilds += other.wilds
+        self.wilds_followed += other.wilds_followed
+        self.wilds_abandoned += other.wilds_abandoned
+
+    def summary(self):
+        return {
+            "games": self.games,
+            "unfinished": self.unfinished,
+            "wins": self.wins,
+            "draw2_hits": self.draw2_hits,
+            "wild4_hits": self.wild4_hits,
+            "turns": self.turns.summary(),
+            "drawn": self.drawn.summary(),
+            "penalty_cards": self.penalty_cards.summary(),
+            "reshuffles": self.reshuffles.summary(),
+            "wilds": self.wilds,
+            "wilds_followed": self.wilds_followed,
+            "wilds_abandoned": self.wilds_abandoned,
+        }
+
+
+class GameRecorder:
+    # Engine listener counting one game's statistics; writes its games row
+    # on the win, or on finish() for a game cut off by a turn limit
+    def __init__(self, telemetry, engine, game_id):
+        self.telemetry = telemetry
+        self.engine = engine
+        self.game_id = game_id
+        num_players = len(engine.players)
+        self.drawn = 0
+        self.penalty_cards = 0
+        self.draw2_hits = [0] * num_players
+        self.wild4_hits = [0] * num_players
+        self.last_card = None
+        self.wilds = [None] * num_players  # Per seat: (turn, chosen color) awaiting its next card
+        self.done = False
+        self.turn_rows = telemetry.turns is not None
+        self.handlers = {"play": self.on_play, "draw": self.on_draw, "color": self.on_color,
+                         "penalty": self.on_penalty, "win": self.finish}
+        engine.add_listener(self.on_event)
+
+    def on_event(self, event, *args):
+        # Most events are turn changes and skips, which cost one lookup
+        handler = self.handlers.get(event)
+        if handler is not None:
+            handler(*args)
+
+    def on_play(self, seat, card):
+        self.last_card = card
+        if self.wilds[seat] is not None:
+            self.end_wild(seat, WILD if card.color == "wild" else COLORS.index(card.color))
+        if self.turn_rows:
+            self.telemetry.add_turn(self, seat, card.id, False)
+
+    def on_draw(self, seat, card):
+        if card is not None:
+            self.drawn += 1
+        if self.turn_rows:
+            self.telemetry.add_turn(self, seat, NO_CARD if card is None else card.id, True)
+
+    def on_color(self, seat, color):
+        self.wilds[seat] = (self.engine.turns, COLORS.index(color))
+
+    def on_penalty(self, seat, cards):
+        self.penalty_cards += len(cards)
+        if self.last_card.value == "Wild4":
+            self.wild4_hits[seat] += 1
+        else:
+            self.draw2_hits[seat] += 1
+
+    def end_wild(self, seat, followed):
+        turn, chosen = self.wilds[seat]
+        self.wilds[seat] = None
+        self.telemetry.add_wild(self.game_id, turn, seat, chosen, followed)
+
+    def finish(self, winner=None):
+        # Record the game; a game still going counts as unfinished
+        if self.done:
+            return
+        self.done = True
+        for seat, pending in enumerate(self.wilds):
+            if pending is not None:
+                self.end_wild(seat, NO_COLOR)
+        self.telemetry.add_game(self.game_id, NO_SEAT if winner is None else winner, self.engine.turns,
+                                self.drawn, self.penalty_cards, self.engine.deck.reshuffles,
+                                self.draw2_hits, self.wild4_hits)
+
+
+class Telemetry:
+    # Sink for game statistics from the GUI or headless runs. watch()
+    # hooks an engine's listener list, so a game pays one call per event.
+    # Rows go to the tables above in batches; whole-run aggregates are kept
+    # in constant memory and written to summary.json on close(). Without
+    # a directory nothing is written: worker processes export() their rows
+    # and aggregates for the parent's sink to absorb().
+    def __init__(self, directory=None, num_players=4, batch_size=4096, turns=False):
+        self.directory = directory
+        self.num_players = num_players
+        self.aggregates = Aggregates(num_players)
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+        game_columns = [("game", "Q"), ("winner", "B"), ("turns", "I"), ("drawn", "H"),
+                        ("penalty_cards", "H"), ("reshuffles", "H")]
+        game_columns += [(f"draw2_{seat}", "H") for seat in range(num_players)]
+        game_columns += [(f"wild4_{seat}", "H") for seat in range(num_players)]
+        self.games = Table("games", game_columns, directory, batch_size)
+        self.wilds = Table("wilds", [("game", "Q"), ("turn", "I"), ("seat", "B"), ("chosen", "B"), ("followed", "B")],
+                           directory, batch_size)
+        self.turns = None
+        if turns:
+            self.turns = Table("turns", [("game", "Q"), ("turn", "I"), ("seat", "B"), ("card", "B"), ("draw", "B"),
+                                         ("hand_size", "B")], directory, batch_size)
+
+    def watch(self, engine, game_id):
+        # Start recording a game; call finish() on the returned recorder
+        # if the game may stop without a winner
+        return GameRecorder(self, engine, game_id)
+
+    def add_game(self, game_id, winner, turns, drawn, penalty_cards, reshuffles, draw2_hits, wild4_hits):
+        self.games.append([game_id, winner, turns, drawn, penalty_cards, reshuffles] + draw2_hits + wild4_hits)
+        self.aggregates.add_game(winner, turns, drawn, penalty_cards, reshuffles, draw2_hits, wild4_hits)
+
+    def add_wild(self, game_id, turn, seat, chosen, followed):
+        self.wilds.append((game_id, turn, seat, chosen, followed))
+        self.aggregates.add_wild(chosen, followed)
+
+    def add_turn(self, recorder, seat, card_id, draw):
+        engine = recorder.engine
+        self.turns.append((recorder.game_id, engine.turns, seat, card_id, draw,
+                           min(len(engine.players[seat].hand), 255)))
+
+    def tables(self):
+        return [table for table in (self.games, self.wilds, self.turns) if table is not None]
+
+    def export(self):
+        # Rows buffered so far and the aggregates, for another sink; both
+        # are reset here
+        exported = ({table.name: table.take() for table in self.tables()}, self.aggregates)
+        self.aggregates = Aggregates(self.num_players)
+        return exported
+
+    def absorb(self, exported):
+        rows, aggregates = exported
+        for table in self.tables():
+            if table.name in rows:
+                table.extend(rows[table.name])
+        self.aggregates.merge(aggregates)
+
+    def flush(self):
+        for table in self.tables():
+            table.flush()
+
+    def close(self):
+        for table in self.tables():
+            table.close()
+        if self.directory is not None:
+            with open(os.path.join(self.directory, "summary.json"), "w") as f:
+                json.dump(self.aggregates.summary(), f, indent=2)
+                f.write("\n")
+
+
+def print_summary(summary):
+    games = summary["games"]
+    print(f"{games} games, {summary['unfinished']} unfinished")
+    for name in ("turns", "drawn", "penalty_cards", "reshuffles"):
+        stat = summary[name]
+        if stat["count"]:
+            print(f"  {name:14} mean {stat['mean']:7.2f}  p50 {stat['p50']:7.1f}  p90 {stat['p90']:7.1f}  "
+                  f"p99 {stat['p99']:7.1f}  max {stat['max']}")
+    for seat, (wins, draw2, wild4) in enumerate(zip(summary["wins"], summary["draw2_hits"], summary["wild4_hits"])):
+        print(f"  seat {seat}: {wins / max(games, 1):6.2%} wins, {draw2} Draw2 and {wild4} Wild4 penalties taken")
+    wilds = summary["wilds"]
+    if wilds:
+        print(f"  {wilds} wilds: the chooser's next card was the chosen color {summary['wilds_followed'] / wilds:.1%} "
+              f"of the time, and {summary['wilds_abandoned'] / wilds:.1%} never played again")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the summary of a telemetry directory")
+    parser.add_argument("directory")
+    args = parser.parse_args()
+    with open(os.path.join(args.directory, "summary.json")) as f:
+        print_summary(json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import threading
+import time
+
+from ai_scheduler import AITurnScheduler
+from engine import Engine
+from player import Player
+
+
+class SlowPlayer(Player):
+    # Thinks until released, then plays its last legal card
+    def __init__(self, name, release):
+        super().__init__(name, is_ai=True)
+        self.release = release
+
+    def ai_play(self, top_card, wild_color=None):
+        self.release.wait(5)
+        moves = self.legal_moves(top_card, wild_color)
+        return moves[-1] if moves else -1
+
+
+class BrokenPlayer(Player):
+    def ai_play(self, top_card, wild_color=None):
+        raise RuntimeError("search failed")
+
+    def choose_color(self):
+        raise RuntimeError("search failed")
+
+
+def engine_with(first):
+    players = [first] + [Player(f"AI {seat}", is_ai=True) for seat in range(1, 4)]
+    engine = Engine(players, seed=5)
+    engine.setup_game()
+    engine.current_player = 0
+    return engine
+
+
+def wait_for(scheduler, now, limit=5):
+    end = time.monotonic() + limit
+    while time.monotonic() < end:
+        move = scheduler.poll(now)
+        if move is not None:
+            return move
+        time.sleep(0.001)
+    raise AssertionError("no move")
+
+
+def test_fallback_ignores_the_players_own_policy():
+    engine = engine_with(BrokenPlayer("broken", is_ai=True))
+    plain = Player("plain")
+    plain.load_hand(engine.players[0].hand[:])
+    card_idx, color = engine.ai_decide(fallback=True)
+    assert card_idx == Player.ai_play(plain, engine.deck.top_card(), engine.wild_color)
+
+
+def test_failed_decision_plays_the_fallback():
+    engine = engine_with(BrokenPlayer("broken", is_ai=True))
+    scheduler = AITurnScheduler(delay=0, budget=10000)
+    scheduler.start(engine, 0)
+    assert wait_for(scheduler, 0) == engine.ai_decide(fallback=True)
+    assert not scheduler.thinking
+    scheduler.shutdown()
+
+
+def test_overrun_decision_does_not_hold_up_the_next_one():
+    release = threading.Event()
+    engine = engine_with(SlowPlayer("slow", release))
+    scheduler = AITurnScheduler(delay=0, budget=100)
+    started = time.monotonic()
+    scheduler.start(engine, 0)
+    assert scheduler.poll(50) is None
+    assert scheduler.poll(100) == engine.ai_decide(fallback=True)
+
+    # The stale search is still running; the next seat's decision must
+    # not wait for it
+    engine.current_player = 1
+    scheduler.start(engine, 200)
+    try:
+        assert wait_for(scheduler, 200, limit=2) == engine.ai_decide()
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
+        scheduler.shutdown()
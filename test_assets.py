@@ -0,0 +1,69 @@
+import os
+import wave
+import zipfile
+
+import pytest
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from assets import AssetBundle, build_bundle, read_assets
+
+
+@pytest.fixture
+def source(tmp_path):
+    # A red 0 card image and an uno sound, laid out as build_bundle expects
+    os.makedirs(tmp_path / "cards")
+    os.makedirs(tmp_path / "sounds")
+    face = pygame.Surface((10, 15))
+    face.fill((200, 0, 0))
+    pygame.image.save(face, str(tmp_path / "cards" / "red_0.png"))
+    with wave.open(str(tmp_path / "sounds" / "uno.wav"), "wb") as sound:
+        sound.setnchannels(1)
+        sound.setsampwidth(2)
+        sound.setframerate(22050)
+        sound.writeframes(b"\x00\x01" * 2205)
+    return tmp_path
+
+
+def test_bundle_round_trip(source, tmp_path):
+    path = tmp_path / "assets.zip"
+    manifest = build_bundle(str(source), str(path))
+    assert manifest == {"cards": {"red_0": "cards/red_0.png"}, "sounds": {"uno": "sounds/uno.wav"}}
+
+    bundle = AssetBundle(str(path))
+    try:
+        assert bundle.names("cards") == ["red_0"]
+        assert bundle.read("cards", "red_0") == (source / "cards" / "red_0.png").read_bytes()
+        assert bundle.read("sounds", "uno") == (source / "sounds" / "uno.wav").read_bytes()
+        assert bundle.read("sounds", "win") is None
+    finally:
+        bundle.close()
+
+
+def test_read_assets_decodes_images_and_sounds(source, tmp_path):
+    path = tmp_path / "assets.zip"
+    build_bundle(str(source), str(path))
+    try:
+        sounds, images = read_assets(str(path))
+        assert images["red_0"].get_size() == (10, 15)
+        assert images["red_0"].get_at((5, 5))[:3] == (200, 0, 0)
+        if pygame.mixer.get_init():
+            assert sounds["uno"].get_length() == pytest.approx(0.1, abs=0.02)
+        assert sounds["win"] is None
+    finally:
+        pygame.mixer.quit()
+
+
+def test_missing_bundle_is_empty(tmp_path):
+    bundle = AssetBundle(str(tmp_path / "none.zip"))
+    assert bundle.names("cards") == []
+    assert bundle.read("sounds", "uno") is None
+
+
+def test_zip_without_manifest_is_refused(tmp_path):
+    path = tmp_path / "assets.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as bundle:
+        bundle.writestr("cards/red_0.png", b"")
+    with pytest.raises(ValueError, match="manifest.json"):
+        AssetBundle(str(path))
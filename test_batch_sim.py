@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from batch_sim import check_against_engine
+
+
+@pytest.mark.parametrize("num_players", [2, 4, 6])
+def test_matches_engine(num_players):
+    mismatches, _ = check_against_engine(0, 50, num_players)
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("max_turns", [1, 25])
+def test_matches_engine_mid_game(max_turns):
+    # Games stopped early compare every hand and pile mid-game
+    mismatches, _ = check_against_engine(100, 50, 4, max_turns)
+    assert mismatches == []
@@ -0,0 +1,44 @@
+import importlib.util
+import json
+
+import pytest
+
+import bench
+
+
+def needs(name):
+    # Benchmarks needing an optional package are skipped without it
+    if name.startswith("batch_sim"):
+        return "numpy"
+    if name.startswith("game."):
+        return "pygame"
+    return None
+
+
+@pytest.mark.parametrize("name", sorted(bench.BENCHMARKS))
+def test_every_benchmark_runs(name):
+    module = needs(name)
+    if module is not None and importlib.util.find_spec(module) is None:
+        pytest.skip(f"needs {module}")
+    op = bench.BENCHMARKS[name]()
+    op()
+    op()
+
+
+def test_baseline_covers_the_suite():
+    with open(bench.BASELINE_PATH) as f:
+        baseline = json.load(f)
+    assert set(baseline["results"]) == set(bench.BENCHMARKS)
+
+
+def test_compare_flags_only_regressions_past_the_threshold():
+    baseline = {"machine": "test", "python": "3", "results": {"a": 1.0, "b": 1.0, "c": 1.0}}
+    results = {"a": 1.2, "b": 1.3, "c": 0.5, "new": 1.0}
+    assert bench.compare(results, baseline, 0.25) == ["b"]
+
+
+def test_measure_times_one_call():
+    calls = []
+    seconds = bench.measure(lambda: calls.append(None), min_time=0.001, repeat=2)
+    assert 0 < seconds < 0.001
+    assert len(calls) > 1
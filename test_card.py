@@ -0,0 +1,36 @@
+import pickle
+
+import pytest
+
+from card import ALL_MASK, CARDS, COLORS, can_play, card_kinds, get_card, playable_mask
+
+
+def test_one_shared_card_per_kind():
+    assert len(CARDS) == len(card_kinds()) == 54
+    assert [card.id for card in CARDS] == list(range(54))
+    for card in CARDS:
+        assert get_card(card.color, card.value) is card
+
+
+def test_cards_are_immutable():
+    card = get_card("red", "7")
+    with pytest.raises(AttributeError):
+        card.color = "blue"
+    with pytest.raises(AttributeError):
+        card.wild_color = "blue"
+
+
+def test_cards_unpickle_to_the_shared_instance():
+    for card in CARDS:
+        assert pickle.loads(pickle.dumps(card)) is card
+
+
+def test_playable_mask_matches_can_play():
+    for top in CARDS + [None]:
+        for wild_color in [None] + COLORS:
+            if wild_color is not None and (top is None or top.color != "wild"):
+                continue
+            mask = playable_mask(top, wild_color)
+            expected = sum(1 << card.id for card in CARDS if can_play(card, top, wild_color))
+            assert mask == expected
+    assert playable_mask(None) == ALL_MASK
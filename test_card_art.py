@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+import card_art
+from card import CARD_HEIGHT, CARD_WIDTH, CARDS, card_kinds
+
+
+@pytest.fixture(autouse=True)
+def fonts():
+    pygame.font.init()
+    card_art.set_card_images({})
+    yield
+    card_art.set_card_images({})
+
+
+def test_faces_and_backs_are_shared():
+    assert card_art.card_face("red", "7") is card_art.card_face("red", "7")
+    assert card_art.card_back() is card_art.card_back()
+    assert card_art.card_face("red", "7").get_size() == (CARD_WIDTH, CARD_HEIGHT)
+    assert card_art.card_face("red", "7", (50, 75)).get_size() == (50, 75)
+    assert card_art.card_face("red", "7") is not card_art.card_face("blue", "7")
+
+
+def test_preload_builds_every_kind_once():
+    card_art.preload()
+    faces = {kind: card_art.card_face(*kind) for kind in card_kinds()}
+    assert len(set(map(id, faces.values()))) == len(CARDS) == 54
+    card_art.preload()
+    assert all(card_art.card_face(*kind) is face for kind, face in faces.items())
+
+
+def test_bundle_art_replaces_drawn_faces():
+    drawn = card_art.card_face("green", "3")
+    art = pygame.Surface((20, 30))
+    art.fill((1, 2, 3))
+    card_art.set_card_images({"green_3": art})
+    face = card_art.card_face("green", "3")
+    assert face is not drawn
+    assert face.get_size() == (CARD_WIDTH, CARD_HEIGHT)
+    assert face.get_at((CARD_WIDTH // 2, CARD_HEIGHT // 2))[:3] == (1, 2, 3)
+
+
+def test_back_strip_is_cached_per_count_and_spacing():
+    strip = card_art.back_strip(5, 12)
+    assert strip.get_size() == (CARD_WIDTH + 4 * 12, CARD_HEIGHT)
+    assert card_art.back_strip(5, 12) is strip
+    assert card_art.back_strip(6, 12) is not strip
+
+
+def test_draw_card_blits_the_atlas_surface():
+    target = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
+    card = CARDS[0]
+    card_art.draw_card(target, card, 0, 0)
+    face = card_art.card_face(card.color, card.value)
+    assert target.get_at((10, 10)) == face.get_at((10, 10))
@@ -0,0 +1,96 @@
+import pytest
+
+from deck import Deck
+from player import Player
+from rng import SplitMix64
+
+# Seeded check that draws are uniformly random: deal out a pile of distinct
+# cards TRIALS times and count which card came out at each draw position,
+# then refill the pile by recycling and count again. With uniform draws
+# every (position, card) cell expects TRIALS/PILE and the chi-square
+# statistic stays near its degrees of freedom; the same is checked for the
+# first two draws together. Limits are four standard deviations above.
+TRIALS = 20000
+PILE = 12
+
+
+def chi_square(counts, expected):
+    return sum((count - expected) ** 2 / expected for count in counts)
+
+
+def limit(dof):
+    return dof + 4 * (2 * dof) ** 0.5
+
+
+@pytest.fixture(scope="module")
+def draws():
+    deck = Deck.__new__(Deck)
+    deck.rng = SplitMix64(1)
+    deck.reshuffles = 0
+    fresh = [[0] * PILE for _ in range(PILE)]
+    recycled = [[0] * (PILE - 1) for _ in range(PILE - 1)]
+    pairs = [0] * (PILE * PILE)
+    for _ in range(TRIALS):
+        deck.cards = list(range(PILE))
+        deck.discard_pile = []
+        drawn = [deck.draw_card() for _ in range(PILE)]
+        for position, card in enumerate(drawn):
+            fresh[position][card] += 1
+        pairs[drawn[0] * PILE + drawn[1]] += 1
+
+        # Discard in draw order; the last card stays on top, so the
+        # recycled pile holds every card but that one
+        deck.discard_pile.extend(drawn)
+        top = drawn[-1]
+        for position in range(PILE - 1):
+            card = deck.draw_card()
+            recycled[position][card - (card > top)] += 1
+    return fresh, recycled, pairs
+
+
+@pytest.mark.parametrize("pile", [0, 1], ids=["fresh pile", "recycled pile"])
+def test_draw_positions_uniform(draws, pile):
+    rows = draws[pile]
+    cells = [count for row in rows for count in row]
+    assert chi_square(cells, TRIALS / len(rows)) <= limit((len(rows) - 1) ** 2)
+
+
+def test_first_two_draws_uniform(draws):
+    pairs = draws[2]
+    cells = [pairs[a * PILE + b] for a in range(PILE) for b in range(PILE) if a != b]
+    assert chi_square(cells, TRIALS / len(cells)) <= limit(len(cells) - 1)
+
+
+def deck_after(seed, draws):
+    deck = Deck(SplitMix64(seed))
+    for _ in range(draws):
+        deck.add_to_discard(deck.draw_card())
+    return deck
+
+
+@pytest.mark.parametrize("count", [0, 1, 7, 28, 200])
+def test_draw_cards_matches_single_draws(count):
+    # A batch gives the same cards as the same number of single draws,
+    # recycling the discard pile at the same point
+    batch, single = deck_after(5, 100), deck_after(5, 100)
+    drawn = batch.draw_cards(count)
+    expected = []
+    for _ in range(count):
+        card = single.draw_card()
+        if card is None:
+            break
+        expected.append(card)
+    assert drawn == expected
+    assert batch.cards == single.cards
+    assert batch.discard_pile == single.discard_pile
+    assert batch.reshuffles == single.reshuffles
+
+
+def test_deal_is_round_robin():
+    players = [Player(f"p{seat}") for seat in range(4)]
+    deck = Deck(SplitMix64(6))
+    deck.deal(players, 7)
+    cards = Deck(SplitMix64(6)).draw_cards(28)
+    for seat, player in enumerate(players):
+        assert sorted(card.id for card in player.hand) == sorted(card.id for card in cards[seat::4])
+    assert len(deck.cards) == 108 - 28
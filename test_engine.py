@@ -0,0 +1,142 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from card import get_card
+from engine import Engine
+from player import Player
+
+
+def new_engine(seed, num_players=4):
+    return Engine([Player(f"AI {seat}", is_ai=True) for seat in range(num_players)], seed=seed)
+
+
+def mid_game(seed, turns, num_players=4):
+    engine = new_engine(seed, num_players)
+    engine.setup_game()
+    while not engine.game_over and engine.turns < turns:
+        engine.ai_turn()
+    return engine
+
+
+@pytest.mark.parametrize("num_players", [2, 4, 6])
+@pytest.mark.parametrize("turns", [0, 1, 20, 60])
+def test_snapshot_restore_continues_the_same_game(num_players, turns):
+    for seed in range(5):
+        engine = mid_game(seed, turns, num_players)
+        data = engine.snapshot()
+        restored = new_engine(seed + 1000, num_players).restore(data)
+        assert restored.snapshot() == data
+        assert restored.deck.reshuffles == engine.deck.reshuffles
+        assert restored.run() == engine.run()
+        assert restored.turns == engine.turns
+
+
+def test_clone_plays_out_independently():
+    engine = mid_game(3, 20)
+    data = engine.snapshot()
+    copy = engine.clone()
+    assert copy.snapshot() == data
+    winner = copy.run()
+    assert engine.snapshot() == data
+    assert engine.run() == winner
+
+
+def test_restore_rejects_other_seat_count():
+    with pytest.raises(ValueError):
+        new_engine(1, 2).restore(mid_game(1, 5).snapshot())
+
+
+def test_restore_replaces_the_reshuffle_count():
+    # An engine that recycled its discard pile in an earlier game must not
+    # carry the count into a restored one. Ten seats leave a short draw
+    # pile, so some games recycle.
+    recycled = [engine for engine in (mid_game(seed, 10000, 10) for seed in range(20)) if engine.deck.reshuffles]
+    used, other = recycled[:2]
+    fresh = mid_game(1, 5, 10)
+    assert fresh.deck.reshuffles == 0
+    assert used.restore(fresh.snapshot()).deck.reshuffles == 0
+    assert new_engine(1, 10).restore(other.snapshot()).deck.reshuffles == other.deck.reshuffles
+
+
+def test_engine_runs_without_pygame():
+    # The rules engine must not pull in pygame, so headless runs need no
+    # display, mixer or fonts
+    code = "import sys, engine; engine.Engine(seed=1).setup_game(); assert 'pygame' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("num_players", [2, 3, 4, 6])
+def test_headless_games_finish_and_keep_every_card(num_players):
+    for seed in range(20):
+        engine = new_engine(seed, num_players)
+        engine.setup_game()
+        assert [len(player.hand) for player in engine.players] == [7] * num_players
+        while not engine.game_over:
+            engine.ai_turn()
+            held = sum(len(player.hand) for player in engine.players)
+            assert held + len(engine.deck.cards) + len(engine.deck.discard_pile) == 108
+        assert engine.winner is not None
+        assert not engine.winner.hand
+
+
+def test_same_seed_same_game():
+    assert mid_game(9, 10000).snapshot() == mid_game(9, 10000).snapshot()
+    assert mid_game(9, 10000).snapshot() != mid_game(10, 10000).snapshot()
+
+
+def rigged(top, hand, num_players=4):
+    # Seat 0 to move with hand against top; everyone else holds 3 cards
+    engine = new_engine(0, num_players)
+    engine.setup_game()
+    engine.deck.add_to_discard(get_card(*top))
+    engine.wild_color = None
+    engine.players[0].set_hand([get_card(*card) for card in hand])
+    for player in engine.players[1:]:
+        player.set_hand(player.hand[:3])
+    return engine
+
+
+def play(engine, color, value):
+    engine.apply_move(engine.players[engine.current_player].hand.index(get_card(color, value)))
+
+
+def test_skip_reverse_and_draw_two():
+    engine = rigged(("red", "5"), [("red", "Skip"), ("red", "1")])
+    play(engine, "red", "Skip")
+    assert engine.current_player == 2
+
+    engine = rigged(("red", "5"), [("red", "Reverse"), ("red", "1")])
+    play(engine, "red", "Reverse")
+    assert engine.direction == -1
+    assert engine.current_player == 3
+
+    engine = rigged(("red", "5"), [("red", "Draw2"), ("red", "1")])
+    play(engine, "red", "Draw2")
+    assert len(engine.players[1].hand) == 5
+    assert engine.current_player == 2
+
+
+def test_wild_waits_for_its_color():
+    engine = rigged(("red", "5"), [("wild", "Wild4"), ("blue", "1")])
+    events = []
+    engine.add_listener(lambda event, *args: events.append(event))
+    engine.play_card(engine.players[0].hand.index(get_card("wild", "Wild4")))
+    assert engine.color_selection
+    assert engine.current_player == 0
+    engine.choose_color("blue")
+    assert engine.wild_color == "blue"
+    assert len(engine.players[1].hand) == 7
+    assert engine.current_player == 2
+    assert events == ["play", "uno", "color", "penalty", "skip", "turn"]
+    assert engine.is_playable(get_card("blue", "9"))
+    assert not engine.is_playable(get_card("red", "5"))
+
+
+def test_playing_the_last_card_wins():
+    engine = rigged(("red", "5"), [("red", "7")])
+    play(engine, "red", "7")
+    assert engine.game_over
+    assert engine.winner is engine.players[0]
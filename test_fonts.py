@@ -0,0 +1,37 @@
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import fonts
+
+
+@pytest.fixture(autouse=True)
+def font_module():
+    pygame.font.init()
+    fonts._texts.clear()
+    yield
+    fonts._texts.clear()
+
+
+def test_fonts_are_resolved_once():
+    assert fonts.get_font(size=17) is fonts.get_font(size=17)
+    assert fonts.get_font(size=17) is not fonts.get_font(size=17, bold=True)
+
+
+def test_labels_are_rendered_once():
+    label = fonts.render_text("Cards: 7", (255, 255, 255))
+    assert fonts.render_text("Cards: 7", (255, 255, 255)) is label
+    assert fonts.render_text("Cards: 7", (255, 255, 0)) is not label
+    assert fonts.render_text("Cards: 7", (255, 255, 255), size=20) is not label
+
+
+def test_label_cache_is_a_bounded_lru():
+    first = fonts.render_text("label 0", (0, 0, 0))
+    for i in range(1, fonts.MAX_TEXTS):
+        fonts.render_text(f"label {i}", (0, 0, 0))
+    # Touch the oldest so the next new label evicts "label 1" instead
+    assert fonts.render_text("label 0", (0, 0, 0)) is first
+    fonts.render_text("one more", (0, 0, 0))
+    assert len(fonts._texts) == fonts.MAX_TEXTS
+    assert fonts.render_text("label 0", (0, 0, 0)) is first
+    assert ("Arial", 24, False, "label 1", (0, 0, 0)) not in fonts._texts
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from card import get_card
+from engine import Engine
+from player import Player
+
+
+@pytest.fixture(scope="module")
+def window():
+    from game import Game
+    game = Game()
+    game.wait_for_assets()
+    yield game
+    game.ai_scheduler.shutdown()
+
+
+@pytest.fixture
+def game(window):
+    # A fresh table with plain AI seats, dealt cards already landed; like
+    # the benchmarks, no search processes and no replay log
+    players = [Player("You", is_ai=False)] + [Player(f"AI {i}", is_ai=True) for i in range(1, 4)]
+    engine = Engine(players, seed=3)
+    window.attach(engine)
+    engine.setup_game()
+    window.update_animation(10000)
+    return window
+
+
+def human_turn(game, hand):
+    # Give the human hand on a red 5 and the turn
+    engine = game.engine
+    engine.deck.add_to_discard(get_card("red", "5"))
+    engine.wild_color = None
+    engine.current_player = 0
+    game.players[0].set_hand([get_card(*card) for card in hand])
+
+
+def press(game, key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+    game.handle_events()
+
+
+def test_number_key_selects_and_enter_plays(game):
+    human_turn(game, [("red", "1"), ("blue", "2"), ("red", "7")])
+    # Sorted: red 1, red 7, blue 2
+    press(game, pygame.K_3)
+    assert game.selected_card == -1  # blue 2 can't go on red 5
+    press(game, pygame.K_2)
+    assert game.selected_card == 1
+    assert len(game.players[0].hand) == 3
+
+    game.draw_game()
+    raised = game.layout.card_rect(0, 1, 1)
+    assert raised.y < game.layout.card_rect(0, 1).y
+
+    press(game, pygame.K_RETURN)
+    assert game.deck.discard_pile[-1] is get_card("red", "7")
+    assert game.selected_card == -1
+
+
+def test_selection_is_dropped_when_the_hand_changes(game):
+    human_turn(game, [("red", "1"), ("blue", "2")])
+    press(game, pygame.K_1)
+    assert game.selected_card == 0
+    press(game, pygame.K_d)
+    assert game.selected_card == -1
+    game.tweens.clear()
+    press(game, pygame.K_RETURN)
+    assert game.deck.discard_pile[-1] is get_card("red", "5")
+
+
+def test_idle_timeout(game):
+    # Animating: no sleep; human to move: sleep until input
+    game.tweens.add(None, (0, 0), (1, 1), 100)
+    assert game.idle_timeout() == 0
+    game.tweens.clear()
+    game.engine.current_player = 0
+    assert game.idle_timeout() is None
+
+    # An AI seat that hasn't started thinking needs a frame now; one that
+    # is thinking can sleep until its move is due
+    game.engine.current_player = 1
+    assert game.idle_timeout() == 0
+    game.ai_turn()
+    assert game.ai_scheduler.thinking
+    assert 0 < game.idle_timeout() <= game.ai_scheduler.delay
+    game.ai_scheduler.cancel()
+
+    game.engine.game_over = True
+    assert game.idle_timeout() is None
+
+
+def test_event_that_ends_the_wait_is_handled_first(game):
+    human_turn(game, [("red", "1"), ("red", "7")])
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_2))
+    woken_by = game.wait_for_event(None)
+    assert woken_by.key == pygame.K_2
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_1))
+    game.handle_events(woken_by)
+    assert game.selected_card == 0
+    assert game.wait_for_event(1) is None
@@ -0,0 +1,88 @@
+import random
+from collections import Counter
+
+from card import CARDS, COLORS, get_card
+from engine import Engine
+from ismcts import DRAW, FULL_COUNTS, ISMCTSPlayer, better_move, determinize, legal_moves, search
+from player import HeuristicPlayer, Player
+
+
+def dealt(seed=4, num_players=4):
+    engine = Engine([Player(f"AI {seat}", is_ai=True) for seat in range(num_players)], seed=seed)
+    engine.setup_game()
+    for _ in range(5):
+        engine.ai_turn()
+    return engine
+
+
+def test_legal_moves_are_distinct_with_a_move_per_wild_color():
+    engine = dealt()
+    engine.deck.add_to_discard(get_card("red", "5"))
+    engine.wild_color = None
+    engine.players[engine.current_player].set_hand(
+        [get_card("red", "1"), get_card("red", "1"), get_card("blue", "5"), get_card("wild", "Wild"),
+         get_card("green", "2")])
+    moves = legal_moves(engine)
+    wild = get_card("wild", "Wild").id
+    assert sorted(moves, key=str) == sorted(
+        [(get_card("red", "1").id, None), (get_card("blue", "5").id, None)] + [(wild, color) for color in COLORS],
+        key=str)
+
+    engine.players[engine.current_player].set_hand([get_card("green", "2")])
+    assert legal_moves(engine) == [DRAW]
+
+
+def test_determinize_keeps_what_the_seat_sees():
+    engine = dealt()
+    observation = engine.observe()
+    for seed in range(20):
+        state = determinize(observation, random.Random(seed), HeuristicPlayer)
+        seat = observation["seat"]
+        assert [type(player) for player in state.players] == [
+            HeuristicPlayer if i == seat else Player for i in range(len(state.players))]
+        assert [card.id for card in state.players[seat].hand] == observation["hand"]
+        assert [len(player.hand) for player in state.players] == observation["hand_sizes"]
+        assert [card.id for card in state.deck.discard_pile] == observation["discard"]
+        assert (state.current_player, state.direction, state.wild_color) == (
+            observation["current_player"], observation["direction"], observation["wild_color"])
+        held = Counter(card.id for player in state.players for card in player.hand)
+        held.update(card.id for card in state.deck.cards + state.deck.discard_pile)
+        assert [held[card.id] for card in CARDS] == FULL_COUNTS
+
+
+def test_search_visits_only_legal_root_moves():
+    engine = dealt()
+    stats, rollouts = search(engine.observe(), iterations=100, seed=1)
+    assert rollouts == 100
+    assert set(stats) <= set(legal_moves(engine))
+    assert sum(visits for visits, _ in stats.values()) == 100
+    assert all(0 <= wins <= visits for visits, wins in stats.values())
+
+
+def test_better_move_needs_a_clear_margin():
+    default = (1, None)
+    # Ahead, but within noise or on too few visits
+    assert better_move({default: (100, 30), (2, None): (100, 38)}, default) == default
+    assert better_move({default: (100, 30), (2, None): (9, 9)}, default) == default
+    # Clearly ahead; the best of two that both clear the bar
+    assert better_move({default: (100, 30), (2, None): (100, 50)}, default) == (2, None)
+    assert better_move({default: (100, 30), (2, None): (100, 50), (3, "red"): (100, 60)}, default) == (3, "red")
+    # A default that was never tried stands
+    assert better_move({(2, None): (100, 90)}, default) == default
+
+
+def test_player_makes_legal_seeded_moves():
+    for seed in range(5):
+        engine = dealt(seed)
+        moves = set(legal_moves(engine))
+        first = ISMCTSPlayer("s", iterations=60, seed=9)
+        first.set_hand(engine.players[engine.current_player].hand)
+        engine.players[engine.current_player] = first
+        card_idx, color = first.decide(engine)
+        move = DRAW if card_idx < 0 else (first.hand[card_idx].id, color)
+        assert move in moves
+
+        again = ISMCTSPlayer("s", iterations=60, seed=9)
+        again.set_hand(first.hand)
+        engine.players[engine.current_player] = again
+        assert again.decide(engine) == (card_idx, color)
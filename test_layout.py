@@ -0,0 +1,108 @@
+import pytest
+
+pytest.importorskip("pygame")
+
+from card import CARDS
+from layout import TableLayout
+from player import Player
+
+
+def table(counts):
+    players = []
+    for seat, count in enumerate(counts):
+        player = Player(f"seat {seat}")
+        player.add_cards([CARDS[i % len(CARDS)] for i in range(count)])
+        players.append(player)
+    return players
+
+
+def test_seat_keys_change_only_for_the_seat_that_changed():
+    layout = TableLayout(1024, 768)
+    players = table([7, 7, 7, 7])
+    layout.update(players)
+    before = list(layout.seat_keys)
+
+    players[2].add_card(CARDS[20])
+    assert layout.update(players)
+    assert layout.seat_keys[2] != before[2]
+    assert [layout.seat_keys[seat] for seat in (0, 1, 3)] == [before[seat] for seat in (0, 1, 3)]
+
+
+def test_scrolling_changes_only_the_human_seat():
+    layout = TableLayout(1024, 768)
+    players = table([60, 7, 7, 7])
+    layout.update(players)
+    before = list(layout.seat_keys)
+    layout.scroll_by(60)
+    assert layout.update(players)
+    assert layout.seat_keys[0] != before[0]
+    assert layout.seat_keys[1:] == before[1:]
+
+
+def test_hand_version_moves_with_every_change():
+    player = Player("p")
+    versions = [player.version]
+    player.add_card(CARDS[3])
+    versions.append(player.version)
+    player.add_cards([CARDS[1], CARDS[2]])
+    versions.append(player.version)
+    player.play_card(0)
+    versions.append(player.version)
+    player.set_hand([CARDS[5]])
+    versions.append(player.version)
+    player.load_hand([CARDS[6]])
+    versions.append(player.version)
+    player.sort_hand()
+    versions.append(player.version)
+    assert versions == sorted(set(versions))
+    assert player.play_card(5) is None
+    assert player.version == versions[-1]
+
+
+def test_card_at_finds_the_topmost_card():
+    layout = TableLayout(1024, 768)
+    players = table([7, 7, 7, 7])
+    layout.update(players)
+    for seat in range(4):
+        rects = layout.hands[seat]
+        for i, rect in enumerate(rects):
+            # The left edge of a card is covered by nothing before it; the
+            # part under the next card belongs to that one
+            assert layout.card_at(seat, (rect.x + 1, rect.centery)) == i
+        last = rects[-1]
+        assert layout.card_at(seat, (last.right - 1, last.centery)) == len(rects) - 1
+        assert layout.card_at(seat, (last.right + 5, last.centery)) == -1
+    assert layout.card_at(0, (0, 0)) == -1
+
+
+def test_card_at_matches_a_scan_of_the_rects():
+    layout = TableLayout(1024, 768)
+    players = table([60, 12, 30, 9])
+    layout.scroll_by(300)
+    layout.update(players)
+    for seat in range(4):
+        area = layout.areas[seat]
+        for x in range(area.left - 5, area.right + 5, 7):
+            for y in (area.top + 2, area.centery, area.bottom - 2):
+                expected = -1
+                if area.collidepoint(x, y):
+                    for i, rect in enumerate(layout.hands[seat]):
+                        if rect.collidepoint(x, y):
+                            expected = i
+                assert layout.card_at(seat, (x, y)) == expected
+
+
+def test_raised_card_is_hit_above_the_hand():
+    layout = TableLayout(1024, 768)
+    players = table([7, 7, 7, 7])
+    layout.update(players)
+    rect = layout.card_rect(0, 3, raised=3)
+    assert layout.card_at(0, (rect.x + 1, rect.y + 2), raised=3) == 3
+    assert layout.card_at(0, (rect.x + 1, rect.y + 2)) == -1
+
+
+def test_button_at():
+    layout = TableLayout(1024, 768)
+    for color, rect in layout.buttons:
+        assert layout.button_at(rect.center) == color
+    assert layout.button_at((0, 0)) is None
@@ -0,0 +1,98 @@
+import random
+
+from card import CARDS, COLORS, can_play, get_card
+from engine import Engine
+from player import HeuristicPlayer, Player, hand_order_key
+
+
+def random_hand(rng, size):
+    return [rng.choice(CARDS) for _ in range(size)]
+
+
+def check_index(player):
+    assert player.counts == [sum(card is kind for card in player.hand) for kind in CARDS]
+    assert player.color_counts == {color: sum(card.color == color for card in player.hand)
+                                   for color in COLORS + ["wild"]}
+    assert player.mask == sum(1 << card.id for card in set(player.hand))
+
+
+def test_index_follows_adds_and_plays():
+    rng = random.Random(1)
+    player = Player("p")
+    for _ in range(200):
+        if player.hand and rng.random() < 0.4:
+            player.play_card(rng.randrange(len(player.hand)))
+        elif rng.random() < 0.5:
+            player.add_card(rng.choice(CARDS))
+        else:
+            player.add_cards(random_hand(rng, rng.randrange(4)))
+        check_index(player)
+    player.set_hand(random_hand(rng, 9))
+    check_index(player)
+
+
+def test_legal_moves_match_can_play():
+    rng = random.Random(2)
+    for _ in range(300):
+        player = Player("p")
+        player.add_cards(random_hand(rng, rng.randrange(12)))
+        top = rng.choice(CARDS)
+        wild_color = rng.choice(COLORS) if top.color == "wild" and rng.random() < 0.8 else None
+        expected = [i for i, card in enumerate(player.hand) if can_play(card, top, wild_color)]
+        assert player.legal_moves(top, wild_color) == expected
+        assert player.has_playable_card(top, wild_color) == bool(expected)
+        assert player.ai_play(top, wild_color) == (expected[0] if expected else -1)
+
+
+def test_hand_stays_sorted():
+    rng = random.Random(3)
+    player = Player("p")
+    for _ in range(100):
+        if rng.random() < 0.5:
+            player.add_card(rng.choice(CARDS))
+        else:
+            player.add_cards(random_hand(rng, rng.randrange(8)))
+        if player.hand and rng.random() < 0.3:
+            player.play_card(rng.randrange(len(player.hand)))
+        assert player.hand == sorted(player.hand, key=hand_order_key)
+        assert player.ranks == sorted(player.ranks)
+        assert len(player.ranks) == len(player.hand)
+
+
+def test_sort_hand_repairs_a_hand_edited_directly():
+    rng = random.Random(4)
+    player = Player("p")
+    player.hand = random_hand(rng, 15)
+    player.sort_hand()
+    assert player.hand == sorted(player.hand, key=hand_order_key)
+    assert player.ranks == sorted(player.ranks)
+
+
+def test_heuristic_keeps_wilds_until_the_next_player_is_close():
+    engine = Engine([HeuristicPlayer("h", is_ai=True), Player("next", is_ai=True)], seed=1)
+    engine.setup_game()
+    engine.current_player = 0
+    engine.deck.add_to_discard(get_card("red", "5"))
+    engine.wild_color = None
+    player = engine.players[0]
+    player.set_hand([get_card("red", "1"), get_card("blue", "5"), get_card("blue", "7"), get_card("blue", "9"),
+                     get_card("wild", "Wild4")])
+
+    # Follows the color held most, which is blue
+    card_idx, color = player.decide(engine)
+    assert (player.hand[card_idx], color) == (get_card("blue", "5"), None)
+
+    # With the next player on two cards, the wild draw four beats a card
+    # of a thin color
+    engine.players[1].set_hand([get_card("green", "1"), get_card("green", "2")])
+    player.set_hand([get_card("red", "1"), get_card("green", "3"), get_card("green", "4"), get_card("wild", "Wild4")])
+    card_idx, color = player.decide(engine)
+    assert (player.hand[card_idx], color) == (get_card("wild", "Wild4"), "green")
+
+    # A skip beats a plain number then, and a wild only when nothing else fits
+    player.set_hand([get_card("red", "1"), get_card("red", "Skip"), get_card("wild", "Wild")])
+    assert player.hand[player.decide(engine)[0]] == get_card("red", "Skip")
+    engine.players[1].set_hand(CARDS[:7])
+    player.set_hand([get_card("green", "1"), get_card("wild", "Wild")])
+    card_idx, color = player.decide(engine)
+    assert (player.hand[card_idx], color) == (get_card("wild", "Wild"), "green")
@@ -0,0 +1,63 @@
+import json
+
+from profiler import NULL_SECTION, Profiler, percentile
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    assert profiler.section("draw") is NULL_SECTION
+    with profiler.section("draw"):
+        pass
+    profiler.frame()
+    assert list(profiler.spans()) == []
+    assert profiler.summary() == {}
+
+
+def test_sections_nest_and_land_in_the_ring():
+    profiler = Profiler(spans=4, enabled=True)
+    with profiler.section("outer"):
+        with profiler.section("inner"):
+            pass
+    assert [(name, depth) for name, _, _, depth in profiler.spans()] == [("inner", 1), ("outer", 0)]
+    for i in range(5):
+        profiler.record(f"span {i}", 0.0, 0.001)
+    assert [name for name, *_ in profiler.spans()] == ["span 1", "span 2", "span 3", "span 4"]
+
+
+def test_turning_off_mid_section_keeps_the_depth():
+    profiler = Profiler(enabled=True)
+    with profiler.section("frame"):
+        profiler.toggle()
+    assert profiler.depth == 0
+    profiler.toggle()
+    with profiler.section("next"):
+        pass
+    assert [(name, depth) for name, _, _, depth in profiler.spans()] == [("next", 0)]
+
+
+def test_frame_times_and_summary():
+    profiler = Profiler(frames=3, enabled=True)
+    for _ in range(5):
+        profiler.frame()
+    assert len(profiler.recent_frames()) == 3
+    for duration in (0.001, 0.002, 0.003, 0.004):
+        profiler.record("draw", 0.0, duration)
+    p50, p99 = profiler.summary()["draw"]
+    assert (p50, p99) == (0.002, 0.004)
+    assert "frame" in profiler.summary()
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) == 0.0
+
+
+def test_chrome_trace_export(tmp_path):
+    profiler = Profiler(enabled=True)
+    profiler.record("draw", profiler.origin + 0.5, 0.25)
+    trace = json.loads(open(profiler.export_chrome_trace(tmp_path / "trace.json")).read())
+    event = trace["traceEvents"][-1]
+    assert (event["name"], event["ph"], event["ts"], event["dur"]) == ("draw", "X", 500000.0, 250000.0)
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+pygame = pytest.importorskip("pygame")
+
+from renderer import Renderer, merge_rects
+
+BACKGROUND = (50, 50, 80)
+
+
+@pytest.fixture
+def renderer():
+    pygame.display.init()
+    screen = pygame.display.set_mode((200, 100))
+    yield Renderer(screen, BACKGROUND)
+    pygame.display.quit()
+
+
+def block(color, size=(10, 10)):
+    surface = pygame.Surface(size)
+    surface.fill(color)
+    return surface
+
+
+def test_first_frame_repaints_everything(renderer):
+    renderer.blit(block((255, 0, 0)), (5, 5))
+    assert renderer.present() == [renderer.screen_rect]
+    assert renderer.screen.get_at((6, 6))[:3] == (255, 0, 0)
+    assert renderer.screen.get_at((50, 50))[:3] == BACKGROUND
+
+
+def test_unchanged_frame_repaints_nothing(renderer):
+    red = block((255, 0, 0))
+    renderer.blit(red, (5, 5))
+    renderer.present()
+    renderer.blit(red, (5, 5))
+    assert renderer.present() == []
+
+
+def test_moved_item_repaints_old_and_new_place(renderer):
+    red = block((255, 0, 0))
+    renderer.blit(red, (5, 5))
+    renderer.present()
+    renderer.blit(red, (100, 50))
+    dirty = renderer.present()
+    assert sorted(map(tuple, dirty)) == [(5, 5, 10, 10), (100, 50, 10, 10)]
+    assert renderer.screen.get_at((6, 6))[:3] == BACKGROUND
+    assert renderer.screen.get_at((101, 51))[:3] == (255, 0, 0)
+
+
+def test_restacked_item_is_repainted(renderer):
+    # Same surfaces and places, but the red block moves under the blue one
+    red, blue = block((255, 0, 0)), block((0, 0, 255))
+    renderer.blit(red, (5, 5))
+    renderer.blit(blue, (10, 5))
+    renderer.present()
+    renderer.blit(blue, (10, 5))
+    renderer.blit(red, (5, 5))
+    assert renderer.present()
+    assert renderer.screen.get_at((12, 7))[:3] == (255, 0, 0)
+
+
+def test_invalidate_repaints_everything(renderer):
+    red = block((255, 0, 0))
+    renderer.blit(red, (5, 5))
+    renderer.present()
+    renderer.invalidate()
+    renderer.blit(red, (5, 5))
+    assert renderer.present() == [renderer.screen_rect]
+
+
+def test_merge_rects_folds_overlaps_and_clips():
+    bounds = pygame.Rect(0, 0, 100, 100)
+    merged = merge_rects([pygame.Rect(0, 0, 10, 10), pygame.Rect(5, 5, 10, 10), pygame.Rect(50, 50, 80, 80),
+                          pygame.Rect(200, 200, 5, 5)], bounds)
+    assert sorted(map(tuple, merged)) == [(0, 0, 15, 15), (50, 50, 50, 50)]
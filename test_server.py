@@ -0,0 +1,196 @@
+import asyncio
+import json
+
+from card import CARDS, COLORS, can_play
+from server import LINE_LIMIT, TableServer, encode
+
+
+async def read_message(reader):
+    return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+
+async def serving(server, scenario):
+    # Run scenario(port) against server on a loopback port
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", 0, limit=LINE_LIMIT)
+    async with listener:
+        return await scenario(listener.sockets[0].getsockname()[1])
+
+
+class Client:
+    # A scripted human that rebuilds the table from the server's deltas
+    # alone and, whenever it is its turn, checks its view against the
+    # server's engine before playing its first legal card. leave_after
+    # disconnects it after that many of its own moves.
+    def __init__(self, server, leave_after=None):
+        self.server = server
+        self.leave_after = leave_after
+        self.seen = []
+        self.moves = 0
+
+    async def play(self, port):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write(encode({"op": "join"}))
+        kind, table_id, self.seat = await read_message(self.reader)
+        assert kind == "wait"
+        self.table = self.server.tables[table_id]
+        try:
+            while True:
+                message = await read_message(self.reader)
+                self.seen.append(message)
+                if self.apply(message) and await self.move():
+                    return None
+                if message[0] == "win":
+                    return message[1]
+        finally:
+            self.writer.close()
+
+    def apply(self, message):
+        # Track one delta; True if it is now this seat's turn
+        kind, *args = message
+        if kind == "start":
+            seat, hand, top, self.sizes, self.current, self.direction, self.wild_color = args
+            assert seat == self.seat
+            assert len(hand) == self.sizes[seat] == 7
+            self.hand = hand
+            self.top = top
+            return self.current == self.seat
+        if kind == "play":
+            seat, card_id = args
+            self.sizes[seat] -= 1
+            self.top = card_id
+            self.wild_color = None
+            if seat == self.seat:
+                self.hand.remove(card_id)
+        elif kind == "color":
+            self.wild_color = args[1]
+        elif kind == "draw":
+            seat = args[0]
+            self.sizes[seat] += 1
+            # Only the drawer learns the card
+            assert len(args) == (2 if seat == self.seat else 1)
+            if seat == self.seat:
+                self.hand.append(args[1])
+        elif kind == "penalty":
+            seat, cards = args
+            if seat == self.seat:
+                assert isinstance(cards, list)
+                self.hand.extend(cards)
+                self.sizes[seat] += len(cards)
+            else:
+                assert isinstance(cards, int)
+                self.sizes[seat] += cards
+        elif kind == "reverse":
+            self.direction = args[0]
+        elif kind == "turn":
+            self.current = args[0]
+            return self.current == self.seat
+        return False
+
+    def check(self):
+        engine = self.table.engine
+        assert engine.current_player == self.seat
+        assert sorted(self.hand) == sorted(card.id for card in engine.players[self.seat].hand)
+        assert self.sizes == [len(player.hand) for player in engine.players]
+        assert self.top == engine.deck.top_card().id
+        assert self.wild_color == engine.wild_color
+        assert self.direction == engine.direction
+
+    async def move(self):
+        # Play a turn; True if this client left instead
+        self.check()
+        if self.moves == self.leave_after:
+            return True
+        self.moves += 1
+        top = CARDS[self.top]
+        for card_id in self.hand:
+            card = CARDS[card_id]
+            if can_play(card, top, self.wild_color):
+                self.writer.write(encode({"op": "play", "card": card_id, "color": COLORS[0]}))
+                break
+        else:
+            self.writer.write(encode({"op": "draw"}))
+        await self.writer.drain()
+        return False
+
+
+def test_humans_and_ai_play_a_game_from_deltas():
+    # Two humans and two AI seats per table; every game ends with one
+    # winner seen by both humans, and over a few games both see private
+    # draws and penalties
+    async def scenario(port):
+        seen = []
+        for _ in range(30):
+            clients = [Client(server), Client(server)]
+            winners = await asyncio.gather(*(client.play(port) for client in clients))
+            assert winners[0] == winners[1] is not None
+            assert {client.seat for client in clients} == {0, 1}
+            seen += [message for client in clients for message in client.seen]
+            kinds = {(kind, seat) for kind, seat, *_ in (m for m in seen if m[0] in ("draw", "penalty", "play"))}
+            if {("penalty", 0), ("penalty", 1), ("draw", 0), ("draw", 1), ("play", 2), ("play", 3)} <= kinds:
+                break
+        else:
+            raise AssertionError("no game had draws and penalties for every human")
+
+    server = TableServer(num_players=4, humans=2)
+    asyncio.run(serving(server, scenario))
+    assert server.tables == {}
+    assert server.games > 0
+
+
+def test_a_human_who_leaves_is_replaced_by_the_ai():
+    async def scenario(port):
+        stayer, leaver = Client(server), Client(server, leave_after=0)
+        stay = asyncio.ensure_future(stayer.play(port))
+        await asyncio.sleep(0.05)
+        assert await leaver.play(port) is None
+        table = leaver.table
+        while table.seats[leaver.seat] is not None:
+            await asyncio.sleep(0.01)
+        assert table.engine.players[leaver.seat].is_ai
+        assert await stay is not None
+        assert stayer.seen[-1][0] == "win"
+
+    server = TableServer(num_players=3, humans=2)
+    asyncio.run(serving(server, scenario))
+    assert server.tables == {}
+
+
+def test_bool_is_not_a_card_id():
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(encode({"op": "join"}))
+        assert (await read_message(reader))[0] == "wait"
+        assert (await read_message(reader))[0] == "start"
+
+        # Hold cards 0 and 1 with a card of their color on top, so true
+        # and false would be plays if taken as ids
+        engine = server.tables[0].engine
+        engine.players[0].set_hand([CARDS[0], CARDS[1], CARDS[5]])
+        engine.deck.add_to_discard(CARDS[2])
+        engine.wild_color = None
+        for card in (True, False):
+            writer.write(encode({"op": "play", "card": card, "color": "red"}))
+            assert await read_message(reader) == ["error", "card not in hand"]
+        writer.close()
+
+    # A lone seat at a one-seat table always has the turn
+    server = TableServer(num_players=1, humans=1)
+    asyncio.run(serving(server, scenario))
+
+
+def test_overlong_line_is_refused_and_frees_the_seat():
+    async def scenario(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(encode({"op": "join"}))
+        assert await read_message(reader) == ["wait", 0, 0]
+        assert server.filling is not None
+
+        writer.write(b"x" * 70_000 + b"\n")
+        assert await read_message(reader) == ["error", "line too long"]
+        assert await asyncio.wait_for(reader.read(), 5) == b""
+        writer.close()
+        assert server.tables == {}
+        assert server.filling is None
+
+    server = TableServer(num_players=2, humans=2)
+    asyncio.run(serving(server, scenario))
@@ -0,0 +1,27 @@
+from tournament import report, run_tournament, wilson_interval
+
+
+def test_results_do_not_depend_on_workers_or_blocks():
+    lineup = ["first", "random", "first", "random"]
+    single = run_tournament(lineup, 300, seed=7, workers=1, block=300)
+    assert run_tournament(lineup, 300, seed=7, workers=1, block=64) == single
+    assert run_tournament(lineup, 300, seed=7, workers=2, block=50) == single
+    seat_wins, unfinished, total_turns = single
+    assert sum(seat_wins) + unfinished == 300
+    assert total_turns > 0
+
+
+def test_wilson_interval_brackets_the_rate():
+    low, high = wilson_interval(30, 100)
+    assert low < 0.3 < high
+    assert wilson_interval(0, 0) == (0.0, 0.0)
+    assert 0.0 <= wilson_interval(0, 10)[0] < wilson_interval(0, 10)[1]
+
+
+def test_policy_interval_counts_games_not_seats(capsys):
+    # Two seats of one policy win 600 of 1000 games: one trial per game
+    report(["first", "random", "first", "random"], 1000, [300, 200, 300, 200], 0, 40000, 1.0)
+    low, high = wilson_interval(600, 1000)
+    line = next(line for line in capsys.readouterr().out.splitlines() if line.strip().startswith("first x2"))
+    assert f"60.00%  [{low:6.2%}, {high:6.2%}]" in line
+    assert "fair share 50.00%" in line
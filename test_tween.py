@@ -0,0 +1,67 @@
+import pytest
+
+from tween import Tween, TweenScheduler, ease_in_out_quad, ease_out_cubic, linear
+
+
+@pytest.mark.parametrize("ease", [linear, ease_out_cubic, ease_in_out_quad])
+def test_easings_run_from_0_to_1(ease):
+    assert ease(0) == pytest.approx(0)
+    assert ease(1) == pytest.approx(1)
+    samples = [ease(i / 20) for i in range(21)]
+    assert samples == sorted(samples)
+
+
+def test_tween_waits_out_its_delay_then_lands():
+    tween = Tween("card", (0, 0), (100, 50), 200, delay=100, ease=linear)
+    assert not tween.advance(50)
+    assert not tween.started
+    assert (tween.x, tween.y) == (0, 0)
+    assert not tween.advance(150)
+    assert tween.started
+    assert (tween.x, tween.y) == (50, 25)
+    assert tween.advance(1000)
+    assert (tween.x, tween.y) == (100, 50)
+
+
+def test_same_motion_at_any_frame_rate():
+    coarse, fine = Tween("a", (0, 0), (90, 0), 300), Tween("b", (0, 0), (90, 0), 300)
+    coarse.advance(150)
+    for _ in range(10):
+        fine.advance(15)
+    assert coarse.x == pytest.approx(fine.x)
+
+
+class Target:
+    def __init__(self):
+        self.blits = []
+
+    def blit(self, surface, position):
+        self.blits.append((surface, position))
+
+
+def test_scheduler_runs_tweens_concurrently_and_calls_on_done():
+    done = []
+    tweens = TweenScheduler()
+    tweens.add("first", (0, 0), (10, 0), 100, on_done=lambda: done.append("first"))
+    tweens.add("second", (0, 0), (10, 0), 100, delay=50, on_done=lambda: done.append("second"))
+    assert tweens.active
+
+    tweens.update(60)
+    target = Target()
+    tweens.draw(target)
+    assert [surface for surface, _ in target.blits] == ["first", "second"]
+
+    tweens.update(50)
+    assert done == ["first"]
+    tweens.update(100)
+    assert done == ["first", "second"]
+    assert not tweens.active
+
+
+def test_clear_drops_without_callbacks():
+    done = []
+    tweens = TweenScheduler()
+    tweens.add("card", (0, 0), (1, 1), 100, on_done=lambda: done.append(1))
+    tweens.clear()
+    tweens.update(1000)
+    assert not tweens.active and done == []
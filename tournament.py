@@ -0,0 +1,160 @@
+import argparse
+import math
+import multiprocessing
+import time
+from array import array
+
+from engine import Engine
+from ismcts import ISMCTSPlayer
+from player import HeuristicPlayer, Player, RandomPlayer
+from telemetry import Telemetry, print_summary
+
+# Policies that can sit at a seat: name -> factory(player name, seed)
+POLICIES = {
+    "first": lambda name, seed: Player(name, is_ai=True),  # first legal card, most common color
+    "random": lambda name, seed: RandomPlayer(name, seed=seed),
+    "heuristic": lambda name, seed: HeuristicPlayer(name, is_ai=True),
+    # See the README for measured rates at this budget
+    "ismcts": lambda name, seed: ISMCTSPlayer(name, iterations=400, seed=seed),
+}
+
+NO_WINNER = 255
+
+
+def make_players(lineup, seed):
+    players = []
+    for seat, name in enumerate(lineup):
+        players.append(POLICIES[name](f"{name} {seat}", seed * len(lineup) + seat))
+    return players
+
+
+def play_games(job):
+    # Worker: play a block of seeded games and send back only the winning
+    # seat and turn count of each, never Player or Card objects, plus the
+    # block's telemetry rows and aggregates if asked for
+    lineup, first_seed, count, max_turns, telemetry, turn_rows = job
+    winners = bytearray(count)
+    turns = array("I", bytes(4 * count))
+    sink = Telemetry(num_players=len(lineup), turns=turn_rows) if telemetry else None
+
+    for i in range(count):
+        seed = first_seed + i
+        engine = Engine(make_players(lineup, seed), seed=seed)
+        recorder = sink.watch(engine, seed) if sink is not None else None
+        engine.setup_game()
+        winner = engine.run(max_turns)
+        if recorder is not None:
+            recorder.finish(winner)
+        winners[i] = NO_WINNER if winner is None else winner
+        turns[i] = engine.turns
+
+    return first_seed, bytes(winners), turns, sink.export() if sink is not None else None
+
+
+def wilson_interval(wins, total, z=1.96):
+    # 95% confidence interval for a win rate
+    if total == 0:
+        return 0.0, 0.0
+    p = wins / total
+    denom = 1 + z * z / total
+    centre = (p + z * z / (2 * total)) / denom
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denom
+    return max(centre - margin, 0.0), min(centre + margin, 1.0)
+
+
+def run_tournament(lineup, games, seed=0, workers=None, block=500, max_turns=10000, telemetry=None):
+    # telemetry, a Telemetry sink, receives every game's statistics
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+
+    jobs = []
+    for start in range(0, games, block):
+        jobs.append((lineup, seed + start, min(block, games - start), max_turns,
+                     telemetry is not None, telemetry is not None and telemetry.turns is not None))
+
+    seat_wins = [0] * len(lineup)
+    unfinished = 0
+    total_turns = 0
+
+    if workers <= 1:
+        results = map(play_games, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(play_games, jobs)
+
+    try:
+        for _, winners, turns, exported in results:
+            if exported is not None:
+                telemetry.absorb(exported)
+            for winner in winners:
+                if winner == NO_WINNER:
+                    unfinished += 1
+                else:
+                    seat_wins[winner] += 1
+            total_turns += sum(turns)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return seat_wins, unfinished, total_turns
+
+
+def report(lineup, games, seat_wins, unfinished, total_turns, elapsed):
+    print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.0f} games/s), "
+          f"{total_turns / games:.1f} turns/game, {unfinished} unfinished")
+
+    print("\nPer seat:")
+    for seat, name in enumerate(lineup):
+        wins = seat_wins[seat]
+        low, high = wilson_interval(wins, games)
+        print(f"  seat {seat} ({name:>6}): {wins / games:6.2%}  [{low:6.2%}, {high:6.2%}]")
+
+    # A policy's rate is the share of games won by any of its seats. Seats
+    # of one game are not independent trials, as exactly one of them wins,
+    # so the interval counts games, and the rate is set against the share
+    # the policy's seats would win if every seat were equal.
+    print("\nPer policy (games won by any of its seats):")
+    for name in dict.fromkeys(lineup):
+        seats = [seat for seat, seat_name in enumerate(lineup) if seat_name == name]
+        wins = sum(seat_wins[seat] for seat in seats)
+        low, high = wilson_interval(wins, games)
+        fair = len(seats) / len(lineup)
+        print(f"  {name:>6} x{len(seats)}: {wins / games:6.2%}  [{low:6.2%}, {high:6.2%}]  fair share {fair:6.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many AI-only UNO games and report win rates")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--seats", default="first,first,first,first",
+                        help="comma separated policy per seat: " + ", ".join(POLICIES))
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--block", type=int, default=500, help="games per worker job")
+    parser.add_argument("--telemetry", help="write per-game statistics and a summary to this directory")
+    parser.add_argument("--turn-rows", action="store_true", help="with --telemetry, also record every move")
+    args = parser.parse_args()
+
+    lineup = args.seats.split(",")
+    for name in lineup:
+        if name not in POLICIES:
+            parser.error(f"unknown policy {name!r}")
+
+    telemetry = None
+    if args.telemetry:
+        telemetry = Telemetry(args.telemetry, len(lineup), turns=args.turn_rows)
+
+    start = time.perf_counter()
+    seat_wins, unfinished, total_turns = run_tournament(lineup, args.games, args.seed, args.workers, args.block,
+                                                        telemetry=telemetry)
+    report(lineup, args.games, seat_wins, unfinished, total_turns, time.perf_counter() - start)
+
+    if telemetry is not None:
+        telemetry.close()
+        print(f"\nTelemetry in {args.telemetry}:")
+        print_summary(telemetry.aggregates.summary())
+
+
+if __name__ == "__main__":
+    main()
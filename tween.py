@@ -0,0 +1,90 @@
+# Easing curves: map linear progress t in [0, 1] to eased progress
+def linear(t):
+    return t
+
+
+def ease_out_cubic(t):
+    t -= 1
+    return t * t * t + 1
+
+
+def ease_in_out_quad(t):
+    if t < 0.5:
+        return 2 * t * t
+    return 1 - 2 * (1 - t) * (1 - t)
+
+
+class Tween:
+    # One surface moving from start to end over duration ms, after delay
+    # ms. Position is updated in place so a running tween allocates nothing
+    # per frame.
+    __slots__ = ("surface", "x0", "y0", "x1", "y1", "delay", "duration", "elapsed", "ease", "on_done", "x", "y")
+
+    def __init__(self, surface, start, end, duration, delay=0, ease=ease_out_cubic, on_done=None):
+        self.surface = surface
+        self.x0, self.y0 = start
+        self.x1, self.y1 = end
+        self.delay = delay
+        self.duration = max(duration, 1)
+        self.elapsed = 0
+        self.ease = ease
+        self.on_done = on_done
+        self.x, self.y = start
+
+    @property
+    def started(self):
+        return self.elapsed >= self.delay
+
+    def advance(self, dt):
+        # Move on by dt ms; returns True once finished
+        self.elapsed += dt
+        t = (self.elapsed - self.delay) / self.duration
+        if t <= 0:
+            return False
+        if t >= 1:
+            self.x, self.y = self.x1, self.y1
+            return True
+        k = self.ease(t)
+        self.x = self.x0 + (self.x1 - self.x0) * k
+        self.y = self.y0 + (self.y1 - self.y0) * k
+        return False
+
+
+class TweenScheduler:
+    # Runs any number of tweens at once, advanced by the frame's clock
+    # delta so motion takes the same time at any frame rate. Finished
+    # tweens call their on_done and are dropped.
+    def __init__(self):
+        self.tweens = []
+
+    @property
+    def active(self):
+        return bool(self.tweens)
+
+    def add(self, surface, start, end, duration, delay=0, ease=ease_out_cubic, on_done=None):
+        tween = Tween(surface, start, end, duration, delay, ease, on_done)
+        self.tweens.append(tween)
+        return tween
+
+    def update(self, dt):
+        finished = None
+        for tween in self.tweens:
+            if tween.advance(dt):
+                if finished is None:
+                    finished = []
+                finished.append(tween)
+
+        if finished:
+            self.tweens = [tween for tween in self.tweens if tween not in finished]
+            for tween in finished:
+                if tween.on_done is not None:
+                    tween.on_done()
+
+    def draw(self, target):
+        # Blit every started tween at its current position, oldest first
+        for tween in self.tweens:
+            if tween.started:
+                target.blit(tween.surface, (int(tween.x), int(tween.y)))
+
+    def clear(self):
+        self.tweens = []